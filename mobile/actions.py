@@ -0,0 +1,215 @@
+"""
+W3C Action Sequences for Gestures and Key Chords
+
+driver.swipe() and one-by-one key presses with time.sleep() in between cost a remote
+round trip (plus idle time) per step. ActionSequence compiles a whole interaction into
+one W3C Actions payload and sends it with a single `POST /actions`; the pauses travel
+inside the payload and are executed on the device.
+
+The payload is built tick by tick: every input source (fingers, keyboard) gets exactly
+one action per tick, padded with zero-length pauses, so fingers moving in the same tick
+run in parallel (multi-finger gestures) and keys pressed in consecutive ticks are held
+together (chords).
+
+press_keycodes() sends a sequence of Android key codes the same way when it can: one key
+action sequence with the pauses between the keys inside it. Only keys with a W3C key
+value (letters, digits, ENTER, DEL, TAB, ESCAPE, arrows, ...) can travel in it.
+Hardware buttons such as BACK, HOME and APP_SWITCH have none, and Appium has no command
+that presses several key codes at once (mobile: pressKey also takes one), so a sequence
+containing them, or one the driver rejects, costs one press_keycode() request per key
+with client-side sleeps in between, the same as pressing them in a loop.
+
+Usage:
+    ActionSequence(driver).swipe(200, 1400, 200, 600, duration_ms=500).perform()
+    ActionSequence(driver).pinch((540, 1200), 400, 100).pause(300).tap(540, 1200).perform()
+    ActionSequence(driver).chord(Keys.CONTROL, "a").type("new text").perform()
+    press_keycodes(driver, [66, 67, 67], pause_ms=200)  # ENTER, DEL, DEL in one request
+    press_keycodes(driver, [4, 3])  # BACK, HOME: two requests, 1s apart
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+logger = logging.getLogger(__name__)
+
+KEYBOARD = "keyboard"
+
+# Android key codes (android.view.KeyEvent) that have a W3C key value.
+ANDROID_KEY_VALUES: Dict[int, str] = {
+    **{7 + digit: str(digit) for digit in range(10)},  # KEYCODE_0 .. KEYCODE_9
+    **{29 + index: chr(ord("a") + index) for index in range(26)},  # KEYCODE_A .. KEYCODE_Z
+    19: Keys.ARROW_UP,
+    20: Keys.ARROW_DOWN,
+    21: Keys.ARROW_LEFT,
+    22: Keys.ARROW_RIGHT,
+    55: ",",
+    56: ".",
+    61: Keys.TAB,
+    62: Keys.SPACE,
+    66: Keys.ENTER,
+    67: Keys.BACKSPACE,
+    92: Keys.PAGE_UP,
+    93: Keys.PAGE_DOWN,
+    111: Keys.ESCAPE,
+    112: Keys.DELETE,
+    122: Keys.HOME,  # KEYCODE_MOVE_HOME, not the hardware HOME button (3)
+    123: Keys.END,
+}
+
+
+class ActionSequence:
+    """Builder for one W3C Actions request covering touch pointers and a keyboard."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._ticks = 0
+
+    def _source(self, source_id: str) -> Dict[str, Any]:
+        source = self._sources.get(source_id)
+        if source is None:
+            if source_id == KEYBOARD:
+                source = {"type": "key", "id": KEYBOARD, "actions": []}
+            else:
+                source = {
+                    "type": "pointer",
+                    "id": source_id,
+                    "parameters": {"pointerType": "touch"},
+                    "actions": [],
+                }
+            # A source added later idles through the ticks that already exist.
+            source["actions"].extend({"type": "pause", "duration": 0} for _ in range(self._ticks))
+            self._sources[source_id] = source
+        return source
+
+    def _tick(self, actions: Dict[str, Dict[str, Any]]) -> "ActionSequence":
+        for source_id in actions:
+            self._source(source_id)
+        for source_id, source in self._sources.items():
+            source["actions"].append(actions.get(source_id, {"type": "pause", "duration": 0}))
+        self._ticks += 1
+        return self
+
+    @staticmethod
+    def _finger(finger: int) -> str:
+        return f"finger{finger + 1}"
+
+    # Pointer primitives
+    def move(self, x: int, y: int, duration_ms: int = 0, finger: int = 0) -> "ActionSequence":
+        return self._tick(
+            {self._finger(finger): {"type": "pointerMove", "duration": duration_ms, "x": x, "y": y, "origin": "viewport"}}
+        )
+
+    def down(self, finger: int = 0) -> "ActionSequence":
+        return self._tick({self._finger(finger): {"type": "pointerDown", "button": 0}})
+
+    def up(self, finger: int = 0) -> "ActionSequence":
+        return self._tick({self._finger(finger): {"type": "pointerUp", "button": 0}})
+
+    def pause(self, duration_ms: int) -> "ActionSequence":
+        """Idle on the device; no client-side sleep or extra request."""
+        source_ids = list(self._sources) or [KEYBOARD]
+        return self._tick({source_id: {"type": "pause", "duration": duration_ms} for source_id in source_ids})
+
+    # Gestures
+    def tap(self, x: int, y: int, hold_ms: int = 50, finger: int = 0) -> "ActionSequence":
+        self.move(x, y, finger=finger).down(finger)
+        if hold_ms:
+            self._tick({self._finger(finger): {"type": "pause", "duration": hold_ms}})
+        return self.up(finger)
+
+    def swipe(
+        self, start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int = 500, finger: int = 0
+    ) -> "ActionSequence":
+        return (
+            self.move(start_x, start_y, finger=finger)
+            .down(finger)
+            .move(end_x, end_y, duration_ms, finger)
+            .up(finger)
+        )
+
+    def multi_swipe(self, paths: Sequence[Tuple[int, int, int, int]], duration_ms: int = 500) -> "ActionSequence":
+        """Several fingers swiping at the same time, one (start_x, start_y, end_x, end_y) each."""
+        fingers = {self._finger(i): path for i, path in enumerate(paths)}
+        self._tick(
+            {f: {"type": "pointerMove", "duration": 0, "x": p[0], "y": p[1], "origin": "viewport"} for f, p in fingers.items()}
+        )
+        self._tick({f: {"type": "pointerDown", "button": 0} for f in fingers})
+        self._tick(
+            {
+                f: {"type": "pointerMove", "duration": duration_ms, "x": p[2], "y": p[3], "origin": "viewport"}
+                for f, p in fingers.items()
+            }
+        )
+        return self._tick({f: {"type": "pointerUp", "button": 0} for f in fingers})
+
+    def pinch(
+        self, center: Tuple[int, int], start_distance: int, end_distance: int, duration_ms: int = 500
+    ) -> "ActionSequence":
+        """Two-finger horizontal pinch (end < start) or spread (end > start) around center."""
+        x, y = center
+        start, end = start_distance // 2, end_distance // 2
+        return self.multi_swipe([(x - start, y, x - end, y), (x + start, y, x + end, y)], duration_ms)
+
+    # Keys
+    def key_down(self, value: str) -> "ActionSequence":
+        return self._tick({KEYBOARD: {"type": "keyDown", "value": value}})
+
+    def key_up(self, value: str) -> "ActionSequence":
+        return self._tick({KEYBOARD: {"type": "keyUp", "value": value}})
+
+    def chord(self, *keys: str) -> "ActionSequence":
+        """Press keys together (e.g. Keys.CONTROL, "a") and release them in reverse order."""
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+        return self
+
+    def type(self, text: str, delay_ms: int = 0) -> "ActionSequence":
+        for char in text:
+            self.key_down(char).key_up(char)
+            if delay_ms:
+                self.pause(delay_ms)
+        return self
+
+    def payload(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {"actions": list(self._sources.values())}
+
+    def perform(self) -> None:
+        """Send the whole sequence in one request."""
+        if self._ticks:
+            self.driver.execute(Command.W3C_ACTIONS, self.payload())
+
+
+def press_keycodes(driver, keycodes: Sequence[int], pause_ms: int = 1000) -> int:
+    """
+    Press Android keys in order, pause_ms apart; returns the number of requests used.
+    One W3C key action sequence when every key has a W3C value; one request per key when
+    any of them is a hardware button (BACK, HOME, APP_SWITCH, ...).
+    """
+    if all(code in ANDROID_KEY_VALUES for code in keycodes):
+        sequence = ActionSequence(driver)
+        for index, code in enumerate(keycodes):
+            if index and pause_ms:
+                sequence.pause(pause_ms)
+            value = ANDROID_KEY_VALUES[code]
+            sequence.key_down(value).key_up(value)
+        try:
+            sequence.perform()
+            return 1
+        except WebDriverException as e:
+            logger.debug("Key actions rejected, pressing keys one by one: %s", e)
+    else:
+        logger.debug("Key codes %s include keys without a W3C value, pressing them one by one", list(keycodes))
+
+    for index, code in enumerate(keycodes):
+        if index and pause_ms:
+            time.sleep(pause_ms / 1000)
+        driver.press_keycode(code)
+    return len(keycodes)
@@ -0,0 +1,238 @@
+"""
+Device Log Streaming for Native App Tests
+
+Pulling a full logcat after a failed run is slow and produces huge files. Instead,
+DeviceLogStreamer drains the device log (Android logcat, iOS syslog) through Appium's
+get_log() on a background thread while the test runs. Matching lines go into a
+LogRingBuffer:
+    - lines are filtered by tag and minimum level before they are stored
+    - full chunks of lines are zlib-compressed
+    - the buffer is bounded in bytes; the oldest chunks are dropped first
+
+Nothing is written unless the test fails: the fixture then dumps the buffer to
+device_logs/<test>.log.gz, grouped by the test steps that ran (support/tracing.step).
+Lines can also be queried by time window or step while the test is running:
+
+    def test_x(android_driver, device_logs):
+        ...
+        for line in device_logs.for_step("_test_navigation"):
+            ...
+
+Device timestamps are shifted to host time using driver.get_device_time(), so they
+line up with step timestamps from the same run.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from mobile.session import command_lock
+from support.tracing import step_windows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_DIR = os.getenv("DEVICE_LOG_DIR", "device_logs")
+DEFAULT_BUFFER_MB = 8
+DEFAULT_POLL_INTERVAL = 2.0  # seconds
+CHUNK_LINES = 500
+
+LOG_TYPES = {"android": "logcat", "ios": "syslog"}
+LEVELS = "VDIWEF"  # logcat priorities, lowest first
+# iOS syslog levels mapped onto logcat priorities
+IOS_LEVELS = {"Debug": "D", "Info": "I", "Notice": "I", "Warning": "W", "Error": "E", "Fault": "F"}
+
+# "10-19 12:00:00.123  1234  1250 I ActivityManager: message" (threadtime format)
+LOGCAT_LINE = re.compile(r"^\S+\s+\S+\s+\d+\s+\d+\s+([VDIWEF])\s+([^:]*?)\s*:\s?(.*)$")
+# "Oct 19 12:00:00 iPhone Proverbial(UIKitCore)[123] <Notice>: message"
+SYSLOG_LINE = re.compile(r"^\w{3}\s+\d+\s+[\d:]+\s+\S+\s+([^\[(\s]+)[^\[]*\[\d+\]\s+<(\w+)>:\s?(.*)$")
+
+
+class LogLine(NamedTuple):
+    timestamp: float  # host time, seconds since the epoch
+    level: str
+    tag: str
+    message: str
+
+    def format(self) -> str:
+        stamp = datetime.fromtimestamp(self.timestamp).strftime("%H:%M:%S.%f")[:-3]
+        return f"{stamp} {self.level} {self.tag}: {self.message}"
+
+
+def parse_entry(platform: str, entry: dict, clock_offset: float = 0.0) -> LogLine:
+    """Turn an Appium log entry into a LogLine with level and tag from the raw line."""
+    message = entry.get("message", "")
+    timestamp = entry.get("timestamp", 0) / 1000 - clock_offset
+    if platform == "android":
+        match = LOGCAT_LINE.match(message)
+        if match:
+            return LogLine(timestamp, match.group(1), match.group(2), match.group(3))
+    else:
+        match = SYSLOG_LINE.match(message)
+        if match:
+            return LogLine(timestamp, IOS_LEVELS.get(match.group(2), "I"), match.group(1), match.group(3))
+    return LogLine(timestamp, "I", "", message)
+
+
+class LogRingBuffer:
+    """Compressed chunks of log lines, bounded by their compressed size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_BUFFER_MB * 1024 * 1024, chunk_lines: int = CHUNK_LINES):
+        self.max_bytes = max_bytes
+        self.chunk_lines = chunk_lines
+        # (first timestamp, last timestamp, line count, compressed lines)
+        self._chunks: Deque[Tuple[float, float, int, bytes]] = deque()
+        self._open: List[LogLine] = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.lines = 0
+        self.dropped_lines = 0
+
+    @staticmethod
+    def _encode(lines: Sequence[LogLine]) -> bytes:
+        # One JSON array per line: messages may contain newlines and tabs (stack traces).
+        text = "\n".join(json.dumps([round(l.timestamp, 3), l.level, l.tag, l.message]) for l in lines)
+        return zlib.compress(text.encode("utf-8", errors="replace"))
+
+    @staticmethod
+    def _decode(data: bytes) -> List[LogLine]:
+        text = zlib.decompress(data).decode("utf-8", errors="replace")
+        return [LogLine(*json.loads(raw)) for raw in text.split("\n") if raw]
+
+    def _seal(self) -> None:
+        data = self._encode(self._open)
+        self._chunks.append((self._open[0].timestamp, self._open[-1].timestamp, len(self._open), data))
+        self._bytes += len(data)
+        self._open = []
+        while self._bytes > self.max_bytes and len(self._chunks) > 1:
+            _, _, count, dropped = self._chunks.popleft()
+            self._bytes -= len(dropped)
+            self.dropped_lines += count
+
+    def extend(self, lines: Iterable[LogLine]) -> None:
+        with self._lock:
+            for line in lines:
+                self._open.append(line)
+                self.lines += 1
+                if len(self._open) >= self.chunk_lines:
+                    self._seal()
+
+    def query(self, start: float = 0.0, end: float = float("inf")) -> Iterator[LogLine]:
+        """Lines with start <= timestamp <= end, oldest first."""
+        with self._lock:
+            chunks = [c for c in self._chunks if c[1] >= start and c[0] <= end]
+            open_lines = list(self._open)
+        for _, _, _, data in chunks:
+            for line in self._decode(data):
+                if start <= line.timestamp <= end:
+                    yield line
+        for line in open_lines:
+            if start <= line.timestamp <= end:
+                yield line
+
+    @property
+    def compressed_bytes(self) -> int:
+        return self._bytes
+
+
+class DeviceLogStreamer:
+    """Drains one Appium session's device log into a LogRingBuffer on a daemon thread."""
+
+    def __init__(
+        self,
+        driver,
+        platform: str,
+        buffer: Optional[LogRingBuffer] = None,
+        tags: Sequence[str] = (),
+        min_level: str = "I",
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.driver = driver
+        self.platform = platform.lower()
+        self.log_type = LOG_TYPES[self.platform]
+        self.buffer = buffer or LogRingBuffer()
+        self.tags = tuple(tags)
+        self.min_level = LEVELS.index(min_level.upper())
+        self.interval = interval
+        self.clock_offset = 0.0
+        self.started_at = 0.0
+        # get_log runs under the driver's command lock, never alongside a test command.
+        command_lock(driver)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _device_clock_offset(self) -> float:
+        try:
+            device_time = datetime.fromisoformat(self.driver.get_device_time().replace("Z", "+00:00"))
+            return device_time.timestamp() - time.time()
+        except Exception as e:
+            logger.debug("Could not read device time, assuming synced clocks: %s", e)
+            return 0.0
+
+    def keep(self, line: LogLine) -> bool:
+        if LEVELS.find(line.level) < self.min_level:
+            return False
+        return not self.tags or any(line.tag.startswith(tag) for tag in self.tags)
+
+    def drain(self) -> int:
+        try:
+            entries = self.driver.get_log(self.log_type)
+        except Exception as e:
+            logger.debug("Could not read %s: %s", self.log_type, e)
+            return 0
+        lines = [parse_entry(self.platform, e, self.clock_offset) for e in entries]
+        kept = [line for line in lines if self.keep(line)]
+        self.buffer.extend(kept)
+        return len(kept)
+
+    def start(self) -> "DeviceLogStreamer":
+        self.started_at = time.time()
+        self.clock_offset = self._device_clock_offset()
+        self._thread = threading.Thread(target=self._run, name="device-logs", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 30)
+        self.drain()
+
+    def query(self, start: float = 0.0, end: float = float("inf")) -> List[LogLine]:
+        return list(self.buffer.query(start, end))
+
+    def for_step(self, name: str) -> List[LogLine]:
+        """Lines logged while any run of the named step was open in this test."""
+        lines = []
+        for _, start, end in step_windows(name, since=self.started_at):
+            lines.extend(self.buffer.query(start, end))
+        return lines
+
+    def dump(self, path: str) -> str:
+        """Write the buffer as gzipped text, with a header before each step's lines."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        windows = sorted(step_windows(since=self.started_at), key=lambda w: w[1])
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(
+                f"# {self.log_type}: {self.buffer.lines} lines kept, "
+                f"{self.buffer.dropped_lines} dropped by the ring buffer\n"
+            )
+            current = None
+            for line in self.buffer.query():
+                name = next((w[0] for w in reversed(windows) if w[1] <= line.timestamp <= w[2]), None)
+                if name != current:
+                    f.write(f"\n=== {name or 'outside steps'} ===\n")
+                    current = name
+                f.write(line.format() + "\n")
+        return path
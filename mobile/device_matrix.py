@@ -0,0 +1,88 @@
+"""
+Device Matrix for Native App Tests
+
+The supported device fleet is declared in mobile/device_matrix.json, one entry per
+device and platform. Test classes marked with @pytest.mark.device_matrix are expanded
+across the fleet when pytest runs with --device-matrix; without it they keep running on
+the default device (Galaxy S21 5G / iPhone 12).
+
+    @pytest.mark.device_matrix                        # every device of the platform
+    @pytest.mark.device_matrix("pixel-7", "iphone-14") # a subset, by id
+
+Each expanded test gets its own cloud session, so with pytest-xdist the devices run
+side by side. `-n auto` starts --session-quota workers (the parallel session limit of
+the LambdaTest plan), so a build takes about as long as its slowest device.
+
+Usage:
+    pytest mobile/ --device-matrix -n auto --session-quota=5
+    pytest mobile/ --device-matrix --devices=pixel-7,iphone-14 -n 2
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+DEFAULT_MATRIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "device_matrix.json")
+DEFAULT_SESSION_QUOTA = int(os.getenv("LT_PARALLEL_SESSIONS", "5"))
+
+
+class Device(NamedTuple):
+    id: str
+    platform: str
+    device_name: str
+    platform_version: str
+
+
+def load_matrix(path: str = DEFAULT_MATRIX_FILE) -> Dict[str, List[Device]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        platform: [
+            Device(entry["id"], platform, entry["device_name"], str(entry["platform_version"]))
+            for entry in entries
+        ]
+        for platform, entries in data.items()
+    }
+
+
+def select_devices(
+    matrix: Dict[str, List[Device]],
+    platform: str,
+    ids: Optional[Iterable[str]] = None,
+) -> List[Device]:
+    """Devices of a platform, optionally limited to the given ids (unknown ids are errors)."""
+    devices = matrix.get(platform, [])
+    if not ids:
+        return devices
+    wanted = set(ids)
+    known = {device.id for platform_devices in matrix.values() for device in platform_devices}
+    unknown = wanted - known
+    if unknown:
+        raise ValueError(f"Unknown device ids in matrix selection: {sorted(unknown)}")
+    return [device for device in devices if device.id in wanted]
+
+
+class DeviceResults:
+    """Per-device outcome counts and test time, fed from test reports."""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def record(self, device_id: str, outcome: str, duration: float) -> None:
+        entry = self.results.setdefault(
+            device_id, {"passed": 0, "failed": 0, "skipped": 0, "duration": 0.0}
+        )
+        entry[outcome] = entry.get(outcome, 0) + 1
+        entry["duration"] += duration
+
+    def lines(self) -> List[str]:
+        lines = []
+        for device_id, entry in sorted(self.results.items()):
+            lines.append(
+                f"{device_id:<16} {entry['passed']:>3} passed {entry['failed']:>3} failed "
+                f"{entry['skipped']:>3} skipped  {entry['duration']:>7.1f}s"
+            )
+        if self.results:
+            slowest = max(self.results.items(), key=lambda item: item[1]["duration"])
+            lines.append(f"Slowest device: {slowest[0]} ({slowest[1]['duration']:.1f}s of test time)")
+        return lines
@@ -0,0 +1,161 @@
+"""
+Element Handle Cache for Appium Native Tests
+
+Memoizes WebElement references per screen so that repeated lookups of the same
+AppElements locator do not cost a findElement round trip while the screen is
+unchanged.
+
+Invalidation rules:
+    - A StaleElementReferenceException raised while using a cached element drops
+      that entry and the element is looked up again once.
+    - An activity change (Android, checked via sync_screen) clears the cache.
+    - An orientation change made through set_orientation clears the cache.
+
+Clicks, typing and rotations can change the device state (activity, app state,
+orientation); listeners added with add_listener, such as DeviceSession's state memo,
+are told after each of them.
+
+Usage:
+    elements = ElementCache(driver)
+    elements.click(AppElements.COLOUR_ELEMENT)
+    driver.back()
+    elements.sync_screen()
+    logger.info(elements.stats)
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+Locator = Tuple[str, str]
+
+
+class CacheStats:
+    """Counters describing how much lookup traffic the cache absorbed."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+
+    @property
+    def round_trips_saved(self) -> int:
+        # Every hit is one findElement request that never left the client,
+        # except hits that turned out stale and had to be looked up again.
+        return self.hits - self.stale
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "round_trips_saved": self.round_trips_saved,
+        }
+
+    def __repr__(self) -> str:
+        return f"CacheStats({self.as_dict()})"
+
+
+class ElementCache:
+    """
+    Per-screen cache of WebElement references on top of an Appium driver.
+
+    The screen key is the current Android activity when available, otherwise a
+    caller supplied name (see enter_screen). The key is only re-read when
+    sync_screen is called, so cached lookups stay free of extra requests.
+    """
+
+    def __init__(self, driver, timeout: int = 20):
+        self.driver = driver
+        self.timeout = timeout
+        self.stats = CacheStats()
+        self._elements: Dict[Locator, WebElement] = {}
+        self._screen: Optional[str] = None
+        self._listeners: List[Callable[[str], None]] = []
+
+    @property
+    def screen(self) -> Optional[str]:
+        return self._screen
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Call callback("click"), ("send_keys") or ("orientation") after each such command."""
+        self._listeners.append(callback)
+
+    def _interacted(self, kind: str) -> None:
+        for callback in self._listeners:
+            callback(kind)
+
+    def find(self, locator: Locator) -> WebElement:
+        """Return a clickable element for the locator, from the cache if possible."""
+        element = self._elements.get(locator)
+        if element is not None:
+            self.stats.hits += 1
+            return element
+
+        self.stats.misses += 1
+        element = WebDriverWait(self.driver, self.timeout).until(
+            EC.element_to_be_clickable(locator)
+        )
+        self._elements[locator] = element
+        return element
+
+    def click(self, locator: Locator) -> None:
+        """Click the element, re-resolving it once if the cached reference went stale."""
+        try:
+            self.find(locator).click()
+        except StaleElementReferenceException:
+            self.stats.stale += 1
+            self._elements.pop(locator, None)
+            logger.debug("Stale reference for %s, looking it up again", locator)
+            self.find(locator).click()
+        self._interacted("click")
+
+    def send_keys(self, locator: Locator, text: str) -> None:
+        try:
+            self.find(locator).send_keys(text)
+        except StaleElementReferenceException:
+            self.stats.stale += 1
+            self._elements.pop(locator, None)
+            self.find(locator).send_keys(text)
+        self._interacted("send_keys")
+
+    def invalidate(self, reason: str = "") -> None:
+        """Forget every cached reference."""
+        if self._elements:
+            self.stats.invalidations += 1
+            logger.debug("Element cache invalidated (%s)", reason or "manual")
+        self._elements.clear()
+
+    def enter_screen(self, name: str) -> None:
+        """Mark that the app is now on the named screen (used where there is no activity)."""
+        if name != self._screen:
+            self.invalidate(f"screen {self._screen} -> {name}")
+            self._screen = name
+
+    def sync_screen(self) -> None:
+        """
+        Re-read the current activity and drop the cache if it changed.
+
+        Call this after steps that may navigate (back, app switch, deep links).
+        On drivers without activities this only clears the cache.
+        """
+        try:
+            activity = self.driver.current_activity
+        except Exception:
+            self.invalidate("screen sync")
+            return
+        self.enter_screen(activity)
+
+    def set_orientation(self, orientation: str) -> None:
+        """Rotate the device and drop references laid out for the old orientation."""
+        self.driver.orientation = orientation
+        self.invalidate(f"orientation {orientation}")
+        self._interacted("orientation")
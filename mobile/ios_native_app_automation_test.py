@@ -13,16 +13,17 @@ import logging
 import pytest
 
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+from mobile.actions import ActionSequence
+from mobile.session import (
+    APP_RUNNING_IN_BACKGROUND,
+    APP_RUNNING_IN_BACKGROUND_SUSPENDED,
+    APP_RUNNING_IN_FOREGROUND,
 )
+from support.tracing import step
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,75 +41,78 @@ MOBILE_CAPS = {"build": "Ios Mobile Build", "name": "Ios Mobile Automation Test"
 
 
 @pytest.mark.parametrize("ios_driver", [MOBILE_CAPS], indirect=True)
+@pytest.mark.device_matrix
 class TestIOSNativeApp:
     """
     Test suite for iOS native app automation on LambdaTest real device cloud.
     This test demonstrates various interactions with the Proverbial iOS app.
     """
 
-    def test_app_launch_and_basic_interactions(self, ios_driver):
+    def test_app_launch_and_basic_interactions(self, ios_driver, element_cache, device_session):
         driver = ios_driver
-        wait = WebDriverWait(driver, 20)
+        elements = element_cache
+        session = device_session
 
         try:
             logger.info("iOS app launched successfully.")
 
             self._take_screenshot(driver, "ios_initial_screen.png")
-            self._log_device_info(driver)
+            self._log_device_info(session)
             self._log_battery_status(driver)
-            self._test_orientation(driver)
+            self._test_orientation(driver, session)
             self._test_swipe_gesture(driver)
-            self._test_navigation(driver, wait)
-            self._test_app_state_management(driver)
+            self._test_navigation(driver, elements)
+            self._test_app_state_management(session)
 
             self._take_screenshot(driver, "ios_final_screen.png")
 
         except Exception as e:
-            logger.error(f"Test failed with error: {e}")
+            logger.error("Test failed with error: %s", e)
             self._take_screenshot(driver, "ios_test_failure.png")
             raise
 
-    def _log_device_info(self, driver):
+    def _log_device_info(self, session):
+        caps = session.capabilities
         device_info = {
-            "platform_version": driver.capabilities.get("platformVersion"),
-            "device_manufacturer": driver.capabilities.get("deviceManufacturer"),
-            "device_model": driver.capabilities.get("deviceModel"),
-            "device_udid": driver.capabilities.get("udid"),
-            "automation_name": driver.capabilities.get("automationName"),
-            "app_package": driver.capabilities.get("appPackage"),
-            "app_activity": driver.capabilities.get("appActivity"),
+            "platform_version": caps.platform_version,
+            "device_manufacturer": caps.device_manufacturer,
+            "device_model": caps.device_model,
+            "device_udid": caps.udid,
+            "automation_name": caps.automation_name,
+            "bundle_id": caps.bundle_id,
         }
 
         logger.info("📱 Device Information:")
         for key, value in device_info.items():
             if value:
-                logger.info(f"{key.replace('_', ' ').title()}: {value}")
+                logger.info("%s: %s", key.replace("_", " ").title(), value)
 
     def _log_battery_status(self, driver):
         try:
             battery_info = driver.execute_script("mobile: batteryInfo")
             logger.info("Battery Status:")
-            logger.info(f"Level: {battery_info.get('level')}%")
-            logger.info(f"State: {battery_info.get('state')}")
+            logger.info("Level: %s%%", battery_info.get('level'))
+            logger.info("State: %s", battery_info.get('state'))
         except Exception as e:
-            logger.warning(f"Could not retrieve battery info: {e}")
+            logger.warning("Could not retrieve battery info: %s", e)
 
-    def _test_orientation(self, driver):
+    @step
+    def _test_orientation(self, driver, session):
         logger.info("Testing Orientation...")
 
         try:
-            current_orientation = driver.orientation
-            logger.info(f"Current orientation: {current_orientation}")
+            current_orientation = session.orientation
+            logger.info("Current orientation: %s", current_orientation)
 
             new_orientation = (
                 "LANDSCAPE" if current_orientation == "PORTRAIT" else "PORTRAIT"
             )
 
-            driver.orientation = new_orientation
-            logger.info(f"Changed orientation to: {new_orientation}")
+            session.set_orientation(new_orientation)
+            logger.info("Changed orientation to: %s", new_orientation)
             time.sleep(2)
 
-            assert driver.orientation == new_orientation, (
+            assert session.orientation == new_orientation, (
                 f"Failed to change orientation to {new_orientation}"
             )
 
@@ -116,12 +120,13 @@ class TestIOSNativeApp:
                 driver, f"ios_{new_orientation.lower()}_orientation.png"
             )
 
-            driver.orientation = current_orientation
-            logger.info(f"Returned to original orientation: {current_orientation}")
+            session.set_orientation(current_orientation)
+            logger.info("Returned to original orientation: %s", current_orientation)
 
         except Exception as e:
-            logger.warning(f"Orientation test failed: {e}")
+            logger.warning("Orientation test failed: %s", e)
 
+    @step
     def _test_swipe_gesture(self, driver):
         logger.info("Testing Swipe Gesture...")
 
@@ -131,104 +136,107 @@ class TestIOSNativeApp:
             start_y = int(size["height"] * 0.7)
             end_y = int(size["height"] * 0.3)
 
-            logger.info(f"Swiping from ({start_x}, {start_y}) to ({start_x}, {end_y})")
-            driver.swipe(start_x, start_y, start_x, end_y, 500)
+            logger.info("Swiping from (%s, %s) to (%s, %s)", start_x, start_y, start_x, end_y)
+            ActionSequence(driver).swipe(start_x, start_y, start_x, end_y, duration_ms=500).perform()
 
             self._take_screenshot(driver, "ios_after_swipe.png")
         except Exception as e:
-            logger.warning(f"Swipe gesture failed: {e}")
+            logger.warning("Swipe gesture failed: %s", e)
 
-    def _test_navigation(self, driver, wait):
+    @step
+    def _test_navigation(self, driver, elements):
         logger.info("Testing Navigation...")
 
         try:
-            wait.until(EC.element_to_be_clickable(AppElements.COLOUR_ELEMENT)).click()
+            elements.click(AppElements.COLOUR_ELEMENT)
             logger.info("Colour element clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.TEXT_ELEMENT)).click()
+            elements.click(AppElements.TEXT_ELEMENT)
             logger.info("Text element clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.TOAST_ELEMENT)).click()
+            elements.click(AppElements.TOAST_ELEMENT)
             logger.info("Toast element clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.HOME_ELEMENT)).click()
+            elements.click(AppElements.HOME_ELEMENT)
             logger.info("Home element clicked.")
 
 
             time.sleep(3)
 
-            wait.until(
-                EC.element_to_be_clickable(AppElements.GEOLOCATION_ELEMENT)
-            ).click()
+            elements.click(AppElements.GEOLOCATION_ELEMENT)
+            elements.enter_screen("geolocation")
             logger.info("Geolocation element clicked.")
             time.sleep(5)
 
-            wait.until(EC.element_to_be_clickable((AppiumBy.ID, "Back"))).click()
+            elements.click((AppiumBy.ID, "Back"))
+            elements.enter_screen("home")
             logger.info("Back button clicked.")
 
-            wait.until(
-                EC.element_to_be_clickable(AppElements.NOTIFICATION_ELEMENT)
-            ).click()
+            elements.click(AppElements.NOTIFICATION_ELEMENT)
             logger.info("Notification element clicked.")
             logger.info("Navigation test completed successfully.")
 
         except TimeoutException:
             logger.error("Navigation test skipped - element not found (Timeout).")
         except Exception as e:
-            logger.error(f"Navigation test error: {e}")
+            logger.error("Navigation test error: %s", e)
 
 
-    def _test_app_state_management(self, driver):
+    @step
+    def _test_app_state_management(self, session):
         logger.info("Testing App State Management on iOS...")
 
         try:
-            initial_app_state = driver.execute_script("mobile: queryAppState", {"bundleId": driver.capabilities.get('bundleId')})
-            logger.info(f"Initial app state: {initial_app_state} (4 = foreground, 2/3 = background)")
+            initial_app_state = session.app_state
+            logger.info("Initial app state: %s (4 = foreground, 2/3 = background)", initial_app_state)
 
             # Verify it's in the foreground initially (state 4)
-            if initial_app_state != 4:
-                logger.warning(f"App not in foreground initially (state: {initial_app_state}), trying to activate.")
-                driver.activate_app(driver.capabilities.get('bundleId'))
+            if initial_app_state != APP_RUNNING_IN_FOREGROUND:
+                logger.warning("App not in foreground initially (state: %s), trying to activate.", initial_app_state)
+                session.activate_app()
                 time.sleep(3)
-                initial_app_state = driver.execute_script("mobile: queryAppState", {"bundleId": driver.capabilities.get('bundleId')})
-                assert initial_app_state == 4, "Failed to activate app to foreground"
+                initial_app_state = session.app_state
+                assert initial_app_state == APP_RUNNING_IN_FOREGROUND, "Failed to activate app to foreground"
 
             # send app to background
             logger.info("Sending app to background.")
-            driver.background_app(-1)
+            session.background_app(-1)
             time.sleep(3)
 
             # Verify app is in background (state 2 or 3)
-            background_app_state = driver.execute_script("mobile: queryAppState", {"bundleId": driver.capabilities.get('bundleId')})
-            logger.info(f"App state after backgrounding: {background_app_state}")
-            assert background_app_state in [2, 3], "App not in background after background_app command"
+            background_app_state = session.app_state
+            logger.info("App state after backgrounding: %s", background_app_state)
+            assert background_app_state in [
+                APP_RUNNING_IN_BACKGROUND_SUSPENDED,
+                APP_RUNNING_IN_BACKGROUND,
+            ], "App not in background after background_app command"
 
             logger.info("Activating app to foreground.")
-            driver.activate_app(driver.capabilities.get('bundleId'))
+            session.activate_app()
             # driver.launch_app()
 
             time.sleep(5)
 
             # Verify app is back in foreground (state 4)
-            foreground_app_state = driver.execute_script("mobile: queryAppState", {"bundleId": driver.capabilities.get('bundleId')})
-            logger.info(f"App state after foregrounding: {foreground_app_state}")
-            assert foreground_app_state == 4, (
+            foreground_app_state = session.app_state
+            logger.info("App state after foregrounding: %s", foreground_app_state)
+            assert foreground_app_state == APP_RUNNING_IN_FOREGROUND, (
                 "App not in foreground after returning from background"
             )
 
             logger.info("App state verified after background/foreground cycle.")
 
         except Exception as e:
-            logger.warning(f"App state management failed: {e}")
+            logger.warning("App state management failed: %s", e)
 
 
     def _take_screenshot(self, driver, filename):
         try:
             driver.save_screenshot(filename)
-            logger.info(f"Screenshot saved as '{filename}'")
+            logger.info("Screenshot saved as '%s'", filename)
             return True
         except Exception as e:
-            logger.error(f"Failed to save screenshot '{filename}': {e}")
+            logger.error("Failed to save screenshot '%s': %s", filename, e)
             return False
 
 
@@ -13,16 +13,12 @@ import logging
 import pytest
 
 from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from mobile.actions import ActionSequence
+from support.tracing import step
+
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 
@@ -40,76 +36,81 @@ MOBILE_CAPS = {"build": "Android Mobile Build", "name": "Android Mobile Automati
 
 
 @pytest.mark.parametrize("android_driver", [MOBILE_CAPS], indirect=True)
+@pytest.mark.device_matrix
+@pytest.mark.device_perf(max_memory_mb=300, max_cpu_percent=90)
 class TestAndroidNativeApp:
     """
     Test suite for Android native app automation on LambdaTest real device cloud.
     This test demonstrates various interactions with the Proverbial Android app.
     """
 
-    def test_app_launch_and_basic_interactions(self, android_driver):
+    def test_app_launch_and_basic_interactions(self, android_driver, element_cache, device_session):
         driver = android_driver
-        wait = WebDriverWait(driver, 20)
+        elements = element_cache
+        session = device_session
 
         try:
             logger.info("Android app launched successfully.")
 
             self._take_screenshot(driver, "android_initial_screen.png")
-            self._log_device_info(driver)
+            self._log_device_info(session)
             self._log_battery_status(driver)
-            self._test_orientation(driver)
+            self._test_orientation(driver, session)
             self._test_swipe_gesture(driver)
-            self._test_navigation(driver, wait)
-            self._test_app_state_management(driver)
-            self._test_hardware_keys(driver)
+            self._test_navigation(elements, session)
+            self._test_app_state_management(session)
+            self._test_hardware_keys(session)
 
             self._take_screenshot(driver, "android_final_screen.png")
 
         except Exception as e:
-            logger.error(f"Test failed with error: {e}")
+            logger.error("Test failed with error: %s", e)
             self._take_screenshot(driver, "android_test_failure.png")
             raise
 
-    def _log_device_info(self, driver):
+    def _log_device_info(self, session):
+        caps = session.capabilities
         device_info = {
-            "platform_version": driver.capabilities.get("platformVersion"),
-            "device_manufacturer": driver.capabilities.get("deviceManufacturer"),
-            "device_model": driver.capabilities.get("deviceModel"),
-            "device_udid": driver.capabilities.get("udid"),
-            "automation_name": driver.capabilities.get("automationName"),
-            "app_package": driver.capabilities.get("appPackage"),
-            "app_activity": driver.capabilities.get("appActivity"),
+            "platform_version": caps.platform_version,
+            "device_manufacturer": caps.device_manufacturer,
+            "device_model": caps.device_model,
+            "device_udid": caps.udid,
+            "automation_name": caps.automation_name,
+            "app_package": caps.app_package,
+            "app_activity": caps.app_activity,
         }
 
         logger.info("Device Information:")
         for key, value in device_info.items():
             if value:
-                logger.info(f"{key.replace('_', ' ').title()}: {value}")
+                logger.info("%s: %s", key.replace("_", " ").title(), value)
 
     def _log_battery_status(self, driver):
         try:
             battery_info = driver.execute_script("mobile: batteryInfo")
             logger.info("Battery Status:")
-            logger.info(f"Level: {battery_info.get('level')}%")
-            logger.info(f"State: {battery_info.get('state')}")
+            logger.info("Level: %s%%", battery_info.get('level'))
+            logger.info("State: %s", battery_info.get('state'))
         except Exception as e:
-            logger.warning(f"Could not retrieve battery info: {e}")
+            logger.warning("Could not retrieve battery info: %s", e)
 
-    def _test_orientation(self, driver):
+    @step
+    def _test_orientation(self, driver, session):
         logger.info("Testing Orientation...")
 
         try:
-            current_orientation = driver.orientation
-            logger.info(f"Current orientation: {current_orientation}")
+            current_orientation = session.orientation
+            logger.info("Current orientation: %s", current_orientation)
 
             new_orientation = (
                 "LANDSCAPE" if current_orientation == "PORTRAIT" else "PORTRAIT"
             )
 
-            driver.orientation = new_orientation
-            logger.info(f"Changed orientation to: {new_orientation}")
+            session.set_orientation(new_orientation)
+            logger.info("Changed orientation to: %s", new_orientation)
             time.sleep(2)
 
-            assert driver.orientation == new_orientation, (
+            assert session.orientation == new_orientation, (
                 f"Failed to change orientation to {new_orientation}"
             )
 
@@ -117,12 +118,13 @@ class TestAndroidNativeApp:
                 driver, f"android_{new_orientation.lower()}_orientation.png"
             )
 
-            driver.orientation = current_orientation
-            logger.info(f"Returned to original orientation: {current_orientation}")
+            session.set_orientation(current_orientation)
+            logger.info("Returned to original orientation: %s", current_orientation)
 
         except Exception as e:
-            logger.warning(f"Orientation test failed: {e}")
+            logger.warning("Orientation test failed: %s", e)
 
+    @step
     def _test_swipe_gesture(self, driver):
         logger.info("Testing Swipe Gesture...")
 
@@ -132,100 +134,94 @@ class TestAndroidNativeApp:
             start_y = int(size["height"] * 0.7)
             end_y = int(size["height"] * 0.3)
 
-            logger.info(f"Swiping from ({start_x}, {start_y}) to ({start_x}, {end_y})")
-            driver.swipe(start_x, start_y, start_x, end_y, 500)
+            logger.info("Swiping from (%s, %s) to (%s, %s)", start_x, start_y, start_x, end_y)
+            ActionSequence(driver).swipe(start_x, start_y, start_x, end_y, duration_ms=500).perform()
 
             self._take_screenshot(driver, "android_after_swipe.png")
         except Exception as e:
-            logger.warning(f"Swipe gesture failed: {e}")
+            logger.warning("Swipe gesture failed: %s", e)
 
-    def _test_navigation(self, driver, wait):
+    @step
+    def _test_navigation(self, elements, session):
         logger.info("Testing Navigation...")
 
         try:
-            wait.until(EC.element_to_be_clickable(AppElements.COLOUR_ELEMENT)).click()
+            elements.click(AppElements.COLOUR_ELEMENT)
             logger.info("Colour element clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.TEXT_ELEMENT)).click()
+            elements.click(AppElements.TEXT_ELEMENT)
             logger.info("Text element clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.TOAST_ELEMENT)).click()
+            elements.click(AppElements.TOAST_ELEMENT)
             logger.info("Toast element clicked.")
 
-            wait.until(
-                EC.element_to_be_clickable(AppElements.NOTIFICATION_ELEMENT)
-            ).click()
+            elements.click(AppElements.NOTIFICATION_ELEMENT)
             logger.info("Notification element clicked.")
 
-            wait.until(
-                EC.element_to_be_clickable(AppElements.GEOLOCATION_ELEMENT)
-            ).click()
+            elements.click(AppElements.GEOLOCATION_ELEMENT)
             logger.info("Geolocation element clicked.")
             time.sleep(3)
 
-            driver.back()
+            session.back()
+            elements.enter_screen(session.current_activity)
             logger.info("Back button clicked.")
 
-            wait.until(EC.element_to_be_clickable(AppElements.HOME_ELEMENT)).click()
+            elements.click(AppElements.HOME_ELEMENT)
             logger.info("Navigation test completed successfully.")
 
         except TimeoutException:
             logger.error("Navigation test skipped - element not found (Timeout).")
         except Exception as e:
-            logger.error(f"Navigation test error: {e}")
+            logger.error("Navigation test error: %s", e)
 
-    def _test_app_state_management(self, driver):
+    @step
+    def _test_app_state_management(self, session):
         logger.info("Testing App State Management...")
 
         try:
-            current_activity = driver.current_activity
-            logger.info(f"Current activity: {current_activity}")
+            current_activity = session.current_activity
+            logger.info("Current activity: %s", current_activity)
 
-            driver.background_app(-1)
+            session.background_app(-1)
             logger.info("App sent to background.")
             time.sleep(2)
 
-            driver.activate_app(driver.capabilities["appPackage"])
+            session.activate_app()
             logger.info("App brought back to foreground.")
 
-            assert driver.current_activity == current_activity, (
+            assert session.current_activity == current_activity, (
                 "App not in the same activity after returning to foreground"
             )
 
             logger.info("App state verified after background/foreground cycle.")
 
         except Exception as e:
-            logger.warning(f"App state management failed: {e}")
+            logger.warning("App state management failed: %s", e)
 
-    def _test_hardware_keys(self, driver):
+    @step
+    def _test_hardware_keys(self, session):
         logger.info("Testing Hardware Keys...")
 
         try:
-            driver.press_keycode(4)  # BACK
-            logger.info("Pressed back key.")
-
-            time.sleep(1)
-            driver.press_keycode(3)  # HOME
-            logger.info("Pressed home key.")
-
-            time.sleep(1)
-            driver.press_keycode(187)  # APP_SWITCH (Recent apps)
-            logger.info("Opened recent apps.")
+            # BACK, HOME, APP_SWITCH (recent apps): hardware keys have no W3C key value,
+            # so this is one press_keycode request per key, 1s apart
+            requests = session.press_keycodes([4, 3, 187])
+            logger.info("Pressed back, home and recent apps keys in %s request(s).", requests)
 
             time.sleep(1)
-            driver.activate_app(driver.capabilities["appPackage"])
+            session.activate_app()
             logger.info("Returned to app.")
 
         except Exception as e:
-            logger.warning(f"Hardware key test failed: {e}")
+            logger.warning("Hardware key test failed: %s", e)
 
     def _take_screenshot(self, driver, filename):
         try:
             driver.save_screenshot(filename)
-            logger.info(f"Screenshot saved as '{filename}'")
+            logger.info("Screenshot saved as '%s'", filename)
             return True
         except Exception as e:
-            logger.error(f"Failed to save screenshot '{filename}': {e}")
+            logger.error("Failed to save screenshot '%s': %s", filename, e)
             return False
 
 
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Background Device Performance Sampler for Native App Tests
+
+Polls the app's resource use on a background thread while a native test runs:
+    - Android: driver.get_performance_data() for cpuinfo, memoryinfo and networkinfo
+    - iOS:     Appium has no polling equivalent of get_performance_data on real devices
+               (Instruments recordings are only returned after the run), so the sampler
+               records `mobile: batteryInfo` and the app state instead.
+
+The sampler's commands share the driver's command lock (mobile/session.py) with the
+test, so a sample is never sent while a test command is in flight, and a test command
+waits at most for one sample.
+
+Samples are stored as a compact table (one field list plus value rows) and every row is
+tagged with the test step that was running (see support/tracing.step), so memory and
+CPU can be attributed to e.g. _test_navigation.
+
+Each test's series is appended to device_perf/<app build>.jsonl. Thresholds come from
+the device_perf marker and builds can be compared from the command line:
+
+    @pytest.mark.device_perf(max_memory_mb=250, max_cpu_percent=80)
+    pytest mobile/ --device-perf --app-build=1.4.2
+    python -m mobile.perf_sampler compare 1.4.1 1.4.2
+"""
+
+import argparse
+import logging
+import os
+import re
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mobile.session import command_lock
+from support.jsonl import append_jsonl, read_jsonl
+from support.tracing import active_step
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERF_DIR = os.getenv("DEVICE_PERF_DIR", "device_perf")
+DEFAULT_INTERVAL = 5.0  # seconds
+
+ANDROID_FIELDS = ("cpu_percent", "memory_kb", "native_heap_kb", "rx_bytes", "tx_bytes")
+IOS_FIELDS = ("battery_level", "battery_state", "app_state")
+
+# Threshold name (device_perf marker keyword) -> (field, summary key, scale)
+THRESHOLDS = {
+    "max_memory_mb": ("memory_kb", "max", 1024),
+    "max_cpu_percent": ("cpu_percent", "max", 1),
+    "mean_cpu_percent": ("cpu_percent", "mean", 1),
+    "max_network_mb": ("network_bytes", "delta", 1024 * 1024),
+}
+# Compared between builds, with the smallest change that counts as a regression.
+COMPARED = {
+    ("memory_kb", "max"): 5 * 1024,
+    ("cpu_percent", "mean"): 5,
+    ("network_bytes", "delta"): 256 * 1024,
+}
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _columns(table: Optional[List[List[Any]]]) -> List[Dict[str, Any]]:
+    """get_performance_data returns [header, row, row...]; turn it into dicts."""
+    if not table or len(table) < 2:
+        return []
+    header = table[0]
+    return [dict(zip(header, row)) for row in table[1:]]
+
+
+def build_slug(build: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", build).strip("_") or "unknown"
+
+
+class DevicePerfSampler:
+    """Samples one Appium session at a fixed interval on a daemon thread."""
+
+    def __init__(
+        self,
+        driver,
+        platform: str,
+        package: str,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.driver = driver
+        self.platform = platform.lower()
+        self.package = package
+        self.interval = interval
+        self.fields = ANDROID_FIELDS if self.platform == "android" else IOS_FIELDS
+        self.rows: List[List[Any]] = []
+        self.errors = 0
+        self._lock = command_lock(driver)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._test_thread = threading.get_ident()
+        self._started_at = 0.0
+
+    def start(self) -> "DevicePerfSampler":
+        self._started_at = time.monotonic()
+        self._test_thread = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="device-perf", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 30)
+        # One last sample so short tests still get an end value.
+        self.sample()
+
+    def _run(self) -> None:
+        self.sample()
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _android_values(self) -> List[Optional[float]]:
+        cpu = _columns(self.driver.get_performance_data(self.package, "cpuinfo", 5))
+        memory = _columns(self.driver.get_performance_data(self.package, "memoryinfo", 5))
+        network = _columns(self.driver.get_performance_data(self.package, "networkinfo", 5))
+
+        cpu_percent = None
+        if cpu:
+            parts = [_number(cpu[0].get(key)) for key in ("user", "kernel")]
+            cpu_percent = sum(p for p in parts if p is not None)
+        memory_kb = _number(memory[0].get("totalPss")) if memory else None
+        native_heap_kb = _number(memory[0].get("nativeHeapAllocatedSize")) if memory else None
+        rx = sum(_number(row.get("rxBytes")) or 0 for row in network) if network else None
+        tx = sum(_number(row.get("txBytes")) or 0 for row in network) if network else None
+        return [cpu_percent, memory_kb, native_heap_kb, rx, tx]
+
+    def _ios_values(self) -> List[Optional[float]]:
+        battery = self.driver.execute_script("mobile: batteryInfo") or {}
+        app_state = self.driver.query_app_state(self.package)
+        return [_number(battery.get("level")), _number(battery.get("state")), _number(app_state)]
+
+    def sample(self) -> None:
+        try:
+            # One sample's commands run back to back, between the test's commands.
+            with self._lock:
+                values = self._android_values() if self.platform == "android" else self._ios_values()
+        except Exception as e:
+            # The session may be busy or gone; a missed sample is not a test failure.
+            self.errors += 1
+            logger.debug("Device performance sample failed: %s", e)
+            return
+        elapsed = round(time.monotonic() - self._started_at, 2)
+        self.rows.append([elapsed, active_step(self._test_thread)] + values)
+
+    def series(self, field: str, step: Optional[str] = None) -> List[float]:
+        index = self.fields.index(field) + 2
+        return [
+            row[index]
+            for row in self.rows
+            if row[index] is not None and (step is None or row[1] == step)
+        ]
+
+    def _stats(self, step: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        stats: Dict[str, Dict[str, float]] = {}
+        for field in self.fields:
+            values = self.series(field, step)
+            if values:
+                stats[field] = {"max": max(values), "mean": statistics.fmean(values)}
+        if self.platform == "android":
+            rx, tx = self.series("rx_bytes", step), self.series("tx_bytes", step)
+            if rx and tx:
+                stats["network_bytes"] = {"delta": (rx[-1] - rx[0]) + (tx[-1] - tx[0])}
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        """Whole-test stats plus the same stats per step."""
+        steps = sorted({row[1] for row in self.rows if row[1]})
+        return {
+            "samples": len(self.rows),
+            "errors": self.errors,
+            "overall": self._stats(),
+            "steps": {step: self._stats(step) for step in steps},
+        }
+
+    def violations(self, **thresholds: float) -> List[str]:
+        overall = self._stats()
+        problems = []
+        for name, limit in thresholds.items():
+            if name not in THRESHOLDS:
+                raise ValueError(f"Unknown device_perf threshold {name!r}; use one of {sorted(THRESHOLDS)}")
+            field, key, scale = THRESHOLDS[name]
+            value = overall.get(field, {}).get(key)
+            if value is not None and value / scale > limit:
+                problems.append(f"{name}={limit:g} exceeded: {value / scale:.1f}")
+        return problems
+
+    def as_record(self, test: str, build: str) -> Dict[str, Any]:
+        return {
+            "test": test,
+            "build": build,
+            "platform": self.platform,
+            "interval": self.interval,
+            "time": time.time(),
+            "fields": ["t", "step"] + list(self.fields),
+            "rows": self.rows,
+            "summary": self.summary(),
+        }
+
+
+class DevicePerfStore:
+    """One JSON lines file per app build under the device_perf directory."""
+
+    def __init__(self, directory: str = DEFAULT_PERF_DIR):
+        self.directory = directory
+
+    def path(self, build: str) -> str:
+        return os.path.join(self.directory, f"{build_slug(build)}.jsonl")
+
+    def append(self, record: Dict[str, Any]) -> None:
+        append_jsonl(self.path(record["build"]), [record], compact=True)
+
+    def load(self, build: str) -> List[Dict[str, Any]]:
+        try:
+            return read_jsonl(self.path(build))
+        except OSError:
+            return []
+
+
+def _medians(records: List[Dict[str, Any]]) -> Dict[Tuple[str, ...], float]:
+    """Median of each compared stat per (test, platform, step); step "" is the whole test."""
+    values: Dict[Tuple[str, ...], List[float]] = {}
+    for record in records:
+        scopes = [("", record["summary"]["overall"])] + list(record["summary"]["steps"].items())
+        for step, stats in scopes:
+            for field, key in COMPARED:
+                value = stats.get(field, {}).get(key)
+                if value is not None:
+                    values.setdefault((record["test"], record["platform"], step, field, key), []).append(value)
+    return {k: statistics.median(v) for k, v in values.items()}
+
+
+def compare_builds(
+    baseline: List[Dict[str, Any]],
+    current: List[Dict[str, Any]],
+    tolerance: float = 0.15,
+) -> List[str]:
+    before, after = _medians(baseline), _medians(current)
+    regressions = []
+    for key in sorted(after):
+        if key not in before:
+            continue
+        test, platform, step, field, stat = key
+        floor = COMPARED[(field, stat)]
+        if after[key] - before[key] > max(floor, before[key] * tolerance):
+            where = f"{test} [{platform}]" + (f" {step}" if step else "")
+            regressions.append(f"{where}: {stat} {field} {before[key]:.1f} -> {after[key]:.1f}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare app resource use between builds")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compare_cmd = sub.add_parser("compare", help="Report regressions of a build against a baseline build")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--dir", default=DEFAULT_PERF_DIR)
+    compare_cmd.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative increase")
+    args = parser.parse_args()
+
+    store = DevicePerfStore(args.dir)
+    baseline, current = store.load(args.baseline), store.load(args.current)
+    if not baseline or not current:
+        print(f"No samples for {args.baseline if not baseline else args.current} in {args.dir}")
+        return 2
+    regressions = compare_builds(baseline, current, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions from {args.baseline} to {args.current}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
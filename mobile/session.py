@@ -0,0 +1,237 @@
+"""
+Typed Device Session Facade
+
+The native tests used to read driver.capabilities.get(...) field by field and query the
+app state, activity and orientation again every time they needed them, one remote
+round trip each. DeviceSession wraps the Appium driver:
+    - capabilities are snapshotted once into a typed DeviceCapabilities
+    - app_state, current_activity, orientation and contexts are memoized for a short TTL
+    - state-changing commands issued through the session (background/activate/terminate
+      app, back, hardware keys, rotation, switching to a webview) drop the memoized
+      values they affect and the element cache, so a read after a change always goes
+      to the device; so do clicks, typing and rotations through the ElementCache passed
+      as elements, which can navigate or background the app as well
+    - stats count the remote queries made and the ones answered from memory
+
+command_lock(driver) serializes every command sent through the driver, so background
+pollers (device performance sampler, device log streamer) never have a request in
+flight while the test thread issues one.
+
+Selenium is only imported by the commands that need it, so importing this module does
+not load it.
+
+Usage:
+    session = DeviceSession(driver, elements=element_cache)
+    logger.info(session.capabilities.platform_version)
+    session.background_app(-1)
+    session.activate_app()
+    assert session.app_state == APP_RUNNING_IN_FOREGROUND
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 2.0  # seconds
+
+# Appium queryAppState values
+APP_NOT_INSTALLED = 0
+APP_NOT_RUNNING = 1
+APP_RUNNING_IN_BACKGROUND_SUSPENDED = 2
+APP_RUNNING_IN_BACKGROUND = 3
+APP_RUNNING_IN_FOREGROUND = 4
+
+
+def command_lock(driver) -> threading.RLock:
+    """
+    The lock every command of this driver runs under, installed on first use.
+
+    Hold it around a group of commands (e.g. one performance sample) to keep the test
+    thread's commands from running in between.
+    """
+    lock = getattr(driver, "_command_lock", None)
+    if lock is None:
+        lock = threading.RLock()
+        execute = driver.execute
+
+        def locked_execute(*args, **kwargs):
+            with lock:
+                return execute(*args, **kwargs)
+
+        driver.execute = locked_execute
+        driver._command_lock = lock
+    return lock
+
+
+class DeviceCapabilities(NamedTuple):
+    platform_name: Optional[str]
+    platform_version: Optional[str]
+    device_name: Optional[str]
+    device_manufacturer: Optional[str]
+    device_model: Optional[str]
+    udid: Optional[str]
+    automation_name: Optional[str]
+    app_package: Optional[str]
+    app_activity: Optional[str]
+    bundle_id: Optional[str]
+
+    @classmethod
+    def from_dict(cls, caps: Dict[str, Any]) -> "DeviceCapabilities":
+        def get(name: str) -> Optional[str]:
+            # Appium returns some capabilities with the "appium:" vendor prefix.
+            return caps.get(name, caps.get(f"appium:{name}"))
+
+        return cls(
+            platform_name=get("platformName"),
+            platform_version=get("platformVersion"),
+            device_name=get("deviceName"),
+            device_manufacturer=get("deviceManufacturer"),
+            device_model=get("deviceModel"),
+            udid=get("udid"),
+            automation_name=get("automationName"),
+            app_package=get("appPackage"),
+            app_activity=get("appActivity"),
+            bundle_id=get("bundleId"),
+        )
+
+
+class SessionStats:
+    """Remote state queries made vs. answered from the memo."""
+
+    def __init__(self):
+        self.remote_calls = 0
+        self.avoided_calls = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "remote_calls": self.remote_calls,
+            "avoided_calls": self.avoided_calls,
+            "invalidations": self.invalidations,
+        }
+
+    def __repr__(self) -> str:
+        return f"SessionStats({self.as_dict()})"
+
+
+class DeviceSession:
+    """Appium driver facade with a capability snapshot and short-lived state memo."""
+
+    def __init__(
+        self,
+        driver,
+        platform: Optional[str] = None,
+        app_id: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        elements=None,
+    ):
+        self.driver = driver
+        self.capabilities = DeviceCapabilities.from_dict(dict(driver.capabilities))
+        self.platform = (platform or self.capabilities.platform_name or "").lower()
+        self.app_id = app_id or self.capabilities.app_package or self.capabilities.bundle_id
+        self.ttl = ttl
+        self.elements = elements
+        self.stats = SessionStats()
+        self._memo: Dict[str, tuple] = {}
+        if elements is not None:
+            elements.add_listener(self._element_command)
+
+    # Memoized reads
+    def _read(self, key: str, fetch: Callable[[], Any]) -> Any:
+        cached = self._memo.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            self.stats.avoided_calls += 1
+            return cached[0]
+        self.stats.remote_calls += 1
+        value = fetch()
+        self._memo[key] = (value, time.monotonic())
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        """Forget memoized values (all of them when no key is given)."""
+        for key in keys or list(self._memo):
+            if self._memo.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    @property
+    def app_state(self) -> int:
+        return self._read("app_state", lambda: self.driver.query_app_state(self.app_id))
+
+    @property
+    def current_activity(self) -> Optional[str]:
+        if self.platform != "android":
+            return None
+        return self._read("activity", lambda: self.driver.current_activity)
+
+    @property
+    def orientation(self) -> str:
+        return self._read("orientation", lambda: self.driver.orientation)
+
+    @property
+    def contexts(self) -> List[str]:
+        return self._read("contexts", lambda: self.driver.contexts)
+
+    def wait_for_app_state(self, expected: Sequence[int], timeout: float = 10.0, interval: float = 0.5) -> int:
+        """Poll the device (bypassing the memo) until the app reaches one of `expected`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.invalidate("app_state")
+            state = self.app_state
+            if state in expected or time.monotonic() > deadline:
+                return state
+            time.sleep(interval)
+
+    # State-changing commands
+    def _element_command(self, kind: str) -> None:
+        """Commands issued through the element cache, which has already dropped what it needs to."""
+        self.invalidate("orientation" if kind == "orientation" else "activity", "app_state")
+
+    def _changed(self, *keys: str, screen: bool = True) -> None:
+        self.invalidate(*keys)
+        if screen and self.elements is not None:
+            self.elements.invalidate("device state changed")
+
+    def set_orientation(self, orientation: str) -> None:
+        self.driver.orientation = orientation
+        self._changed("orientation")
+
+    def background_app(self, seconds: int = -1) -> None:
+        self.driver.background_app(seconds)
+        self._changed("app_state", "activity")
+
+    def activate_app(self) -> None:
+        self.driver.activate_app(self.app_id)
+        self._changed("app_state", "activity")
+
+    def terminate_app(self) -> None:
+        self.driver.terminate_app(self.app_id)
+        self._changed("app_state", "activity")
+
+    def back(self) -> None:
+        self.driver.back()
+        self._changed("activity")
+
+    def switch_to_webview(self, timeout: int = 20) -> str:
+        """Wait until the app exposes a WEBVIEW context, switch to it and return its name."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        def webview(_driver) -> Optional[str]:
+            self.invalidate("contexts")
+            return next((c for c in self.contexts if c.startswith("WEBVIEW")), None)
+
+        context = WebDriverWait(self.driver, timeout).until(webview)
+        self.driver.switch_to.context(context)
+        self._changed("contexts", "activity")
+        return context
+
+    def press_keycodes(self, keycodes: Sequence[int], pause_ms: int = 1000) -> int:
+        """mobile.actions.press_keycodes: hardware buttons are pressed one request at a time."""
+        from mobile.actions import press_keycodes
+
+        requests = press_keycodes(self.driver, keycodes, pause_ms)
+        self._changed("app_state", "activity")
+        return requests
+
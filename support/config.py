@@ -0,0 +1,29 @@
+"""
+Shared Test Configuration
+
+LambdaTest credentials (from the environment or a .env file) and the settings used by
+both the web and the mobile pytest plugins.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# LambdaTest credentials
+LT_USERNAME = os.getenv("LT_USERNAME")
+LT_ACCESS_KEY = os.getenv("LT_ACCESS_KEY")
+
+
+# Common test configurations
+class TestConfig:
+    # Web test configurations
+    WEB_TEST_TIMEOUT = 60000  # 30 seconds
+    SCREENSHOT_ON_FAILURE = True
+
+    # Mobile test configurations
+    ANDROID_APP_URL = os.getenv("ANDROID_APP_URL", "YOUR_ANDROID_APP_URL")
+    IOS_APP_URL = os.getenv("IOS_APP_URL", "YOUR_IOS_APP_URL")
+    ANDROID_APP_PACKAGE = "com.lambdatest.proverbial"
+    IOS_BUNDLE_ID = "com.lambdatest.proverbial"
@@ -0,0 +1,42 @@
+"""
+Cross-Process File Lock
+
+xdist workers (and parallel runs on one machine) share cache directories. file_lock()
+serializes a critical section across those processes with an exclusive lock on a
+sidecar file, e.g. so only one worker primes a storage state or rewrites a history file
+while the others wait and then read its result.
+
+Usage:
+    with file_lock(os.path.join(cache_dir, "entry.json.lock")):
+        ...
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path (created if missing) for the duration of the block."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
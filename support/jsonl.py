@@ -0,0 +1,37 @@
+"""
+Shared JSON Lines Files
+
+The per-run reports (page metrics, browser memory, role query timings, locator calls,
+device performance) are JSON lines files that every xdist worker appends to.
+append_jsonl() writes a batch of records as one write() on a descriptor opened with
+O_APPEND, so records of concurrent workers never interleave.
+
+Usage:
+    append_jsonl("perf_metrics/run-<id>.jsonl", [{"test": nodeid, "lcp_ms": 812.4}])
+    records = read_jsonl("perf_metrics/run-<id>.jsonl")
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List
+
+
+def append_jsonl(path: str, records: Iterable[Dict[str, Any]], compact: bool = False) -> None:
+    """Append records to path (created with its directory if missing), one JSON object per line."""
+    separators = (",", ":") if compact else None
+    data = "".join(json.dumps(record, separators=separators) + "\n" for record in records).encode("utf-8")
+    if not data:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
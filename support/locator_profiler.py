@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Locator Cost Profiler
+
+Times every locator resolution and element action of a test and ranks the selectors
+that cost the most, so slow ones (text=, :has(), deep XPath) can be found and replaced.
+Opt-in with --locator-profile; it records while lt_page or an Appium driver fixture
+(android_driver / ios_driver) is in use.
+
+Recorded per call:
+    - Playwright (Locator and Page actions, expect() assertions): before an action that
+      waits for its element, the selector is resolved with count() until it matches
+      (polling every 100 ms, up to 5 s). The last count() is the resolution time, the
+      polls before it are retries, then the action itself is timed. count(), is_visible()
+      and the like are resolutions on their own. The strategy comes from the selector
+      (role, text, label, placeholder, css, css :has, xpath, ...).
+    - Appium: every find_element / find_elements, with the By strategy. Failed finds of
+      a WebDriverWait poll are retries of the find that finally succeeds; stale cached
+      elements that ElementCache had to look up again count as retries too. Clicks and
+      send_keys through ElementCache are timed as actions.
+
+Calls are appended to locator_profiles/locators-<run id>.jsonl (shared by xdist
+workers) and aggregated per selector and strategy: calls, median / p95 resolution,
+retries, time waiting for the selector to match, and total time. The report ranks
+selectors by total time and flags outliers, whose median resolution or mean retries
+are far above those of the other selectors (median + 3 scaled MADs).
+
+Usage:
+    pytest web/ --locator-profile --locator-profile-top=15
+    python -m support.locator_profiler report locator_profiles/locators-<run id>.jsonl
+"""
+
+import argparse
+import functools
+import os
+import re
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from support.jsonl import append_jsonl, read_jsonl
+
+DEFAULT_PROFILE_DIR = os.getenv("LOCATOR_PROFILE_DIR", "locator_profiles")
+DEFAULT_TOP = 20
+POLL_MS = 100
+PROBE_TIMEOUT = 5.0  # seconds; after that the action does its own waiting
+# Smallest distance above the typical selector that counts as an outlier.
+SLOW_FLOOR_MS = 25.0
+RETRY_FLOOR = 1.0
+
+# Playwright methods that wait for their element (probed first) and that resolve at once.
+WAITING_METHODS = (
+    "click", "dblclick", "fill", "press", "type", "press_sequentially", "check", "uncheck",
+    "hover", "tap", "select_option", "set_input_files", "focus", "text_content",
+    "inner_text", "inner_html", "get_attribute", "input_value", "bounding_box",
+    "scroll_into_view_if_needed",
+)
+IMMEDIATE_METHODS = ("count", "is_visible", "is_hidden", "all_inner_texts", "all_text_contents")
+# Timed as a whole: they wait for states other than "matches" (hidden, a count, a text).
+POLLING_METHODS = ("wait_for",)
+PAGE_IMMEDIATE_METHODS = ("is_visible", "is_hidden", "query_selector")
+PAGE_POLLING_METHODS = ("wait_for_selector",)
+ASSERTION_METHODS = (
+    "to_be_visible", "to_be_hidden", "to_be_enabled", "to_be_disabled", "to_be_checked",
+    "to_be_editable", "to_be_focused", "to_have_text", "to_contain_text", "to_have_count",
+    "to_have_value", "to_have_attribute", "to_have_class",
+)
+
+_active: Optional["LocatorProfiler"] = None
+_instrumented = False
+
+
+def _ms(since: float) -> float:
+    return (time.perf_counter() - since) * 1000
+
+
+def strategy(selector: str) -> str:
+    """Selector engine(s) of a Playwright selector, e.g. 'role', 'css :has' or 'css > text'."""
+    parts = []
+    for part in re.split(r"\s+>>\s+", selector):
+        if part.startswith("internal:role="):
+            kind = "role"
+        elif part.startswith(("internal:text=", "text=", "internal:has-text=")) or part.startswith('"'):
+            kind = "text"
+        elif part.startswith("internal:label="):
+            kind = "label"
+        elif part.startswith("internal:attr=[placeholder"):
+            kind = "placeholder"
+        elif part.startswith("internal:attr=[title"):
+            kind = "title"
+        elif part.startswith("internal:attr=[alt"):
+            kind = "alt"
+        elif part.startswith(("internal:testid=", "data-testid=")):
+            kind = "testid"
+        elif part.startswith(("xpath=", "//", "..")):
+            kind = "xpath"
+        elif part.startswith(("nth=", "internal:nth=")):
+            continue
+        elif "data-role-ref=" in part:
+            kind = "role snapshot"
+        elif ":has(" in part or ":has-text(" in part or ":text(" in part:
+            kind = "css :has"
+        elif re.fullmatch(r"#[\w-]+", part.replace("css=", "")):
+            kind = "css id"
+        else:
+            kind = "css"
+        parts.append(kind)
+    return " > ".join(parts) or "css"
+
+
+class LocatorProfiler:
+    """Locator calls of one test, recorded while it is the active profiler."""
+
+    def __init__(self, test: str):
+        self.test = test
+        self.calls: List[Dict[str, Any]] = []
+        self.busy = False
+        # Appium finds that failed so far, per (by, value): (count, first failure time).
+        self._missed: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+    def start(self) -> "LocatorProfiler":
+        global _active
+        instrument()
+        _active = self
+        return self
+
+    def stop(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+        for by, value in list(self._missed):
+            self.flush_missed(by, value)
+
+    def record(
+        self,
+        platform: str,
+        strategy_name: str,
+        selector: str,
+        op: str,
+        resolve_ms: Optional[float] = None,
+        wait_ms: float = 0.0,
+        action_ms: Optional[float] = None,
+        retries: int = 0,
+        matched: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        call = {
+            "test": self.test,
+            "platform": platform,
+            "strategy": strategy_name,
+            "selector": selector,
+            "op": op,
+            "resolve_ms": resolve_ms,
+            "wait_ms": wait_ms,
+            "action_ms": action_ms,
+            "retries": retries,
+            "matched": matched,
+            "error": error,
+        }
+        self.calls.append(call)
+        return call
+
+    def find_missed(self, by: str, value: str) -> None:
+        misses, since = self._missed.get((by, value), (0, time.perf_counter()))
+        self._missed[(by, value)] = (misses + 1, since)
+
+    def flush_missed(self, by: str, value: str) -> None:
+        """Record a find that never succeeded, e.g. an element that did not show up in time."""
+        if (by, value) not in self._missed:
+            return
+        misses, since = self._missed.pop((by, value))
+        self.record("appium", by, value, "find", wait_ms=_ms(since), retries=misses - 1,
+                    matched=0, error="NoSuchElementException")
+
+    def find_done(self, by: str, value: str, resolve_ms: float, matched: int) -> None:
+        misses, since = self._missed.pop((by, value), (0, None))
+        wait_ms = _ms(since) - resolve_ms if since is not None else 0.0
+        self.record("appium", by, value, "find", resolve_ms, wait_ms=wait_ms, retries=misses, matched=matched)
+
+    def write(self, path: str) -> None:
+        append_jsonl(path, self.calls)
+
+
+def _probe(locator) -> Tuple[int, float, float, int]:
+    """Resolve until the locator matches: (matches, resolution ms, wait ms, retries)."""
+    started = time.perf_counter()
+    retries = 0
+    while True:
+        resolved = time.perf_counter()
+        matched = locator.count()
+        resolve_ms = _ms(resolved)
+        if matched or time.perf_counter() - started > PROBE_TIMEOUT:
+            return matched, resolve_ms, _ms(started) - resolve_ms, retries
+        retries += 1
+        locator.page.wait_for_timeout(POLL_MS)
+
+
+def _selector(locator) -> str:
+    impl = getattr(locator, "_impl_obj", locator)
+    return getattr(impl, "_selector", None) or repr(locator)
+
+
+def _own_locator(self, args, kwargs):
+    return self
+
+
+def _page_locator(page, args, kwargs):
+    selector = args[0] if args else kwargs.get("selector")
+    return page.locator(selector) if isinstance(selector, str) else None
+
+
+def _asserted_locator(assertions, args, kwargs):
+    return getattr(assertions._impl_obj, "_actual_locator", None)
+
+
+def _profiled(func: Callable, op: str, get_locator: Callable, kind: str) -> Callable:
+    """Wrap a Playwright method; kind is 'waiting', 'immediate' or 'polling'."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = _active
+        if profiler is None or profiler.busy:
+            return func(self, *args, **kwargs)
+        locator = get_locator(self, args, kwargs)
+        if locator is None:
+            return func(self, *args, **kwargs)
+        selector = _selector(locator)
+        profiler.busy = True
+        resolve_ms = matched = None
+        wait_ms, retries, error = 0.0, 0, None
+        try:
+            if kind == "waiting":
+                matched, resolve_ms, wait_ms, retries = _probe(locator)
+            started = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                elapsed = _ms(started)
+                if kind == "immediate":
+                    resolve_ms, action_ms = elapsed, None
+                else:
+                    action_ms = elapsed
+                profiler.record("playwright", strategy(selector), selector, op, resolve_ms, wait_ms,
+                                action_ms, retries, matched, error)
+        finally:
+            profiler.busy = False
+
+    return wrapper
+
+
+def _profiled_find(func: Callable, op: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return func(self, *args, **kwargs)
+        by = args[0] if args else kwargs.get("by", "id")
+        value = args[1] if len(args) > 1 else kwargs.get("value")
+        started = time.perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception as e:
+            if type(e).__name__ == "NoSuchElementException":
+                profiler.find_missed(by, value)
+            raise
+        profiler.find_done(by, value, _ms(started), len(result) if isinstance(result, list) else 1)
+        return result
+
+    return wrapper
+
+
+def _profiled_cached_action(func: Callable, op: str) -> Callable:
+    """ElementCache.click / send_keys: the action time, excluding the finds it made."""
+
+    @functools.wraps(func)
+    def wrapper(self, locator, *args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return func(self, locator, *args, **kwargs)
+        first_call = len(profiler.calls)
+        stale = self.stats.stale
+        started = time.perf_counter()
+        error = None
+        try:
+            return func(self, locator, *args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = _ms(started)
+            if error:
+                profiler.flush_missed(*locator)
+            finds = profiler.calls[first_call:]
+            find_ms = sum((c["resolve_ms"] or 0.0) + c["wait_ms"] for c in finds)
+            by, value = locator
+            profiler.record("appium", by, value, op, action_ms=max(elapsed - find_ms, 0.0),
+                            retries=self.stats.stale - stale, error=error)
+
+    return wrapper
+
+
+def instrument() -> None:
+    """Wrap Playwright and Appium lookup and action methods once; no-ops while no profiler is active."""
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    try:
+        from playwright import sync_api
+    except ImportError:
+        sync_api = None
+    if sync_api is not None:
+        for cls, methods, get_locator, prefix in (
+            (sync_api.Locator, [(m, "waiting") for m in WAITING_METHODS], _own_locator, ""),
+            (sync_api.Locator, [(m, "immediate") for m in IMMEDIATE_METHODS], _own_locator, ""),
+            (sync_api.Locator, [(m, "polling") for m in POLLING_METHODS], _own_locator, ""),
+            (sync_api.Page, [(m, "waiting") for m in WAITING_METHODS], _page_locator, "page."),
+            (sync_api.Page, [(m, "immediate") for m in PAGE_IMMEDIATE_METHODS], _page_locator, "page."),
+            (sync_api.Page, [(m, "polling") for m in PAGE_POLLING_METHODS], _page_locator, "page."),
+            (sync_api.LocatorAssertions, [(m, "polling") for m in ASSERTION_METHODS], _asserted_locator, "expect."),
+        ):
+            for method, kind in methods:
+                original = getattr(cls, method, None)
+                if original is not None:
+                    setattr(cls, method, _profiled(original, prefix + method, get_locator, kind))
+
+    try:
+        from appium.webdriver.webdriver import WebDriver
+    except ImportError:
+        try:
+            from selenium.webdriver.remote.webdriver import WebDriver
+        except ImportError:
+            return
+    WebDriver.find_element = _profiled_find(WebDriver.find_element, "find")
+    WebDriver.find_elements = _profiled_find(WebDriver.find_elements, "find")
+
+    from mobile.element_cache import ElementCache
+
+    ElementCache.click = _profiled_cached_action(ElementCache.click, "click")
+    ElementCache.send_keys = _profiled_cached_action(ElementCache.send_keys, "send_keys")
+
+
+def load_calls(path: str) -> List[Dict[str, Any]]:
+    return read_jsonl(path)
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def aggregate(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One row per (platform, strategy, selector), ranked by total time, with outlier flags."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for call in calls:
+        groups.setdefault((call["platform"], call["strategy"], call["selector"]), []).append(call)
+
+    rows = []
+    for (platform, strategy_name, selector), group in groups.items():
+        resolves = [c["resolve_ms"] for c in group if c["resolve_ms"] is not None]
+        rows.append(
+            {
+                "platform": platform,
+                "strategy": strategy_name,
+                "selector": selector,
+                "calls": len(group),
+                "resolve_p50": statistics.median(resolves) if resolves else None,
+                "resolve_p95": _percentile(resolves, 0.95),
+                "retries": sum(c["retries"] for c in group),
+                "mean_retries": sum(c["retries"] for c in group) / len(group),
+                "wait_ms": sum(c["wait_ms"] for c in group),
+                "total_ms": sum((c["resolve_ms"] or 0.0) + c["wait_ms"] + (c["action_ms"] or 0.0) for c in group),
+                "errors": sum(1 for c in group if c["error"]),
+                "flags": [],
+            }
+        )
+
+    for field, floor, flag in (("resolve_p50", SLOW_FLOOR_MS, "slow"), ("mean_retries", RETRY_FLOOR, "retries")):
+        values = [row[field] for row in rows if row[field] is not None]
+        if len(values) < 3:
+            continue
+        median = statistics.median(values)
+        mad = statistics.median(abs(value - median) for value in values)
+        limit = median + max(3 * 1.4826 * mad, floor)
+        for row in rows:
+            if row[field] is not None and row[field] > limit:
+                row["flags"].append(flag)
+    for row in rows:
+        if row["errors"]:
+            row["flags"].append("errors")
+
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def ranked_report(path: str, top: int = DEFAULT_TOP) -> List[str]:
+    rows = aggregate(load_calls(path))
+    lines = [
+        f"{'#':>3} {'total ms':>9} {'calls':>5} {'p50 ms':>7} {'p95 ms':>7} {'retries':>7} "
+        f"{'strategy':<14} selector"
+    ]
+    for rank, row in enumerate(rows[:top], start=1):
+        flags = f"  [{', '.join(row['flags'])}]" if row["flags"] else ""
+        lines.append(
+            f"{rank:>3} {row['total_ms']:>9.0f} {row['calls']:>5} {_fmt(row['resolve_p50']):>7} "
+            f"{_fmt(row['resolve_p95']):>7} {row['retries']:>7} {row['strategy'][:14]:<14} "
+            f"{row['selector'][:80]}{flags}"
+        )
+    outliers = [(rank, row) for rank, row in enumerate(rows, start=1) if row["flags"]]
+    for rank, row in outliers:
+        if rank > top:
+            lines.append(f"#{rank} {row['selector'][:80]} [{', '.join(row['flags'])}]")
+    lines.append(f"{len(rows)} selectors, {len(outliers)} outliers")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rank locators by their cost in a test run")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="Ranked selector report of one run")
+    report_cmd.add_argument("run")
+    report_cmd.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args()
+
+    for line in ranked_report(args.run, args.top):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
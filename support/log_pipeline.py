@@ -0,0 +1,257 @@
+"""
+Non-Blocking Structured Logging for Parallel Runs
+
+Test modules used to call logging.basicConfig() each, so every record was formatted and
+written to stderr on the thread that logged it; with -n 16 those synchronous writes
+interleave and slow the tests down. LogPipeline replaces that with one setup per
+process (the controller or an xdist worker):
+
+    test thread                         listener thread
+    logger.info("Clicked %s", name)
+      -> SamplingFilter                 (drops most records of chatty loggers)
+      -> ContextQueueHandler            (tags worker / test / step, no formatting)
+      -> queue  ----------------------> QueueListener
+                                          -> <run dir>/<worker>.jsonl
+                                          -> <run dir>/tests/<test>.jsonl (kept on failure)
+
+Records are formatted only on the listener thread, as JSON lines:
+
+    {"ts": 1729339200.123, "level": "INFO", "logger": "web.backends", "msg": "...",
+     "worker": "gw3", "test": "web/x_test.py::test_y[lt_browser0]", "step": "search",
+     "thread": "MainThread"}
+
+Because formatting is deferred, log with %-style arguments (logger.info("x=%s", x))
+on hot paths so nothing is built for records that are sampled out or filtered.
+The argument objects are formatted later, on the listener thread, so do not mutate
+them right after logging.
+
+Sampling is configured per logger name (prefix match), e.g. "selenium=0.1" keeps one
+DEBUG/INFO record in ten from selenium.*; warnings and errors are always kept.
+
+The pipeline is opt-in (--log-pipeline). Each run writes logs/run-<id>/; the controller
+deletes all but the newest --log-keep-runs run directories when it starts.
+
+Usage:
+    pytest web/ -n 16 --log-pipeline --log-sample="urllib3=0.05,web.snapshot_server=0.2"
+    pytest web/ --log-pipeline --log-keep-runs=3
+"""
+
+import glob
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from support.tracing import active_step
+
+DEFAULT_LOG_DIR = os.getenv("TEST_LOG_DIR", "logs")
+DEFAULT_KEEP_RUNS = 10
+
+# The test running on this process, set by the pytest plugin.
+_current_test: Optional[str] = None
+
+
+def parse_sampling(spec: Optional[str]) -> Dict[str, float]:
+    """'selenium=0.1,urllib3=0.05' -> {'selenium': 0.1, 'urllib3': 0.05}"""
+    rates = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, rate = part.partition("=")
+        value = float(rate)
+        if not 0 <= value <= 1:
+            raise ValueError(f"Sampling rate for {name.strip()!r} must be between 0 and 1, got {rate}")
+        rates[name.strip()] = value
+    return rates
+
+
+def prune_runs(log_dir: str, keep: int) -> int:
+    """Delete all but the newest `keep` run-<id> directories; returns how many were removed."""
+    # Run ids are timestamps, so name order is age order.
+    runs = sorted(glob.glob(os.path.join(log_dir, "run-*")))
+    stale = runs[:-keep] if keep > 0 else runs
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(stale)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed share of the DEBUG/INFO records of the configured loggers."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first, so "selenium.webdriver" wins over "selenium".
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _rate(self, name: str) -> Optional[tuple]:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return prefix, rate
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        match = self._rate(record.name)
+        if match is None:
+            return True
+        prefix, rate = match
+        with self._lock:
+            seen = self._seen[prefix] = self._seen.get(prefix, 0) + 1
+        # Deterministic: with rate 0.1 the 1st, 11th, 21st... record is kept.
+        keep = rate > 0 and (seen - 1) % round(1 / rate) == 0
+        if not keep:
+            self.dropped += 1
+        return keep
+
+
+class ContextQueueHandler(QueueHandler):
+    """Tags records with where they came from and queues them unformatted."""
+
+    def __init__(self, log_queue, worker: str):
+        super().__init__(log_queue)
+        self.worker = worker
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the message here; the listener does it instead.
+        record.worker = self.worker
+        record.test = _current_test
+        record.step = active_step()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "worker": getattr(record, "worker", None),
+            "test": getattr(record, "test", None),
+            "step": getattr(record, "step", None),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _is_control(record: logging.LogRecord) -> bool:
+    return hasattr(record, "log_control")
+
+
+class PerTestLogHandler(logging.Handler):
+    """
+    Writes each test's records to its own file on the listener thread. The file is
+    closed when the test's end marker comes through the queue (so every record the
+    test logged is already in it) and deleted unless the test failed.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self._files: Dict[str, tuple] = {}
+        self.kept = 0
+
+    def _path(self, test: str) -> str:
+        name = test.replace("/", "_").replace("::", "__")
+        return os.path.join(self.directory, f"{name}.jsonl")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if _is_control(record):
+            self._end(*record.log_control)
+            return
+        test = getattr(record, "test", None)
+        if test is None:
+            return
+        if test not in self._files:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(test)
+            self._files[test] = (path, open(path, "w", encoding="utf-8"))
+        self._files[test][1].write(self.format(record) + "\n")
+
+    def _end(self, test: str, keep: bool) -> None:
+        entry = self._files.pop(test, None)
+        if entry is None:
+            return
+        path, f = entry
+        f.close()
+        if keep:
+            self.kept += 1
+        else:
+            os.remove(path)
+
+    def close(self) -> None:
+        for test in list(self._files):
+            self._end(test, keep=True)
+        super().close()
+
+
+class LogPipeline:
+    """Root logger -> queue -> listener thread writing JSON lines for one process."""
+
+    def __init__(
+        self,
+        directory: str,
+        worker: str,
+        sampling: Optional[Dict[str, float]] = None,
+        level: int = logging.INFO,
+    ):
+        self.directory = directory
+        self.worker = worker
+        self.level = level
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+        formatter = JsonFormatter()
+        os.makedirs(directory, exist_ok=True)
+        self.worker_file = os.path.join(directory, f"{worker}.jsonl")
+        worker_handler = logging.FileHandler(self.worker_file, mode="w", encoding="utf-8", delay=True)
+        worker_handler.setFormatter(formatter)
+        worker_handler.addFilter(lambda record: not _is_control(record))
+        self.test_handler = PerTestLogHandler(os.path.join(directory, "tests"))
+        self.test_handler.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, worker_handler, self.test_handler)
+
+        self.sampler = SamplingFilter(sampling or {})
+        self.handler = ContextQueueHandler(self.queue, worker)
+        self.handler.addFilter(self.sampler)
+        self._previous_level: Optional[int] = None
+
+    def start(self) -> "LogPipeline":
+        root = logging.getLogger()
+        self._previous_level = root.level
+        if root.level == logging.NOTSET or root.level > self.level:
+            root.setLevel(self.level)
+        root.addHandler(self.handler)
+        self.listener.start()
+        return self
+
+    def stop(self) -> None:
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+        if self._previous_level is not None:
+            root.setLevel(self._previous_level)
+        # Drains the queue before the listener thread exits.
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def start_test(self, nodeid: str) -> None:
+        global _current_test
+        _current_test = nodeid
+
+    def end_test(self, nodeid: str, keep: bool) -> None:
+        """Queue the end marker; the listener keeps or deletes the test's file in order."""
+        global _current_test
+        _current_test = None
+        record = logging.makeLogRecord({"name": __name__, "msg": "end of test"})
+        record.log_control = (nodeid, keep)
+        self.queue.put_nowait(record)
@@ -0,0 +1,698 @@
+"""
+Shared pytest Plugin
+
+Hooks used by both web and mobile tests, registered from the root conftest:
+    - failure tracking for screenshots and device log dumps (pytest.test_failed)
+    - step tracing (--trace-steps, see support/tracing.py)
+    - the startup cost report (--startup-report, see support/startup.py)
+    - the structured logging pipeline (see support/log_pipeline.py)
+    - the run-history store (--run-history, see support/run_history.py)
+    - the input-hash result cache (--result-cache, see support/result_cache.py)
+    - attaching to the warm-session daemon (see support/warm_daemon.py)
+    - cross-machine sharding (--shard=i/n, see support/sharding.py)
+    - in-place retries on the warm browser or device session (see support/retries.py)
+    - the locator cost profiler (--locator-profile, see support/locator_profiler.py)
+"""
+
+import glob
+import os
+import subprocess
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import pytest
+
+from support import tracing
+from support.config import TestConfig
+from support.locator_profiler import DEFAULT_PROFILE_DIR, DEFAULT_TOP, LocatorProfiler, ranked_report
+from support.log_pipeline import DEFAULT_KEEP_RUNS, DEFAULT_LOG_DIR, LogPipeline, parse_sampling, prune_runs
+from support.result_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_TTL_HOURS,
+    CacheSavings,
+    PageFingerprints,
+    ResultCache,
+    cache_key,
+    file_digest,
+    session_count,
+)
+from support.retries import (
+    DEFAULT_RETRY_LIMIT,
+    RETRY_KEY,
+    RetryLog,
+    RetryRunner,
+    check_retry_markers,
+    classify,
+    describe,
+    parse_budgets,
+)
+from support.run_history import DEFAULT_DB, RunHistory, step_totals
+from support.sharding import (
+    DEFAULT_SHARD_DIR,
+    load_durations,
+    parse_cutoff,
+    parse_shard,
+    plan_shards,
+    timings_path,
+    write_timings,
+)
+from support.startup import STARTUP, report_lines
+from support.warm_daemon import DEFAULT_PORT, WarmClient
+
+FAILED_KEY = pytest.StashKey[bool]()
+STARTED_KEY = pytest.StashKey[float]()
+ARTIFACTS_KEY = pytest.StashKey[Dict[str, int]]()
+CALL_PASSED_KEY = pytest.StashKey[bool]()
+CACHE_KEY = pytest.StashKey[str]()
+CACHE_HIT_KEY = pytest.StashKey[dict]()
+
+# Finished tests of this run by node id, collected on the controller for the run history.
+HISTORY_TESTS: Dict[str, dict] = {}
+CACHE_SAVINGS = CacheSavings()
+RETRY_LOG = RetryLog()
+
+
+def worker_id(config) -> str:
+    return config.workerinput["workerid"] if hasattr(config, "workerinput") else "main"
+
+
+def run_id() -> str:
+    """Id of this test run; xdist workers inherit it from the controller's environment."""
+    return os.environ.setdefault("PERF_RUN_ID", time.strftime("%Y%m%d-%H%M%S"))
+
+
+def record_artifact(node, kind: str, path: str) -> None:
+    """Called by fixtures for files they write, so the run history knows their size."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    sizes = node.stash.setdefault(ARTIFACTS_KEY, {})
+    sizes[kind] = sizes.get(kind, 0) + size
+
+
+def capability_profile(item) -> Dict[str, str]:
+    """Browser, platform and device a test ran on, from its fixture parameters."""
+    params = item.callspec.params if hasattr(item, "callspec") else {}
+    browser = params.get("lt_browser") or {}
+    device = params.get("mobile_device") or params.get("device")
+    native = next((p for p in ("android", "ios") if f"{p}_driver" in item.fixturenames), None)
+    if isinstance(device, dict):
+        device = device.get("name")
+    elif device is not None and not isinstance(device, str):
+        device = device.id
+    return {
+        "browser": browser.get("browser_type"),
+        "platform": browser.get("platform") or native,
+        "device": device or ("default" if native else None),
+    }
+
+
+def warm_client(config) -> Optional[WarmClient]:
+    """The warm-session daemon on this machine, if it is running (checked once per process)."""
+    if config.getoption("--no-warm"):
+        return None
+    if not hasattr(config, "_warm_client"):
+        client = WarmClient(config.getoption("--warm-port"))
+        config._warm_client = client if client.available() else None
+    return config._warm_client
+
+
+def _locator_profile_path(config) -> str:
+    return os.path.join(config.getoption("--locator-profile-dir"), f"locators-{run_id()}.jsonl")
+
+
+@contextmanager
+def profile_locators(request):
+    """Used by lt_page and the Appium driver fixtures: records locator costs with --locator-profile."""
+    if not request.config.getoption("--locator-profile"):
+        yield None
+        return
+    profiler = LocatorProfiler(request.node.nodeid).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.write(_locator_profile_path(request.config))
+
+
+def _build_label(config) -> str:
+    label = config.getoption("--build-label")
+    if label:
+        return label
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return run_id()
+
+
+def _select_shard(config, items) -> None:
+    """Keep only this shard's share of the collected items, in collection order."""
+    index, total = parse_shard(config.getoption("--shard"))
+    durations = load_durations(
+        config.getoption("--shard-timings"), config.getoption("--shard-history-db"), config._shard_history_until
+    )
+    groups = []
+    for item in items:
+        profile = capability_profile(item)
+        groups.append((item.nodeid, "|".join(profile.get(k) or "" for k in ("browser", "platform", "device"))))
+    plan = plan_shards(groups, durations, total)
+
+    selected = [item for item in items if plan.assignment[item.nodeid] == index - 1]
+    deselected = [item for item in items if plan.assignment[item.nodeid] != index - 1]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    config._shard_summary = {
+        "tests": len(selected),
+        "collected": len(plan.assignment),
+        "known": plan.known,
+        "estimate": plan.loads[index - 1],
+        "loads": plan.loads,
+    }
+
+
+def _cache_inputs(item, fingerprints: PageFingerprints) -> Dict[str, Any] | None:
+    """Inputs beyond the test's code and parameters; None when the target page can't be fingerprinted."""
+    config = item.config
+    inputs: Dict[str, Any] = {"backend": config.getoption("--backend", default=None)}
+    snapshot_dir = config.getoption("--snapshot-dir", default=None)
+    if snapshot_dir:
+        # Hermetic passes (e.g. through the search shim) say nothing about the live sites.
+        inputs["snapshot"] = file_digest(os.path.join(snapshot_dir, "manifest.json"))
+        inputs["snapshot_passthrough"] = config.getoption("--snapshot-passthrough", default=False)
+    if "android_driver" in item.fixturenames:
+        inputs["app"] = TestConfig.ANDROID_APP_URL
+    if "ios_driver" in item.fixturenames:
+        inputs["app"] = TestConfig.IOS_APP_URL
+    marker = item.get_closest_marker("result_cache")
+    if marker and marker.kwargs.get("url"):
+        inputs["page"] = fingerprints.get(marker.kwargs["url"])
+        if inputs["page"] is None:
+            return None
+    return inputs
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("lambdatest")
+    group.addoption(
+        "--trace-steps",
+        action="store_true",
+        default=False,
+        help="Record step spans and write a Chrome trace (open it in ui.perfetto.dev).",
+    )
+    group.addoption(
+        "--trace-dir",
+        default="traces",
+        help="Directory for the step trace files.",
+    )
+    group.addoption(
+        "--locator-profile",
+        action="store_true",
+        default=False,
+        help="Time every locator resolution and action of lt_page and the Appium drivers.",
+    )
+    group.addoption(
+        "--locator-profile-dir",
+        default=DEFAULT_PROFILE_DIR,
+        help="Directory for the per-run locator profiles.",
+    )
+    group.addoption(
+        "--locator-profile-top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="Number of most expensive selectors listed in the locator report.",
+    )
+    group.addoption(
+        "--trace-top",
+        type=int,
+        default=10,
+        help="Number of slowest step types listed in the trace summary.",
+    )
+    group.addoption(
+        "--startup-report",
+        action="store_true",
+        default=False,
+        help="Report plugin import time, collection time and which heavy frameworks were loaded.",
+    )
+    group.addoption(
+        "--log-pipeline",
+        action="store_true",
+        default=False,
+        help="Write structured JSON logs per worker and per failed test under --log-dir "
+        "(without it, use --log-level=INFO for pytest's own log capture).",
+    )
+    group.addoption(
+        "--log-dir",
+        default=DEFAULT_LOG_DIR,
+        help="Directory for the per-run JSON logs and the logs of failed tests.",
+    )
+    group.addoption(
+        "--log-keep-runs",
+        type=int,
+        default=DEFAULT_KEEP_RUNS,
+        help="Number of run directories kept under --log-dir; older ones are deleted.",
+    )
+    group.addoption(
+        "--log-sample",
+        default=None,
+        help="Share of DEBUG/INFO records kept per logger, e.g. 'selenium=0.1,urllib3=0.05'.",
+    )
+    group.addoption(
+        "--run-history",
+        action="store_true",
+        default=os.getenv("RUN_HISTORY", "").lower() in ("1", "true", "yes"),
+        help="Append this run's test and step timings to the run-history database.",
+    )
+    group.addoption(
+        "--run-history-db",
+        default=DEFAULT_DB,
+        help="SQLite file of the run history (query it with python -m support.run_history).",
+    )
+    group.addoption(
+        "--build-label",
+        default=os.getenv("BUILD_LABEL"),
+        help="Build the run is recorded under in the run history (default: the git commit).",
+    )
+    group.addoption(
+        "--result-cache",
+        action="store_true",
+        default=os.getenv("RESULT_CACHE", "").lower() in ("1", "true", "yes"),
+        help="Report tests whose inputs are unchanged since they last passed as CACHED-PASS without running them.",
+    )
+    group.addoption(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Run every test even with --result-cache (passing results still refresh the cache).",
+    )
+    group.addoption(
+        "--result-cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of the test result cache.",
+    )
+    group.addoption(
+        "--result-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        help="Hours a passing result stays valid in the result cache.",
+    )
+    group.addoption(
+        "--shard",
+        default=os.getenv("TEST_SHARD"),
+        help="Run only shard i of n (e.g. 2/4), balanced by shared timings (--shard-timings, --shard-history-db).",
+    )
+    group.addoption(
+        "--shard-timings",
+        default=os.getenv("SHARD_TIMINGS"),
+        help="Merged timings file of an earlier sharded run (python -m support.sharding merge).",
+    )
+    group.addoption(
+        "--shard-history-db",
+        default=os.getenv("SHARD_HISTORY_DB"),
+        help="Run-history database shared by all shard hosts; needs --shard-history-until.",
+    )
+    group.addoption(
+        "--shard-history-until",
+        default=os.getenv("SHARD_HISTORY_UNTIL"),
+        help="Fixed cutoff for --shard-history-db, e.g. 2026-10-19 (UTC), the same on every host.",
+    )
+    group.addoption(
+        "--shard-dir",
+        default=DEFAULT_SHARD_DIR,
+        help="Directory for this shard's timings file.",
+    )
+    group.addoption(
+        "--retry-budget",
+        default=os.getenv("RETRY_BUDGET"),
+        help="Retries per marker, e.g. 'flaky=2,device_matrix=1' (the retry marker sets its own).",
+    )
+    group.addoption(
+        "--retry-limit",
+        type=int,
+        default=DEFAULT_RETRY_LIMIT,
+        help="Most retries per process (xdist worker) in one run.",
+    )
+    group.addoption(
+        "--no-retries",
+        action="store_true",
+        default=False,
+        help="Report the first failure of every test, ignoring retry budgets.",
+    )
+    group.addoption(
+        "--no-warm",
+        action="store_true",
+        default=False,
+        help="Do not attach to a running warm-session daemon (python -m support.warm_daemon).",
+    )
+    group.addoption(
+        "--warm-port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="Local port of the warm-session daemon.",
+    )
+
+
+def pytest_configure(config):
+    config._startup_reports = {}
+    config._shard_summary = None
+    # Set before xdist starts the workers, so the whole run shares it.
+    run_id()
+    config._log_pipeline = None
+    if config.getoption("--log-pipeline") and not config.option.collectonly:
+        if worker_id(config) == "main":
+            # Before this run's directory exists, so it always survives.
+            prune_runs(config.getoption("--log-dir"), config.getoption("--log-keep-runs") - 1)
+        directory = os.path.join(config.getoption("--log-dir"), f"run-{run_id()}")
+        config._log_pipeline = LogPipeline(
+            directory, worker_id(config), parse_sampling(config.getoption("--log-sample"))
+        ).start()
+
+    config._shard_history_until = None
+    if config.getoption("--shard"):
+        try:
+            parse_shard(config.getoption("--shard"))
+            if config.getoption("--shard-history-until"):
+                config._shard_history_until = parse_cutoff(config.getoption("--shard-history-until"))
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+        if config.getoption("--shard-history-db") and config._shard_history_until is None:
+            raise pytest.UsageError("--shard-history-db needs --shard-history-until, the same cutoff on every host")
+    config.addinivalue_line(
+        "markers",
+        "retry(n=1, on=None): retry the test up to n times on its warm browser / device session; "
+        "on limits it to failure causes (session, timeout, network, assertion, error)",
+    )
+    try:
+        config._retry_budgets = parse_budgets(config.getoption("--retry-budget"))
+    except ValueError:
+        raise pytest.UsageError(
+            f"Invalid --retry-budget {config.getoption('--retry-budget')!r}; use e.g. 'flaky=2,device_matrix=1'"
+        ) from None
+    config._retries_left = 0 if config.getoption("--no-retries") else config.getoption("--retry-limit")
+    config.pluginmanager.register(RetryRunner(), "retry-runner")
+    config._run_history = config.getoption("--run-history") and not config.option.collectonly
+
+    config.addinivalue_line(
+        "markers",
+        "result_cache(url=None, ttl=None): fingerprint url into the test's result cache key; "
+        "ttl in hours overrides --result-cache-ttl",
+    )
+    config._result_cache = None
+    if config.getoption("--result-cache") and not config.option.collectonly:
+        config._result_cache = ResultCache(
+            config.getoption("--result-cache-dir"), config.getoption("--result-cache-ttl")
+        )
+    config._run_history_started = time.time()
+
+    if not config.getoption("--trace-steps"):
+        return
+    if worker_id(config) == "main":
+        # Leftover worker files from an earlier run must not end up in this trace.
+        for path in glob.glob(os.path.join(config.getoption("--trace-dir"), "trace-gw*.json")):
+            os.remove(path)
+    tracing.enable(worker_id(config))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection(session):
+    STARTUP.collection_started()
+    yield
+    # The xdist controller collects nothing; its workers do.
+    STARTUP.collection_finished(len(getattr(session, "items", [])))
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Reject invalid retry markers, deselect the tests of other shards, then mark tests
+    with a fresh passing result in the result cache to be skipped before setup.
+    """
+    for item in items:
+        try:
+            check_retry_markers(item)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+    if config.getoption("--shard"):
+        _select_shard(config, items)
+    cache = config._result_cache
+    if cache is None:
+        return
+    fingerprints = PageFingerprints()
+    for item in items:
+        inputs = _cache_inputs(item, fingerprints)
+        if inputs is None:
+            continue
+        key = cache_key(item, inputs, str(config.rootpath))
+        item.stash[CACHE_KEY] = key
+        if config.getoption("--no-cache"):
+            continue
+        marker = item.get_closest_marker("result_cache")
+        ttl = marker.kwargs.get("ttl") if marker else None
+        entry = cache.lookup(key, ttl * 3600 if ttl is not None else None)
+        if entry:
+            item.stash[CACHE_HIT_KEY] = entry
+            age = (time.time() - entry["passed_at"]) / 3600
+            item.add_marker(pytest.mark.skip(reason=f"cached pass from {age:.1f}h ago"))
+
+
+def pytest_unconfigure(config):
+    if config._log_pipeline:
+        config._log_pipeline.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    Tags log records with the test, keeping its log file only if a phase failed,
+    and records one span per test; our own Python shows as the self time of its phases.
+    """
+    item.stash[STARTED_KEY] = time.time()
+    pipeline = item.config._log_pipeline
+    if pipeline:
+        pipeline.start_test(item.nodeid)
+    tracer = tracing.current_tracer()
+    if tracer is None:
+        yield
+    else:
+        tracer.test_id = item.nodeid
+        with tracing.step(item.nodeid, category="test"):
+            yield
+        tracer.test_id = None
+    if pipeline:
+        pipeline.end_test(item.nodeid, keep=item.stash.get(FAILED_KEY, False))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    with tracing.step("pytest.setup", category="pytest"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with tracing.step("pytest.call", category="pytest"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    state = item.stash.get(RETRY_KEY, None)
+    if state:
+        # Decided before the fixtures are finalized, so they can keep their session.
+        if state.decide(item.config):
+            item.user_properties.append(("retry", describe(state.causes[-1])))
+    with tracing.step("pytest.teardown", category="pytest"):
+        yield
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Track test status for screenshots on failure."""
+    outcome = yield
+    rep = outcome.get_result()
+
+    # Set test_failed attribute if the test failed
+    setattr(pytest, "test_failed", rep.failed)
+    if rep.failed:
+        item.stash[FAILED_KEY] = True
+        if rep.when in ("setup", "call") and RETRY_KEY in item.stash and call.excinfo:
+            item.stash[RETRY_KEY].fail(classify(call.excinfo, rep.when))
+    if rep.when == "setup" and CACHE_HIT_KEY in item.stash:
+        rep.result_cache = item.stash[CACHE_HIT_KEY]
+    if rep.when == "call":
+        item.stash[CALL_PASSED_KEY] = rep.passed
+    if (
+        rep.when == "teardown"
+        and CACHE_KEY in item.stash
+        and item.stash.get(CALL_PASSED_KEY, False)
+        and not item.stash.get(FAILED_KEY, False)
+    ):
+        item.config._result_cache.store(
+            item.stash[CACHE_KEY],
+            item.nodeid,
+            time.time() - item.stash[STARTED_KEY],
+            session_count(item.fixturenames),
+        )
+    # Shard timings list the worker of each test as well.
+    if rep.when == "teardown" and (item.config._run_history or item.config.getoption("--shard")):
+        rep.run_history = {
+            "steps": step_totals(tracing.step_windows(since=item.stash[STARTED_KEY]), skip=(item.nodeid,)),
+            "artifacts": item.stash.get(ARTIFACTS_KEY, {}),
+            "profile": capability_profile(item),
+            "worker": worker_id(item.config),
+        }
+
+
+def pytest_runtest_logreport(report):
+    """
+    Per-test timing for the run history. Under xdist this runs on the controller for
+    the workers' reports, so only the controller writes the database.
+    """
+    entry = HISTORY_TESTS.setdefault(
+        report.nodeid, {"nodeid": report.nodeid, "outcome": "passed", "duration": 0.0}
+    )
+    entry[report.when] = report.duration
+    entry["duration"] += report.duration
+    cached = getattr(report, "result_cache", None)
+    if report.outcome == "rerun":
+        RETRY_LOG.record(report)
+        return
+    if cached:
+        CACHE_SAVINGS.record(cached)
+        entry["outcome"] = "cached"
+    elif report.failed:
+        entry["outcome"] = "failed"
+    elif report.skipped and entry["outcome"] == "passed":
+        entry["outcome"] = "skipped"
+    details = getattr(report, "run_history", None)
+    if details:
+        entry.update(details, finished=time.time())
+    if report.when == "teardown" and getattr(report, "retries", None):
+        RETRY_LOG.record(report)
+        if entry["outcome"] == "passed":
+            entry["outcome"] = "flaky"
+        RETRY_LOG.finish(report.nodeid, entry["outcome"])
+
+
+def pytest_report_teststatus(report, config):
+    if getattr(report, "result_cache", None) and report.when == "setup":
+        return "cached", "C", "CACHED-PASS"
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+    return None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect the startup numbers each xdist worker sent back."""
+    report = getattr(node, "workeroutput", {}).get("startup")
+    if report:
+        node.config._startup_reports[node.workerinput["workerid"]] = report
+    # Every worker computes the same shard plan.
+    node.config._shard_summary = node.config._shard_summary or node.workeroutput.get("shard")
+
+
+def _write_run_history(config) -> None:
+    tests = [entry for entry in HISTORY_TESTS.values() if "finished" in entry]
+    if not tests:
+        return
+    history = RunHistory(config.getoption("--run-history-db"))
+    try:
+        history.append_run(run_id(), _build_label(config), config._run_history_started, tests)
+    finally:
+        history.close()
+
+
+def pytest_sessionfinish(session):
+    """Workers write their own trace file; the controller merges them into trace.json."""
+    config = session.config
+    process = worker_id(config)
+    if config._run_history and process == "main":
+        _write_run_history(config)
+    if config.getoption("--shard") and process == "main" and not config.option.collectonly:
+        index, total = parse_shard(config.getoption("--shard"))
+        write_timings(
+            timings_path(config.getoption("--shard-dir"), index, total),
+            index,
+            total,
+            run_id(),
+            _build_label(config),
+            config._run_history_started,
+            list(HISTORY_TESTS.values()),
+        )
+    if process != "main":
+        config.workeroutput["startup"] = STARTUP.as_dict()
+        config.workeroutput["shard"] = config._shard_summary
+    elif STARTUP.items or not config._startup_reports:
+        config._startup_reports["main"] = STARTUP.as_dict()
+
+    tracer = tracing.current_tracer()
+    if tracer is None:
+        return
+    trace_dir = config.getoption("--trace-dir")
+    if process != "main":
+        tracer.write(os.path.join(trace_dir, f"trace-{process}.json"), pid=int(process[2:]) + 1)
+        return
+
+    output = os.path.join(trace_dir, "trace.json")
+    worker_files = glob.glob(os.path.join(trace_dir, "trace-gw*.json"))
+    if tracer.events or not worker_files:
+        tracer.write(output)
+        worker_files.append(output)
+    config._trace_events = tracing.merge_traces(worker_files, output)
+    for path in worker_files:
+        if path != output:
+            os.remove(path)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if RETRY_LOG.tests:
+        terminalreporter.section("retries")
+        for line in RETRY_LOG.lines():
+            terminalreporter.write_line(line)
+    if CACHE_SAVINGS.tests:
+        terminalreporter.section("result cache")
+        terminalreporter.write_line(CACHE_SAVINGS.line())
+    pipeline = config._log_pipeline
+    if pipeline:
+        failed_logs = glob.glob(os.path.join(pipeline.directory, "tests", "*.jsonl"))
+        terminalreporter.write_sep("-", f"JSON logs: {pipeline.directory} ({len(failed_logs)} failed-test logs)")
+    summary = config._shard_summary
+    if summary:
+        index, total = parse_shard(config.getoption("--shard"))
+        loads = summary["loads"]
+        terminalreporter.section("shard")
+        terminalreporter.write_line(
+            f"Shard {index}/{total}: {summary['tests']} of {summary['collected']} tests, "
+            f"estimated {summary['estimate'] / 60:.1f} min (all shards {min(loads) / 60:.1f}-{max(loads) / 60:.1f} min; "
+            f"timings for {summary['known']} tests)"
+        )
+        terminalreporter.write_line(
+            f"Timings: {timings_path(config.getoption('--shard-dir'), index, total)}"
+        )
+    if config.getoption("--startup-report"):
+        terminalreporter.section("startup")
+        for line in report_lines(config._startup_reports):
+            terminalreporter.write_line(line)
+
+    profile = _locator_profile_path(config)
+    if config.getoption("--locator-profile") and os.path.exists(profile):
+        terminalreporter.section("locator costs")
+        for line in ranked_report(profile, config.getoption("--locator-profile-top")):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Profile: {profile}")
+
+    events = getattr(config, "_trace_events", None)
+    if events is None:
+        return
+    terminalreporter.section("slowest step types")
+    terminalreporter.write_line(f"{'step':<48} {'count':>6} {'total ms':>10} {'mean ms':>9} {'self ms':>9}")
+    for row in tracing.summarize(events, top=config.getoption("--trace-top")):
+        terminalreporter.write_line(
+            f"{row['name'][:48]:<48} {row['count']:>6} {row['total_ms']:>10.0f} "
+            f"{row['mean_ms']:>9.1f} {row['self_ms']:>9.0f}"
+        )
+    terminalreporter.write_line(f"Trace: {os.path.join(config.getoption('--trace-dir'), 'trace.json')}")
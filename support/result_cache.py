@@ -0,0 +1,189 @@
+"""
+Input-Hash Test Result Cache
+
+Most builds change nothing that affects most tests, yet every test opens a cloud
+browser or device session. With --result-cache (or RESULT_CACHE=1) each test gets a
+key hashed from its inputs:
+    - the test module, the modules of every fixture it resolves and the registered
+      plugins (conftest.py, support/web/mobile plugin), plus every helper module and
+      data file in their packages (web/backends.py, mobile/session.py, ...); editing
+      any of them invalidates the test
+    - its parameters, i.e. the resolved browser / device capabilities, the backend,
+      snapshot mode (--snapshot-dir, --snapshot-passthrough and the snapshot's
+      manifest) and the app under test for native tests
+    - optionally a fingerprint (ETag / Last-Modified) of the target page, from
+      @pytest.mark.result_cache(url="https://...")
+
+When the cache holds a passing result for that key younger than the TTL, the test is
+reported as CACHED-PASS without setting up any fixture, so no session is opened.
+--no-cache runs everything regardless. The terminal summary reports the sessions
+and minutes the cache saved.
+
+Usage:
+    pytest web/ --result-cache --result-cache-ttl=12
+    @pytest.mark.result_cache(url="https://ecommerce-playground.lambdatest.io/", ttl=6)
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", ".result_cache")
+DEFAULT_TTL_HOURS = 24.0
+SESSION_FIXTURES = ("lt_browser", "lt_page", "android_driver", "ios_driver")
+# Files of a package that tests and fixtures can depend on; other test modules cannot.
+HELPER_SUFFIXES = (".py", ".json")
+
+_package_digests: Dict[str, str] = {}
+
+
+def _source(obj: Any) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return repr(obj)
+
+
+def file_digest(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+class PageFingerprints:
+    """ETag / Last-Modified of target pages, fetched once per URL per process."""
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._seen: Dict[str, Optional[str]] = {}
+
+    def get(self, url: str) -> Optional[str]:
+        """None when the page gives no validators, so the test is never served from cache."""
+        if url not in self._seen:
+            self._seen[url] = self._fetch(url)
+        return self._seen[url]
+
+    def _fetch(self, url: str) -> Optional[str]:
+        request = urllib.request.Request(url, method="HEAD")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                validators = [response.headers.get("ETag", ""), response.headers.get("Last-Modified", "")]
+        except (urllib.error.URLError, OSError) as e:
+            logger.debug("Could not fingerprint %s: %s", url, e)
+            return None
+        return "|".join(validators) if any(validators) else None
+
+
+def _package_digest(directory: str) -> str:
+    """Digest of a package's helper modules and data files (computed once per process)."""
+    if directory not in _package_digests:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(HELPER_SUFFIXES) and not name.endswith("_test.py"):
+                digest.update(name.encode())
+                digest.update(file_digest(os.path.join(directory, name)).encode())
+        _package_digests[directory] = digest.hexdigest()
+    return _package_digests[directory]
+
+
+def _under(path: Optional[str], root: str) -> bool:
+    return bool(path) and os.path.abspath(path).startswith(os.path.join(root, ""))
+
+
+def source_files(item, root: str) -> List[str]:
+    """The test module, its fixtures' modules and the registered plugins of this project."""
+    files: Set[str] = {str(item.path), os.path.join(root, "conftest.py")}
+    for plugin in item.config.pluginmanager.get_plugins():
+        files.add(getattr(plugin, "__file__", None) or "")
+    for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+        for fixturedef in fixturedefs:
+            try:
+                files.add(inspect.getsourcefile(fixturedef.func) or "")
+            except TypeError:
+                pass
+    return sorted(os.path.abspath(path) for path in files if _under(path, root))
+
+
+def cache_key(item, inputs: Dict[str, Any], root: str) -> str:
+    """Hash of everything the test's result depends on."""
+    root = os.path.abspath(root)
+    digest = hashlib.sha256()
+    digest.update(_source(item.cls if item.cls is not None else item.function).encode())
+    digest.update(" ".join(sorted(item._fixtureinfo.name2fixturedefs)).encode())
+    files = source_files(item, root)
+    for path in files:
+        digest.update(os.path.relpath(path, root).encode())
+        digest.update(file_digest(path).encode())
+    for directory in sorted({os.path.dirname(path) for path in files}):
+        digest.update(_package_digest(directory).encode())
+    params = item.callspec.params if hasattr(item, "callspec") else {}
+    digest.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    digest.update(json.dumps(inputs, sort_keys=True, default=repr).encode())
+    digest.update(item.nodeid.encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """One small JSON file per key: when the test last passed and how long it took."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.directory = directory
+        self.ttl = ttl_hours * 3600
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def lookup(self, key: str, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The passing entry for key, unless it is older than the TTL (in seconds)."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["passed_at"] > (self.ttl if ttl is None else ttl):
+            return None
+        return entry
+
+    def store(self, key: str, nodeid: str, duration: float, sessions: int) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"nodeid": nodeid, "passed_at": time.time(), "duration": duration, "sessions": sessions}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+
+def session_count(fixturenames: Iterable[str]) -> int:
+    """Cloud sessions a test opens: one browser or one device session."""
+    return 1 if any(name in SESSION_FIXTURES for name in fixturenames) else 0
+
+
+class CacheSavings:
+    """Tests served from the cache in this run, fed from the test reports."""
+
+    def __init__(self):
+        self.tests = 0
+        self.sessions = 0
+        self.seconds = 0.0
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self.tests += 1
+        self.sessions += entry.get("sessions", 0)
+        self.seconds += entry.get("duration", 0.0)
+
+    def line(self) -> str:
+        return (
+            f"{self.tests} tests served from the result cache: "
+            f"{self.sessions} sessions and {self.seconds / 60:.1f} minutes saved"
+        )
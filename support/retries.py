@@ -0,0 +1,278 @@
+"""
+Warm-Session Smart Retries
+
+A flaky cloud test used to be re-run from scratch: new Playwright driver, new connect,
+even a new device. Tests with a retry budget are retried in place instead:
+
+    - web:    the test gets a fresh context (and page) on the same, still connected
+              browser; pooled browsers (--backend=local/gateway) stay up anyway.
+    - native: the app is restarted inside the same Appium session (terminate +
+              activate); warm-daemon sessions are reset by the daemon.
+A new browser or session is only opened when the old one is unhealthy (disconnected,
+or the app reset fails). Session-, module- and class-scoped fixtures are kept between
+attempts; only the test's own fixtures are set up again.
+
+Budgets come from markers:
+    @pytest.mark.retry(2)                         up to 2 retries
+    @pytest.mark.retry(1, on=["timeout", "session"])  only for these failure causes
+    --retry-budget="flaky=2,device_matrix=1"      budget for every test carrying a marker
+A test gets the largest budget that applies; --retry-limit caps retries per process so
+a broken environment does not multiply the run time, and --no-retries turns them off.
+
+Only setup and call failures are retried. Each failed attempt is reported as RERUN (R)
+with its cause (session, timeout, network, assertion or error), added to the test's
+JUnit properties, and a test that passes after retrying is stored as "flaky" in the run
+history and listed in the "retries" terminal section.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_LIMIT = 10
+CATEGORIES = ("session", "timeout", "network", "assertion", "error")
+SESSION_ERRORS = ("InvalidSessionIdException", "NoSuchDriverException", "TargetClosedError")
+SESSION_MESSAGES = (
+    "has been closed",
+    "invalid session id",
+    "session is either terminated",
+    "Browser closed",
+    "Connection closed",
+)
+NETWORK_MESSAGES = (
+    "net::ERR_",
+    "Connection refused",
+    "Connection reset",
+    "Max retries exceeded",
+    "Temporary failure in name resolution",
+)
+
+
+def parse_budgets(spec: Optional[str]) -> Dict[str, int]:
+    """'flaky=2,device_matrix=1' -> {'flaky': 2, 'device_matrix': 1}"""
+    budgets = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, count = part.partition("=")
+        budgets[name.strip()] = int(count)
+    return budgets
+
+
+def _retry_causes(on: Any) -> Set[str]:
+    # on="timeout" is a single cause, not a set of characters.
+    return {on} if isinstance(on, str) else set(on)
+
+
+def check_retry_markers(item) -> None:
+    """Raise ValueError for a retry marker with a bad count or unknown causes."""
+    for marker in item.iter_markers("retry"):
+        n = marker.args[0] if marker.args else marker.kwargs.get("n", 1)
+        if not isinstance(n, int) or isinstance(n, bool) or n < 0:
+            raise ValueError(f"{item.nodeid}: retry count must be a non-negative integer, got {n!r}")
+        if marker.kwargs.get("on"):
+            unknown = _retry_causes(marker.kwargs["on"]) - set(CATEGORIES)
+            if unknown:
+                raise ValueError(f"{item.nodeid}: unknown retry causes {sorted(unknown)}; use {CATEGORIES}")
+
+
+def retry_budget(item, budgets: Dict[str, int]) -> Tuple[int, Optional[Set[str]]]:
+    """
+    (retries allowed, failure categories retried or None for all) for a test; its retry
+    markers were validated at collection (check_retry_markers).
+    """
+    budget, categories = 0, None
+    for marker in item.iter_markers("retry"):
+        budget = max(budget, marker.args[0] if marker.args else marker.kwargs.get("n", 1))
+        if marker.kwargs.get("on"):
+            categories = _retry_causes(marker.kwargs["on"])
+    for name, count in budgets.items():
+        if item.get_closest_marker(name) is not None:
+            budget = max(budget, count)
+    return budget, categories
+
+
+def classify(excinfo, when: str) -> Dict[str, Any]:
+    """Cause of a failed phase: category, exception type and first message line."""
+    exc = excinfo.value
+    name = type(exc).__name__
+    lines = str(exc).strip().splitlines()
+    message = lines[0][:200] if lines else ""
+    if name in SESSION_ERRORS or any(m in message for m in SESSION_MESSAGES):
+        category = "session"
+    elif "Timeout" in name or isinstance(exc, TimeoutError):
+        category = "timeout"
+    elif isinstance(exc, ConnectionError) or any(m in message for m in NETWORK_MESSAGES):
+        category = "network"
+    elif isinstance(exc, (AssertionError, pytest.fail.Exception)):
+        category = "assertion"
+    else:
+        category = "error"
+    return {"phase": when, "category": category, "exception": name, "message": message}
+
+
+def describe(cause: Dict[str, Any]) -> str:
+    text = f"attempt {cause['attempt']}: {cause['category']} in {cause['phase']} ({cause['exception']}"
+    text += f": {cause['message']})" if cause["message"] else ")"
+    if cause.get("reused"):
+        text += f", retried on the same {cause['reused']}"
+    return text
+
+
+class RetryState:
+    """Attempts of one test, and resources fixtures keep alive for its next attempt."""
+
+    def __init__(self, budget: int, categories: Optional[Set[str]] = None):
+        self.budget = budget
+        self.categories = categories
+        self.attempt = 0
+        self.causes: List[Dict[str, Any]] = []
+        self.failure: Optional[Dict[str, Any]] = None
+        self.pending = False
+        self._kept: Dict[str, Tuple[Any, Callable[[], None]]] = {}
+
+    def start_attempt(self) -> None:
+        self.attempt += 1
+        self.failure = None
+        self.pending = False
+
+    def fail(self, cause: Dict[str, Any]) -> None:
+        if self.failure is None:
+            self.failure = {**cause, "attempt": self.attempt}
+
+    def decide(self, config) -> bool:
+        """Called before teardown: whether this attempt will be retried."""
+        self.pending = (
+            self.failure is not None
+            and self.attempt <= self.budget
+            and (self.categories is None or self.failure["category"] in self.categories)
+            and config._retries_left > 0
+        )
+        if self.pending:
+            config._retries_left -= 1
+            self.causes.append(self.failure)
+        return self.pending
+
+    def keep(self, name: str, resource: Any, close: Callable[[], None]) -> None:
+        self._kept[name] = (resource, close)
+
+    def take(self, name: str) -> Any:
+        resource, _ = self._kept.pop(name, (None, None))
+        if resource is not None and self.causes:
+            self.causes[-1]["reused"] = name
+        return resource
+
+    def close_kept(self) -> None:
+        """Close what a fixture kept but the next attempt never took (e.g. setup failed earlier)."""
+        for name, (_, close) in self._kept.items():
+            try:
+                close()
+            except Exception as e:
+                logger.warning("Failed to close %s kept for a retry: %s", name, e)
+        self._kept.clear()
+
+
+RETRY_KEY = pytest.StashKey[RetryState]()
+
+
+def retry_pending(node) -> bool:
+    """For fixture teardown: the test failed and is about to be retried."""
+    state = node.stash.get(RETRY_KEY, None)
+    return bool(state and state.pending)
+
+
+def keep_for_retry(node, name: str, resource: Any, close: Callable[[], None]) -> None:
+    node.stash[RETRY_KEY].keep(name, resource, close)
+
+
+def take_kept(node, name: str) -> Any:
+    """The resource a fixture kept for this retry, or None on the first attempt."""
+    state = node.stash.get(RETRY_KEY, None)
+    return state.take(name) if state else None
+
+
+class RetryNextItem:
+    """
+    nextitem for runtestprotocol while retries remain: with a retry pending only the
+    test's own fixtures are torn down; otherwise teardown goes up to the real next item.
+    """
+
+    def __init__(self, item, nextitem, state: RetryState):
+        self.item = item
+        self.nextitem = nextitem
+        self.state = state
+
+    def listchain(self):
+        if self.state.pending:
+            return self.item.listchain()[:-1]
+        return self.nextitem.listchain() if self.nextitem is not None else []
+
+    def __getattr__(self, name):
+        return getattr(self.nextitem, name)
+
+
+class RetryRunner:
+    """Plugin running tests with a retry budget until they pass or the budget is spent."""
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        """Failed attempts are reported as reruns; only the test's own fixtures are set up again."""
+        budget, categories = retry_budget(item, item.config._retry_budgets)
+        if budget == 0 or item.config._retries_left <= 0:
+            return None
+        state = item.stash[RETRY_KEY] = RetryState(budget, categories)
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        teardown_until = RetryNextItem(item, nextitem, state)
+        while True:
+            state.start_attempt()
+            reports = runtestprotocol(item, nextitem=teardown_until, log=False)
+            retrying = state.pending
+            for report in reports:
+                if retrying:
+                    # Passed phases of a retried attempt are not reported, so JUnit and
+                    # the terminal show one test with its reruns.
+                    if not report.failed:
+                        continue
+                    report.outcome = "rerun"
+                    report.retry_cause = state.causes[-1]
+                elif state.causes:
+                    report.retries = state.causes
+                item.ihook.pytest_runtest_logreport(report=report)
+            if not retrying:
+                break
+        state.close_kept()
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+
+class RetryLog:
+    """Retried tests of this run, fed from the test reports."""
+
+    def __init__(self):
+        self.tests: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, report) -> None:
+        if report.outcome == "rerun":
+            entry = self.tests.setdefault(report.nodeid, {"causes": [], "outcome": None})
+            # A retried attempt whose teardown failed too is reported twice.
+            if not entry["causes"] or entry["causes"][-1]["attempt"] != report.retry_cause["attempt"]:
+                entry["causes"].append(report.retry_cause)
+        elif report.when == "teardown" and getattr(report, "retries", None):
+            # The final attempt's causes also know whether the session was reused.
+            self.tests[report.nodeid]["causes"] = report.retries
+
+    def finish(self, nodeid: str, outcome: str) -> None:
+        if nodeid in self.tests:
+            self.tests[nodeid]["outcome"] = outcome
+
+    def lines(self) -> List[str]:
+        lines = []
+        for nodeid, entry in self.tests.items():
+            attempts = len(entry["causes"]) + 1
+            lines.append(f"{entry['outcome'] or 'failed'}: {nodeid} ({attempts} attempts)")
+            lines += [f"    {describe(cause)}" for cause in entry["causes"]]
+        return lines
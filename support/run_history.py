@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Run-History Store
+
+With --run-history (or RUN_HISTORY=1) a pytest run appends compact results to a local
+SQLite database (run_history.sqlite by default, gitignored):
+    runs       one row per run: build label, start/end, test and failure counts
+    tests      one row per test: outcome ("flaky" if it passed on a retry),
+               setup/call/teardown time, capability
+               profile (browser, platform, device), worker, artifact bytes
+    steps      per test and step name: count, total and max ms (support/tracing.step,
+               including the "connect" steps of the browser and Appium fixtures)
+    artifacts  per test: kind and size of files written (screenshots, device logs)
+
+The xdist controller is the only writer: workers attach their step timings and
+artifact sizes to the test reports, and the rows are inserted in one transaction
+when the session ends. Queries go through indexes on time, build, test and step,
+so months of history stay fast without reading raw logs:
+
+    pytest web/ mobile/ --run-history --build-label=1.4.2
+    python -m support.run_history slowest --days 7 --top 20
+    python -m support.run_history regressions --since-build 1.4.1 --threshold 0.2
+    python -m support.run_history p95 --step connect --by browser --days 30
+    python -m support.run_history trend --test ecommerce_search --last 10
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_DB = os.getenv("RUN_HISTORY_DB", "run_history.sqlite")
+PROFILE_COLUMNS = ("browser", "platform", "device")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    build TEXT,
+    started REAL,
+    finished REAL,
+    tests INTEGER,
+    failed INTEGER
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id TEXT,
+    nodeid TEXT,
+    outcome TEXT,
+    duration REAL,
+    setup_s REAL,
+    call_s REAL,
+    teardown_s REAL,
+    browser TEXT,
+    platform TEXT,
+    device TEXT,
+    worker TEXT,
+    artifact_bytes INTEGER,
+    finished REAL,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT,
+    nodeid TEXT,
+    step TEXT,
+    count INTEGER,
+    total_ms REAL,
+    max_ms REAL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT,
+    nodeid TEXT,
+    kind TEXT,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_build ON runs (build, finished);
+CREATE INDEX IF NOT EXISTS tests_finished ON tests (finished);
+CREATE INDEX IF NOT EXISTS tests_nodeid ON tests (nodeid, finished);
+CREATE INDEX IF NOT EXISTS steps_step ON steps (step, run_id);
+CREATE INDEX IF NOT EXISTS steps_test ON steps (run_id, nodeid);
+"""
+
+
+def step_totals(windows: Iterable[Tuple[str, float, float]], skip: Sequence[str] = ()) -> Dict[str, List[float]]:
+    """[count, total_ms, max_ms] per step name from (name, start, end) windows."""
+    totals: Dict[str, List[float]] = {}
+    for name, start, end in windows:
+        if name in skip or name.startswith("pytest."):
+            continue
+        ms = (end - start) * 1000
+        entry = totals.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+    return totals
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class RunHistory:
+    """SQLite-backed history of test and step timings."""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def append_run(
+        self,
+        run_id: str,
+        build: str,
+        started: float,
+        tests: List[Dict[str, Any]],
+    ) -> None:
+        """Insert a run and its test, step and artifact rows in one transaction."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, build, started, time.time(), len(tests), sum(t["outcome"] == "failed" for t in tests)),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id, t["nodeid"], t["outcome"], t["duration"],
+                        t.get("setup", 0.0), t.get("call", 0.0), t.get("teardown", 0.0),
+                        *(t["profile"].get(column) for column in PROFILE_COLUMNS),
+                        t.get("worker"), sum(t["artifacts"].values()), t["finished"],
+                    )
+                    for t in tests
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, t["nodeid"], name, count, total_ms, max_ms)
+                    for t in tests
+                    for name, (count, total_ms, max_ms) in t["steps"].items()
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?)",
+                [(run_id, t["nodeid"], kind, size) for t in tests for kind, size in t["artifacts"].items()],
+            )
+
+    # Queries
+    def slowest(self, days: float = 7, top: int = 20) -> List[Tuple]:
+        """(nodeid, runs, mean s, max s) of the slowest non-skipped tests."""
+        return self.conn.execute(
+            "SELECT nodeid, COUNT(*), AVG(duration), MAX(duration) FROM tests "
+            "WHERE finished >= ? AND outcome != 'skipped' "
+            "GROUP BY nodeid ORDER BY AVG(duration) DESC LIMIT ?",
+            (time.time() - days * 86400, top),
+        ).fetchall()
+
+    def mean_durations(self, days: float = 30, until: Optional[float] = None) -> Dict[str, float]:
+        """Mean seconds per test that ran (passed, flaky or failed) in the days before until (default: now)."""
+        until = time.time() if until is None else until
+        rows = self.conn.execute(
+            "SELECT nodeid, AVG(duration) FROM tests "
+            "WHERE finished >= ? AND finished < ? AND outcome IN ('passed', 'flaky', 'failed') GROUP BY nodeid",
+            (until - days * 86400, until),
+        )
+        return dict(rows.fetchall())
+
+    def latest_build(self) -> Optional[str]:
+        row = self.conn.execute("SELECT build FROM runs ORDER BY finished DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def _step_samples(self, build: str) -> Dict[str, List[float]]:
+        """Per-test total ms of every step in the runs of a build."""
+        samples: Dict[str, List[float]] = {}
+        rows = self.conn.execute(
+            "SELECT s.step, s.total_ms FROM steps s JOIN runs r ON r.run_id = s.run_id WHERE r.build = ?",
+            (build,),
+        )
+        for name, total_ms in rows:
+            samples.setdefault(name, []).append(total_ms)
+        return samples
+
+    def step_regressions(
+        self, baseline: str, current: Optional[str] = None, threshold: float = 0.2, min_samples: int = 3
+    ) -> List[Tuple[str, float, float, float]]:
+        """(step, baseline median ms, current median ms, change) for steps slower by more than threshold."""
+        current = current or self.latest_build()
+        before, after = self._step_samples(baseline), self._step_samples(current)
+        regressions = []
+        for name in sorted(after):
+            if len(before.get(name, [])) < min_samples or len(after[name]) < min_samples:
+                continue
+            old, new = statistics.median(before[name]), statistics.median(after[name])
+            if old > 0 and (new - old) / old > threshold:
+                regressions.append((name, old, new, (new - old) / old))
+        return sorted(regressions, key=lambda r: -r[3])
+
+    def step_percentile(self, step: str, by: str = "browser", pct: float = 95, days: float = 30) -> List[Tuple]:
+        """(profile value, samples, percentile ms) of one step, grouped by a profile column."""
+        if by not in PROFILE_COLUMNS:
+            raise ValueError(f"Unknown profile column {by!r}; use one of {PROFILE_COLUMNS}")
+        rows = self.conn.execute(
+            f"SELECT t.{by}, s.total_ms / s.count FROM steps s "
+            "JOIN tests t ON t.run_id = s.run_id AND t.nodeid = s.nodeid "
+            "WHERE s.step = ? AND t.finished >= ?",
+            (step, time.time() - days * 86400),
+        )
+        groups: Dict[str, List[float]] = {}
+        for value, ms in rows:
+            groups.setdefault(value or "-", []).append(ms)
+        return sorted(
+            ((value, len(samples), percentile(samples, pct)) for value, samples in groups.items()),
+            key=lambda row: -row[2],
+        )
+
+    def trend(self, test: str, last: int = 10) -> List[Tuple]:
+        """(build, runs, median s, failures) for tests matching `test`, oldest build first."""
+        rows = self.conn.execute(
+            "SELECT r.build, t.duration, t.outcome, r.finished FROM tests t JOIN runs r ON r.run_id = t.run_id "
+            "WHERE t.nodeid LIKE ? ORDER BY r.finished",
+            (f"%{test}%",),
+        ).fetchall()
+        builds: Dict[str, List[Tuple[float, str]]] = {}
+        for build, duration, outcome, _ in rows:
+            builds.setdefault(build, []).append((duration, outcome))
+        result = [
+            (build, len(entries), statistics.median(d for d, _ in entries), sum(o == "failed" for _, o in entries))
+            for build, entries in builds.items()
+        ]
+        return result[-last:]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query the test run history")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    slowest_cmd = sub.add_parser("slowest", help="Slowest tests by mean duration")
+    slowest_cmd.add_argument("--days", type=float, default=7)
+    slowest_cmd.add_argument("--top", type=int, default=20)
+
+    regressions_cmd = sub.add_parser("regressions", help="Steps that got slower since a build")
+    regressions_cmd.add_argument("--since-build", required=True)
+    regressions_cmd.add_argument("--build", default=None, help="Build to compare (default: the latest)")
+    regressions_cmd.add_argument("--threshold", type=float, default=0.2, help="Allowed relative increase")
+    regressions_cmd.add_argument("--min-samples", type=int, default=3)
+
+    p95_cmd = sub.add_parser("p95", help="Percentile duration of a step by capability profile")
+    p95_cmd.add_argument("--step", default="connect")
+    p95_cmd.add_argument("--by", choices=PROFILE_COLUMNS, default="browser")
+    p95_cmd.add_argument("--pct", type=float, default=95)
+    p95_cmd.add_argument("--days", type=float, default=30)
+
+    trend_cmd = sub.add_parser("trend", help="Duration of matching tests per build")
+    trend_cmd.add_argument("--test", required=True, help="Substring of the test node id")
+    trend_cmd.add_argument("--last", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No run history at {args.db}")
+        return 2
+    history = RunHistory(args.db)
+    try:
+        if args.command == "slowest":
+            for nodeid, runs, mean, longest in history.slowest(args.days, args.top):
+                print(f"{mean:>8.1f}s mean {longest:>8.1f}s max {runs:>4} runs  {nodeid}")
+        elif args.command == "regressions":
+            regressions = history.step_regressions(args.since_build, args.build, args.threshold, args.min_samples)
+            for name, old, new, change in regressions:
+                print(f"REGRESSION {name}: {old:.0f} ms -> {new:.0f} ms (+{change:.0%})")
+            if not regressions:
+                print(f"No step regressed more than {args.threshold:.0%} since {args.since_build}")
+            return 1 if regressions else 0
+        elif args.command == "p95":
+            print(f"{args.by:<24} {'samples':>8} {f'p{args.pct:g} ms':>10}")
+            for value, samples, ms in history.step_percentile(args.step, args.by, args.pct, args.days):
+                print(f"{value:<24} {samples:>8} {ms:>10.0f}")
+        elif args.command == "trend":
+            for build, runs, median, failures in history.trend(args.test, args.last):
+                print(f"{build:<24} {runs:>4} runs {median:>8.1f}s median {failures:>3} failed")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
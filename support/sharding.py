@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Duration-Balanced Sharding Across Machines
+
+xdist spreads tests over the processes of one machine; the nightly browser and device
+matrix runs on several CI hosts. With --shard=i/n every host collects the full suite
+and keeps only its share:
+
+    1. Tests are grouped by capability profile (browser + platform, or native platform
+       + device), so a host opens the same browsers and devices over and over and its
+       warm browsers / device sessions are reused.
+    2. Each test is weighted by its duration in a merged timings file of an earlier
+       sharded run (--shard-timings) and/or its mean duration in a run-history
+       database shared by all hosts (--shard-history-db), over the 30 days before a
+       fixed cutoff (--shard-history-until). Tests without timings get the median of
+       the known ones. A host's own run history is never used: after a sharded run it
+       only knows its own shard's tests, so every host would plan differently.
+    3. Groups heavier than a fair share (total / n) are split, then groups are placed
+       heaviest first on the currently lightest shard (ties: lowest shard number).
+
+The plan only depends on the collected node ids, their profiles and these shared
+durations, so every host (and every xdist worker on it) computes the same partition;
+nothing is run twice or dropped. Each shard writes <shard-dir>/shard-<i>-of-<n>.json with its test
+timings; `merge` combines those and the shards' JUnit files into one report and shows
+how evenly the shards finished.
+
+Usage:
+    pytest web/ mobile/ --shard=2/4 --junitxml=reports/junit-2.xml
+    python -m support.sharding merge --junit reports/junit-*.xml \\
+        --output-junit reports/junit.xml --output-timings shards/merged.json
+    pytest web/ mobile/ --shard=2/4 --shard-timings=shards/merged.json
+    pytest web/ mobile/ --shard=2/4 --shard-history-db=/mnt/ci/run_history.sqlite \\
+        --shard-history-until=2026-10-19
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from support.run_history import RunHistory
+
+DEFAULT_SHARD_DIR = os.getenv("SHARD_DIR", "shards")
+# Assumed duration of every test when no test has any history yet.
+DEFAULT_DURATION = 30.0
+HISTORY_DAYS = 30
+
+
+class ShardPlan(NamedTuple):
+    assignment: Dict[str, int]  # node id -> shard index (0-based)
+    loads: List[float]  # estimated seconds per shard
+    known: int  # tests with recorded durations
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'2/4' -> (2, 4); shards are numbered from 1."""
+    index, _, total = spec.partition("/")
+    try:
+        shard = int(index), int(total)
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}; use i/n, e.g. 2/4") from None
+    if not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Invalid shard {spec!r}; i must be between 1 and n")
+    return shard
+
+
+def parse_cutoff(value: str) -> float:
+    """'2026-10-19' or '2026-10-19T06:00' (UTC unless an offset is given) -> epoch seconds."""
+    try:
+        cutoff = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid history cutoff {value!r}; use a date like 2026-10-19") from None
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    return cutoff.timestamp()
+
+
+def load_durations(
+    timings_file: Optional[str] = None, history_db: Optional[str] = None, until: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Mean seconds per node id from a shared run-history database (the HISTORY_DAYS
+    before until), overridden by a merged timings file.
+    """
+    durations: Dict[str, float] = {}
+    if history_db:
+        if until is None:
+            raise ValueError("A shared run history needs a fixed cutoff (--shard-history-until)")
+        if not os.path.exists(history_db):
+            raise ValueError(f"Shared run history {history_db} does not exist")
+        history = RunHistory(history_db)
+        try:
+            durations.update(history.mean_durations(days=HISTORY_DAYS, until=until))
+        finally:
+            history.close()
+    if timings_file:
+        with open(timings_file, "r", encoding="utf-8") as f:
+            for test in json.load(f)["tests"]:
+                if test["outcome"] in ("passed", "flaky", "failed"):
+                    durations[test["nodeid"]] = test["duration"]
+    return durations
+
+
+def plan_shards(tests: Sequence[Tuple[str, str]], durations: Dict[str, float], total: int) -> ShardPlan:
+    """Partition (node id, capability group) pairs into `total` shards of similar duration."""
+    known = [durations[nodeid] for nodeid, _ in tests if nodeid in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    weight = {nodeid: durations.get(nodeid, default) for nodeid, _ in tests}
+
+    groups: Dict[str, List[str]] = {}
+    for nodeid, group in tests:
+        groups.setdefault(group, []).append(nodeid)
+    fair_share = sum(weight.values()) / total
+
+    units: List[Tuple[float, List[str]]] = []
+    for group in sorted(groups):
+        chunk: List[str] = []
+        chunk_weight = 0.0
+        for nodeid in sorted(groups[group]):
+            if chunk and chunk_weight + weight[nodeid] > fair_share:
+                units.append((chunk_weight, chunk))
+                chunk, chunk_weight = [], 0.0
+            chunk.append(nodeid)
+            chunk_weight += weight[nodeid]
+        units.append((chunk_weight, chunk))
+
+    loads = [0.0] * total
+    assignment: Dict[str, int] = {}
+    for unit_weight, nodeids in sorted(units, key=lambda unit: (-unit[0], unit[1][0])):
+        shard = min(range(total), key=lambda i: (loads[i], i))
+        loads[shard] += unit_weight
+        for nodeid in nodeids:
+            assignment[nodeid] = shard
+    return ShardPlan(assignment, loads, len(known))
+
+
+def timings_path(directory: str, index: int, total: int) -> str:
+    return os.path.join(directory, f"shard-{index}-of-{total}.json")
+
+
+def write_timings(
+    path: str, index: int, total: int, run_id: str, build: str, started: float, tests: List[Dict[str, Any]]
+) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    keys = ("nodeid", "outcome", "duration", "setup", "call", "teardown", "worker")
+    record = {
+        "shard": index,
+        "total": total,
+        "run_id": run_id,
+        "build": build,
+        "started": started,
+        "finished": time.time(),
+        "tests": [{k: test[k] for k in keys if k in test} for test in tests],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+
+def merge_timings(paths: Sequence[str]) -> Dict[str, Any]:
+    """One timings record for all shards, tests tagged with their shard."""
+    shards = []
+    tests = []
+    builds = set()
+    for path in sorted(paths):
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+        shards.append(
+            {
+                "shard": record["shard"],
+                "total": record["total"],
+                "run_id": record["run_id"],
+                "tests": len(record["tests"]),
+                "wall_s": round(record["finished"] - record["started"], 1),
+                "test_s": round(sum(t["duration"] for t in record["tests"]), 1),
+            }
+        )
+        tests += [{**test, "shard": record["shard"]} for test in record["tests"]]
+        builds.add(record["build"])
+    return {"builds": sorted(builds), "shards": sorted(shards, key=lambda s: s["shard"]), "tests": tests}
+
+
+def merge_junit(paths: Sequence[str], output: str) -> Dict[str, int]:
+    """Concatenate the test suites of the shards' JUnit files under one <testsuites>."""
+    merged = ET.Element("testsuites", name="pytest tests")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    elapsed = 0.0
+    for path in sorted(paths):
+        root = ET.parse(path).getroot()
+        for suite in root.iter("testsuite") if root.tag == "testsuites" else [root]:
+            suite.set("name", f"{suite.get('name', 'pytest')} ({os.path.basename(path)})")
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            elapsed += float(suite.get("time", 0))
+            merged.append(suite)
+    for key, value in totals.items():
+        merged.set(key, str(value))
+    merged.set("time", f"{elapsed:.3f}")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    ET.ElementTree(merged).write(output, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def balance_lines(merged: Dict[str, Any]) -> List[str]:
+    shards = merged["shards"]
+    lines = [f"{'shard':<8} {'tests':>6} {'wall s':>9} {'test s':>9}"]
+    for shard in shards:
+        lines.append(f"{shard['shard']}/{shard['total']:<6} {shard['tests']:>6} {shard['wall_s']:>9.1f} {shard['test_s']:>9.1f}")
+    walls = [s["wall_s"] for s in shards]
+    if walls and max(walls) > 0:
+        lines.append(f"Slowest shard {max(walls):.0f}s, fastest {min(walls):.0f}s ({1 - min(walls) / max(walls):.0%} spread)")
+
+    expected = set(range(1, shards[0]["total"] + 1)) if shards else set()
+    missing = sorted(expected - {s["shard"] for s in shards})
+    if missing:
+        lines.append(f"WARNING: no timings from shards {missing}")
+    seen: Dict[str, int] = {}
+    for test in merged["tests"]:
+        seen[test["nodeid"]] = seen.get(test["nodeid"], 0) + 1
+    duplicated = sorted(nodeid for nodeid, count in seen.items() if count > 1)
+    if duplicated:
+        lines.append(f"WARNING: {len(duplicated)} tests ran on more than one shard, e.g. {duplicated[0]}")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Merge the reports of a sharded test run")
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge_cmd = sub.add_parser("merge", help="Combine per-shard timings and JUnit files")
+    merge_cmd.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR, help="Directory of shard-*-of-*.json files")
+    merge_cmd.add_argument("--junit", nargs="*", default=[], help="JUnit XML files of the shards")
+    merge_cmd.add_argument("--output-junit", default=None)
+    merge_cmd.add_argument("--output-timings", default=None, help="Also usable as --shard-timings next run")
+    args = parser.parse_args()
+
+    paths = glob.glob(os.path.join(args.shard_dir, "shard-*-of-*.json"))
+    if not paths:
+        print(f"No shard timings in {args.shard_dir}")
+        return 2
+    merged = merge_timings(paths)
+    for line in balance_lines(merged):
+        print(line)
+    if args.output_timings:
+        with open(args.output_timings, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2)
+        print(f"Timings: {args.output_timings}")
+    if args.junit:
+        output = args.output_junit or "junit-merged.xml"
+        totals = merge_junit(args.junit, output)
+        print(
+            f"JUnit: {output} ({totals['tests']} tests, {totals['failures']} failures, "
+            f"{totals['errors']} errors, {totals['skipped']} skipped)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Startup Cost Report
+
+The root conftest registers the shared, web and mobile fixtures as separate pytest
+plugins whose heavy dependencies (Playwright, Appium, Selenium, requests) are imported
+by the fixtures that use them, so a web-only run never loads Appium or Selenium and
+collection only loads what the collected test modules import. This module measures
+what startup still costs:
+    - the import time of each plugin module
+    - the collection time and number of collected items
+    - which of the heavy frameworks were loaded by the end of collection
+
+Show the report with `pytest --startup-report`; under pytest-xdist every worker sends
+its numbers back to the controller. `python -X importtime -m pytest --collect-only`
+gives the per-module breakdown when a plugin gets slow again.
+"""
+
+import importlib
+import sys
+import time
+from typing import Any, Dict, Iterable, List
+
+HEAVY_MODULES = ("playwright", "appium", "selenium", "requests")
+
+
+class StartupTimes:
+    """Plugin import times and collection time of this process."""
+
+    def __init__(self):
+        self.imports: Dict[str, float] = {}
+        self.collection_ms = 0.0
+        self.items = 0
+        self.loaded: List[str] = []
+        self._collect_started = 0.0
+
+    def import_plugins(self, names: Iterable[str]) -> None:
+        for name in names:
+            if name in sys.modules:
+                continue
+            started = time.perf_counter()
+            importlib.import_module(name)
+            self.imports[name] = (time.perf_counter() - started) * 1000
+
+    def collection_started(self) -> None:
+        self._collect_started = time.perf_counter()
+
+    def collection_finished(self, items: int) -> None:
+        self.collection_ms = (time.perf_counter() - self._collect_started) * 1000
+        self.items = items
+        self.loaded = loaded_frameworks()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "imports": self.imports,
+            "collection_ms": self.collection_ms,
+            "items": self.items,
+            "loaded": self.loaded,
+        }
+
+
+def loaded_frameworks() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def report_lines(reports: Dict[str, Dict[str, Any]]) -> List[str]:
+    """One block per process ("main" or the xdist worker id)."""
+    lines = []
+    for process, report in sorted(reports.items()):
+        imports = report["imports"]
+        total = sum(imports.values())
+        detail = ", ".join(f"{name} {ms:.0f} ms" for name, ms in imports.items())
+        lines.append(f"{process}: plugins imported in {total:.0f} ms ({detail})")
+        lines.append(f"{process}: collected {report['items']} items in {report['collection_ms']:.0f} ms")
+        not_loaded = [name for name in HEAVY_MODULES if name not in report["loaded"]]
+        lines.append(
+            f"{process}: loaded {', '.join(report['loaded']) or 'none'}; "
+            f"not loaded {', '.join(not_loaded) or 'none'}"
+        )
+    return lines
+
+
+STARTUP = StartupTimes()
@@ -0,0 +1,320 @@
+"""
+Step-Level Span Tracer
+
+Records nested, timed spans for every test so a slow run can be attributed to connect,
+navigation, locator waits, screenshots, Appium commands or our own Python code, and
+exports them as Chrome trace-event JSON that Perfetto (ui.perfetto.dev) or
+chrome://tracing can open.
+
+Spans come from:
+    - step():      `with step("search"):` blocks and `@step` / `@step("name")` decorators
+    - Playwright:  key BrowserType, Browser, BrowserContext, Page and Locator methods
+    - Appium:      every remote command, through WebDriver.execute
+    - pytest:      one span per test plus its setup / call / teardown phases
+
+Recording is a no-op until enable() is called, and a span is two perf_counter_ns()
+calls and a list append, so the wrappers stay cheap when enabled.
+
+Each xdist worker becomes one process track (pid) in the trace; threads inside a worker
+(e.g. background samplers) get their own thread tracks.
+
+Usage:
+    pytest web/ --trace-steps
+    pytest web/ -n 4 --trace-steps --trace-dir=traces --trace-top=15
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+PLAYWRIGHT_METHODS = {
+    "BrowserType": ("connect", "launch", "launch_persistent_context"),
+    "Browser": ("new_context", "new_page", "close"),
+    "BrowserContext": ("new_page", "close", "storage_state"),
+    "Page": (
+        "goto", "reload", "go_back", "click", "fill", "press", "type", "check",
+        "select_option", "wait_for_selector", "wait_for_load_state", "wait_for_timeout",
+        "wait_for_function", "evaluate", "content", "screenshot", "text_content",
+        "title", "set_viewport_size", "query_selector", "close",
+    ),
+    "Locator": (
+        "click", "fill", "press", "type", "check", "is_visible", "count", "evaluate",
+        "text_content", "inner_text", "bounding_box", "screenshot", "wait_for",
+    ),
+}
+
+_tracer: Optional["Tracer"] = None
+_instrumented = False
+# Open step names per thread, so background samplers can tag data with the running step.
+_active_steps: Dict[int, List[str]] = {}
+# Recently finished steps as (name, start, end) in wall clock seconds, traced or not.
+_step_history: Deque[Tuple[str, float, float]] = deque(maxlen=2048)
+
+
+class Tracer:
+    """Collects spans for one process (one xdist worker)."""
+
+    def __init__(self, worker_id: str = "main"):
+        self.worker_id = worker_id
+        self.test_id: Optional[str] = None
+        self.events: List[Tuple[str, str, int, int, int, Optional[str], Optional[Dict[str, Any]]]] = []
+        # Wall clock anchor so traces of different workers line up when merged.
+        self._epoch_us = time.time_ns() // 1000
+        self._origin_ns = time.perf_counter_ns()
+        self._threads: Dict[int, int] = {}
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            tid = self._threads[ident] = len(self._threads) + 1
+        return tid
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        end_ns: int,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.events.append((name, category, start_ns, end_ns, self._tid(), self.test_id, args))
+
+    def trace_events(self, pid: int) -> List[Dict[str, Any]]:
+        """Spans as Chrome trace 'complete' events, plus track names."""
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.worker_id}},
+        ]
+        for ident, tid in self._threads.items():
+            thread_name = "main" if ident == threading.main_thread().ident else f"thread-{tid}"
+            events.append(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            )
+        for name, category, start_ns, end_ns, tid, test_id, args in self.events:
+            event_args = dict(args) if args else {}
+            if test_id:
+                event_args["test"] = test_id
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": self._epoch_us + (start_ns - self._origin_ns) / 1000,
+                    "dur": (end_ns - start_ns) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": event_args,
+                }
+            )
+        return events
+
+    def write(self, path: str, pid: int = 0) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(pid), "displayTimeUnit": "ms"}, f)
+
+
+def enable(worker_id: str = "main") -> Tracer:
+    """Start recording in this process and instrument Playwright and Appium."""
+    global _tracer
+    _tracer = Tracer(worker_id)
+    instrument()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def active_step(thread_ident: Optional[int] = None) -> Optional[str]:
+    """Innermost open step on a thread (default: the calling thread), traced or not."""
+    stack = _active_steps.get(thread_ident or threading.get_ident())
+    return stack[-1] if stack else None
+
+
+def step_windows(name: Optional[str] = None, since: float = 0.0) -> List[Tuple[str, float, float]]:
+    """Finished steps (optionally only `name`) that started at or after `since` (time.time())."""
+    return [
+        window
+        for window in list(_step_history)
+        if window[1] >= since and (name is None or window[0] == name)
+    ]
+
+
+class _Step(ContextDecorator):
+    def __init__(self, name: Optional[str], category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start: Optional[int] = None
+        self._wall_start = 0.0
+
+    def _recreate_cm(self):
+        # Fresh instance per decorated call, so recursion and threads don't share state.
+        return _Step(self.name, self.category, self.args)
+
+    def __call__(self, func):
+        if self.name is None:
+            return _Step(func.__qualname__, self.category, self.args)(func)
+        return super().__call__(func)
+
+    def __enter__(self):
+        _active_steps.setdefault(threading.get_ident(), []).append(self.name)
+        self._wall_start = time.time()
+        if _tracer is not None:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = _active_steps.get(threading.get_ident())
+        if stack:
+            stack.pop()
+        _step_history.append((self.name, self._wall_start, time.time()))
+        tracer = _tracer
+        if tracer is not None and self._start is not None:
+            args = dict(self.args, error=exc_type.__name__) if exc_type else self.args
+            tracer.record(self.name, self.category, self._start, time.perf_counter_ns(), args or None)
+        return False
+
+
+def step(name=None, category: str = "step", **args):
+    """
+    Time a block or function as a named span.
+
+        with step("accept cookies"):
+            ...
+
+        @step
+        def _test_navigation(self, driver, elements): ...
+    """
+    if callable(name):
+        return _Step(name.__qualname__, category, args)(name)
+    return _Step(name, category, args)
+
+
+def _traced(func, name: str, category: str):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.record(name, category, start, time.perf_counter_ns())
+
+    return wrapper
+
+
+def _traced_execute(execute):
+    @functools.wraps(execute)
+    def wrapper(self, driver_command, params=None):
+        tracer = _tracer
+        if tracer is None:
+            return execute(self, driver_command, params)
+        start = time.perf_counter_ns()
+        try:
+            return execute(self, driver_command, params)
+        finally:
+            tracer.record(f"appium.{driver_command}", "appium", start, time.perf_counter_ns())
+
+    return wrapper
+
+
+def instrument() -> None:
+    """Wrap Playwright sync API methods and the Selenium/Appium command executor once."""
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    try:
+        from playwright import sync_api
+    except ImportError:
+        sync_api = None
+    if sync_api is not None:
+        for class_name, methods in PLAYWRIGHT_METHODS.items():
+            cls = getattr(sync_api, class_name)
+            for method in methods:
+                original = getattr(cls, method, None)
+                if original is not None:
+                    setattr(cls, method, _traced(original, f"{class_name}.{method}", "playwright"))
+
+    try:
+        from selenium.webdriver.remote.webdriver import WebDriver
+    except ImportError:
+        return
+    WebDriver.execute = _traced_execute(WebDriver.execute)
+
+
+def merge_traces(paths: List[str], output: str) -> List[Dict[str, Any]]:
+    """Combine per-worker trace files into one; returns the merged events."""
+    events: List[Dict[str, Any]] = []
+    for path in sorted(paths):
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.load(f)["traceEvents"])
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return events
+
+
+def summarize(
+    events: List[Dict[str, Any]],
+    top: int = 10,
+    skip_categories: Tuple[str, ...] = ("test",),
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate spans by name: count, total and self time (time not covered by child
+    spans, e.g. our own Python in pytest.call). Per-test spans are skipped since each
+    name occurs once. Sorted by total time.
+    """
+    spans = sorted(
+        (e for e in events if e.get("ph") == "X"),
+        key=lambda e: (e["pid"], e["tid"], e["ts"], -e["dur"]),
+    )
+    stats: Dict[str, Dict[str, float]] = {}
+    child_time: Dict[int, float] = {}
+    stack: List[Tuple[int, Dict[str, Any]]] = []
+    for index, span in enumerate(spans):
+        track = (span["pid"], span["tid"])
+        while stack and (
+            (stack[-1][1]["pid"], stack[-1][1]["tid"]) != track
+            or stack[-1][1]["ts"] + stack[-1][1]["dur"] <= span["ts"]
+        ):
+            stack.pop()
+        if stack:
+            parent_index = stack[-1][0]
+            child_time[parent_index] = child_time.get(parent_index, 0.0) + span["dur"]
+        stack.append((index, span))
+
+    for index, span in enumerate(spans):
+        if span.get("cat") in skip_categories:
+            continue
+        entry = stats.setdefault(span["name"], {"count": 0, "total_us": 0.0, "self_us": 0.0})
+        entry["count"] += 1
+        entry["total_us"] += span["dur"]
+        entry["self_us"] += max(0.0, span["dur"] - child_time.get(index, 0.0))
+
+    rows = [
+        {
+            "name": name,
+            "count": int(entry["count"]),
+            "total_ms": entry["total_us"] / 1000,
+            "mean_ms": entry["total_us"] / 1000 / entry["count"],
+            "self_ms": entry["self_us"] / 1000,
+        }
+        for name, entry in stats.items()
+    ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows[:top]
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Warm-Session Daemon and Watch Mode
+
+Every `pytest web/smart_ui_test.py` during development re-imports everything and
+re-creates its browser; a native test re-allocates a cloud device, which is minutes of
+setup for seconds of test. The warm daemon is a long-lived local process that owns
+those sessions across pytest invocations:
+
+    browsers   Chromium runs with a DevTools port and is attached to over CDP, so the
+               same browser process serves every run. Firefox and WebKit come from a
+               Playwright browser server started by the daemon.
+    devices    Appium sessions are created on first request, leased to one test at a
+               time and handed back after the test; the app is restarted in-session
+               instead of allocating a new device. Idle sessions get a keepalive
+               command so the cloud does not reclaim them.
+
+The fixtures attach to it over a local HTTP socket (127.0.0.1, --warm-port) when it
+is running, and behave as before when it is not (or with --no-warm):
+    - browser_pool (--backend=local) connects to the daemon's browsers instead of
+      launching its own.
+    - android_driver / ios_driver lease a session with the same capabilities
+      (test name and build aside) and attach to it by session id.
+Cloud Playwright browsers (--backend=lambdatest) belong to the connection that opened
+them and cannot outlive a pytest process, so watch web tests with --backend=local.
+
+Watch mode polls the repository for saved .py files and re-runs the test files that
+import a changed module (directly or through other modules); a change to conftest.py
+or a plugin re-runs every watched target. It starts a daemon in-process unless one is
+already running, and quits its sessions on Ctrl+C. A standalone daemon quits its
+sessions and exits after --idle-minutes without requests.
+
+Usage:
+    python -m support.warm_daemon start --prewarm chromium
+    python -m support.warm_daemon status
+    python -m support.warm_daemon stop
+    python -m support.warm_daemon watch web/smart_ui_test.py mobile/ -- --backend=local -x
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = int(os.getenv("WARM_DAEMON_PORT", "47411"))
+DEFAULT_IDLE_MINUTES = 30.0
+KEEPALIVE_SECONDS = 60.0
+BROWSERS = ("chromium", "firefox", "webkit")
+# Capabilities that only label a session on the dashboard; warm sessions ignore them.
+LABEL_CAPABILITIES = ("build", "name")
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules", ".result_cache", "logs"}
+
+
+# Client side (used by the pytest fixtures)
+class WarmClient:
+    """JSON-over-HTTP client of the daemon on this machine."""
+
+    def __init__(self, port: int = DEFAULT_PORT, timeout: float = 600.0):
+        self.port = port
+        self.timeout = timeout
+        # Never send localhost requests through an HTTP proxy from the environment.
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def call(self, op: str, timeout: Optional[float] = None, **params) -> Dict[str, Any]:
+        request = urllib.request.Request(
+            f"{self.url}/{op}",
+            data=json.dumps(params).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with self._opener.open(request, timeout=timeout or self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"Warm daemon {op} failed: {json.load(e).get('error')}") from None
+
+    def available(self) -> bool:
+        try:
+            return self.call("ping", timeout=1.0).get("ok", False)
+        except (urllib.error.URLError, OSError, ValueError, RuntimeError):
+            return False
+
+    def browser(self, name: str) -> Dict[str, str]:
+        """{"protocol": "cdp" | "playwright", "url": ...} of the daemon's browser of a type."""
+        return self.call("browser", name=name)
+
+    def acquire_session(self, executor: str, capabilities: Dict[str, Any]) -> Dict[str, Any]:
+        """Lease an Appium session with these capabilities, creating it if none is idle."""
+        return self.call("acquire", executor=executor, capabilities=capabilities)
+
+    def release_session(self, session_id: str, reset: bool = True) -> None:
+        self.call("release", session_id=session_id, reset=reset)
+
+
+def attach_appium(lease: Dict[str, Any]):
+    """Appium driver bound to a leased session: no new session is created, quit() is never called."""
+    from appium import webdriver
+    from appium.webdriver.webdriver import AppiumOptions
+
+    class AttachedRemote(webdriver.Remote):
+        def start_session(self, capabilities, browser_profile=None):
+            self.session_id = lease["session_id"]
+            self.caps = lease["capabilities"]
+
+    return AttachedRemote(command_executor=lease["executor"], options=AppiumOptions())
+
+
+# Daemon side
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(check, timeout: float, what: str):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = check()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {what}")
+
+
+class WarmBrowsers:
+    """Browser processes owned by the daemon, started on first request."""
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self.endpoints: Dict[str, Dict[str, str]] = {}
+        self._processes: List[subprocess.Popen] = []
+        self._profile_dir: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def endpoint(self, name: str) -> Dict[str, str]:
+        if name not in BROWSERS:
+            raise ValueError(f"Unknown browser {name!r}; use one of {BROWSERS}")
+        with self._lock:
+            if name not in self.endpoints:
+                if name == "chromium":
+                    self.endpoints[name] = {"protocol": "cdp", "url": self._start_chromium()}
+                else:
+                    # One browser server hands out Firefox and WebKit browsers.
+                    server = self.endpoints.get("server") or {"protocol": "playwright", "url": self._start_server()}
+                    self.endpoints["server"] = server
+                    self.endpoints[name] = server
+            return self.endpoints[name]
+
+    def _spawn(self, args: List[str], **kwargs) -> None:
+        # Own process group: `python -m playwright` runs the server in a node child process.
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        self._processes.append(subprocess.Popen(args, **kwargs))
+
+    def _start_chromium(self) -> str:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            executable = p.chromium.executable_path
+        self._profile_dir = tempfile.mkdtemp(prefix="warm-chromium-")
+        args = [
+            executable,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self._spawn(args + ["about:blank"], stderr=subprocess.DEVNULL)
+        port_file = os.path.join(self._profile_dir, "DevToolsActivePort")
+        port = _wait_for(
+            lambda: os.path.exists(port_file) and open(port_file).readline().strip(), 30, "Chromium to start"
+        )
+        logger.info("Warm Chromium listening on DevTools port %s", port)
+        return f"http://127.0.0.1:{port}"
+
+    def _start_server(self) -> str:
+        port = _free_port()
+        self._spawn(
+            [sys.executable, "-m", "playwright", "run-server", "--host", "127.0.0.1", "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+        )
+
+        def listening() -> bool:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return True
+            except OSError:
+                return False
+
+        _wait_for(listening, 30, "the Playwright browser server")
+        logger.info("Warm Playwright browser server on port %s", port)
+        return f"ws://127.0.0.1:{port}/"
+
+    def close(self) -> None:
+        for process in self._processes:
+            if os.name == "posix":
+                try:
+                    os.killpg(process.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            else:
+                process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
+        self.endpoints.clear()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+
+class WarmSession:
+    """An Appium session owned by the daemon."""
+
+    def __init__(self, key: str, executor: str, driver, app_id: Optional[str]):
+        self.key = key
+        self.executor = executor
+        self.driver = driver
+        self.app_id = app_id
+        self.leased = False
+        self.uses = 0
+        self.created = time.time()
+        self.last_used = self.created
+
+    def healthy(self) -> bool:
+        try:
+            self.driver.orientation
+            return True
+        except Exception as e:
+            logger.info("Warm session %s is gone: %s", self.driver.session_id, e)
+            return False
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning("Failed to quit warm session %s: %s", self.driver.session_id, e)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.driver.session_id,
+            "key": self.key[:12],
+            "leased": self.leased,
+            "uses": self.uses,
+            "age_s": round(time.time() - self.created),
+        }
+
+
+def _session_key(executor: str, capabilities: Dict[str, Any]) -> str:
+    options = {k: v for k, v in capabilities.get("LT:Options", {}).items() if k not in LABEL_CAPABILITIES}
+    stable = {**capabilities, "LT:Options": options}
+    return hashlib.sha256(json.dumps([executor, stable], sort_keys=True).encode()).hexdigest()
+
+
+class WarmSessions:
+    """Appium sessions keyed by their capabilities, leased to one test at a time."""
+
+    def __init__(self):
+        self.sessions: Dict[str, WarmSession] = {}
+        self.created = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, executor: str, capabilities: Dict[str, Any]) -> Dict[str, Any]:
+        key = _session_key(executor, capabilities)
+        while True:
+            with self._lock:
+                session = next((s for s in self.sessions.values() if s.key == key and not s.leased), None)
+                if session is None:
+                    break
+                session.leased = True
+            if session.healthy():
+                self.reused += 1
+                return self._lease(session, reused=True)
+            self._drop(session)
+
+        session = self._create(key, executor, capabilities)
+        with self._lock:
+            self.sessions[session.driver.session_id] = session
+            self.created += 1
+        return self._lease(session, reused=False)
+
+    def _create(self, key: str, executor: str, capabilities: Dict[str, Any]) -> WarmSession:
+        from appium import webdriver
+        from appium.webdriver.webdriver import AppiumOptions
+
+        options = dict(capabilities.get("LT:Options", {}))
+        options["name"] = f"Warm session - {options.get('deviceName', options.get('platformName'))}"
+        logger.info("Creating warm %s session on %s", options.get("platformName"), options.get("deviceName"))
+        driver = webdriver.Remote(
+            command_executor=executor,
+            options=AppiumOptions().load_capabilities({**capabilities, "LT:Options": options}),
+        )
+        session = WarmSession(key, executor, driver, options.get("appPackage") or options.get("bundleId"))
+        session.leased = True
+        return session
+
+    def _lease(self, session: WarmSession, reused: bool) -> Dict[str, Any]:
+        session.uses += 1
+        session.last_used = time.time()
+        return {
+            "session_id": session.driver.session_id,
+            "executor": session.executor,
+            "capabilities": session.driver.capabilities,
+            "reused": reused,
+        }
+
+    def release(self, session_id: str, reset: bool = True) -> None:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        if reset and session.app_id:
+            # Restart the app in the same session, so the next test starts from its launch screen.
+            try:
+                session.driver.terminate_app(session.app_id)
+                session.driver.activate_app(session.app_id)
+            except Exception as e:
+                logger.info("App reset failed, dropping warm session %s: %s", session_id, e)
+                self._drop(session)
+                return
+        session.last_used = time.time()
+        session.leased = False
+
+    def keepalive(self) -> None:
+        """Touch idle sessions so the cloud's idle timeout does not end them."""
+        with self._lock:
+            idle = [s for s in self.sessions.values() if not s.leased]
+            for session in idle:
+                session.leased = True
+        for session in idle:
+            if session.healthy():
+                session.leased = False
+            else:
+                self._drop(session)
+
+    def _drop(self, session: WarmSession) -> None:
+        with self._lock:
+            self.sessions.pop(session.driver.session_id, None)
+        session.quit()
+
+    def close(self) -> None:
+        for session in list(self.sessions.values()):
+            self._drop(session)
+
+
+class WarmDaemonHandler(BaseHTTPRequestHandler):
+    daemon: "WarmDaemon"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+            status, body = 200, self.daemon.handle(self.path.strip("/"), params)
+        except Exception as e:
+            logger.exception("Warm daemon request %s failed", self.path)
+            status, body = 500, {"error": str(e)}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class WarmDaemon:
+    """The daemon's HTTP server, its browsers and sessions and the keepalive thread."""
+
+    def __init__(self, port: int = DEFAULT_PORT, headless: bool = True, idle_minutes: Optional[float] = None):
+        self.browsers = WarmBrowsers(headless=headless)
+        self.sessions = WarmSessions()
+        self.idle_seconds = idle_minutes * 60 if idle_minutes else None
+        self.last_request = time.monotonic()
+        handler = type("Handler", (WarmDaemonHandler,), {"daemon": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle(self, op: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.last_request = time.monotonic()
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "browser":
+            return self.browsers.endpoint(params["name"])
+        if op == "acquire":
+            return self.sessions.acquire(params["executor"], params["capabilities"])
+        if op == "release":
+            self.sessions.release(params["session_id"], params.get("reset", True))
+            return {"ok": True}
+        if op == "status":
+            return {
+                "pid": os.getpid(),
+                "browsers": sorted(name for name in self.browsers.endpoints if name != "server"),
+                "sessions": [s.as_dict() for s in list(self.sessions.sessions.values())],
+                "created": self.sessions.created,
+                "reused": self.sessions.reused,
+            }
+        if op == "shutdown":
+            self._stop_serving()
+            return {"ok": True}
+        raise ValueError(f"Unknown warm daemon request {op!r}")
+
+    def _maintain(self) -> None:
+        while not self._stopped.wait(KEEPALIVE_SECONDS):
+            self.sessions.keepalive()
+            if self.idle_seconds and time.monotonic() - self.last_request > self.idle_seconds:
+                logger.info("No requests for %.0f minutes, shutting down", self.idle_seconds / 60)
+                self._stop_serving()
+                return
+
+    def _stop_serving(self) -> None:
+        # shutdown() blocks until serve_forever() returns, so never call it on a request thread.
+        threading.Thread(target=self.httpd.shutdown, daemon=True).start()
+
+    def start(self) -> "WarmDaemon":
+        """Serve on background threads (watch mode); serve_forever() blocks instead."""
+        serving = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        serving.start()
+        self._threads.append(serving)
+        self._start_maintenance()
+        logger.info("Warm daemon listening at %s", self.url)
+        return self
+
+    def _start_maintenance(self) -> None:
+        maintenance = threading.Thread(target=self._maintain, daemon=True)
+        maintenance.start()
+        self._threads.append(maintenance)
+
+    def serve_forever(self) -> None:
+        self._start_maintenance()
+        logger.info("Warm daemon listening at %s", self.url)
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop serving and quit every session and browser the daemon owns."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.sessions.close()
+        self.browsers.close()
+
+
+# Watch mode
+def _is_test_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _python_files(root: str) -> Iterable[str]:
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in files:
+            if name.endswith(".py"):
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+
+def _module_name(path: str) -> str:
+    module = path[:-3].replace(os.sep, ".")
+    return module[: -len(".__init__")] if module.endswith(".__init__") else module
+
+
+class ImportGraph:
+    """Which repository modules each .py file imports, and the reverse."""
+
+    def __init__(self, root: str = "."):
+        self.root = root
+        self.modules = {_module_name(path): path for path in _python_files(root)}
+        self.importers: Dict[str, Set[str]] = {path: set() for path in self.modules.values()}
+        for module, path in self.modules.items():
+            for imported in self._imports(module, path):
+                self.importers[self.modules[imported]].add(path)
+
+    def _imports(self, module: str, path: str) -> Set[str]:
+        try:
+            with open(os.path.join(self.root, path), "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            return set()
+        package = module.rpartition(".")[0] if not path.endswith("__init__.py") else module
+        names: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parts = package.split(".") if package else []
+                    parts = parts[: len(parts) - node.level + 1]
+                    base = ".".join(parts + ([base] if base else []))
+                names.add(base)
+                names.update(f"{base}.{alias.name}" for alias in node.names)
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str) and path.endswith("conftest.py"):
+                # pytest_plugins = ("support.plugin", ...)
+                names.add(node.value)
+        found = set()
+        for name in names:
+            # "web.backends.BrowserPool" -> web.backends; parents are imported too.
+            parts = name.split(".")
+            for i in range(len(parts), 0, -1):
+                candidate = ".".join(parts[:i])
+                if candidate in self.modules and candidate != module:
+                    found.add(candidate)
+        return found
+
+    def dependents(self, path: str) -> Set[str]:
+        """The file and every file that imports it, directly or not."""
+        seen = {path}
+        pending = [path]
+        while pending:
+            for importer in self.importers.get(pending.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    pending.append(importer)
+        return seen
+
+    def affected_tests(self, changed: Iterable[str], targets: List[str]) -> List[str]:
+        """Test files under targets to re-run for the changed files."""
+        tests: Set[str] = set()
+        everything = False
+        for path in changed:
+            dependents = self.dependents(path)
+            if any(os.path.basename(p) == "conftest.py" for p in dependents):
+                everything = True
+            tests.update(p for p in dependents if _is_test_file(p))
+        if everything:
+            return list(targets)
+
+        def watched(path: str) -> bool:
+            return any(
+                os.path.normpath(target) in (".", path) or path.startswith(os.path.normpath(target) + os.sep)
+                for target in targets
+            )
+
+        return sorted(t for t in tests if watched(t))
+
+
+def _mtimes(root: str) -> Dict[str, float]:
+    mtimes = {}
+    for path in _python_files(root):
+        try:
+            mtimes[path] = os.path.getmtime(os.path.join(root, path))
+        except OSError:
+            pass
+    return mtimes
+
+
+def _run_pytest(tests: List[str], pytest_args: List[str], port: int) -> int:
+    command = [sys.executable, "-m", "pytest", *tests, *pytest_args]
+    print(f"\n$ {' '.join(command[1:])}", flush=True)
+    return subprocess.run(command, env={**os.environ, "WARM_DAEMON_PORT": str(port)}).returncode
+
+
+def watch(
+    targets: List[str],
+    pytest_args: List[str],
+    port: int = DEFAULT_PORT,
+    root: str = ".",
+    interval: float = 0.5,
+    headless: bool = True,
+) -> int:
+    """Run the targets, then re-run the affected test files whenever a .py file is saved."""
+    daemon = None
+    if not WarmClient(port).available():
+        daemon = WarmDaemon(port, headless=headless).start()
+    try:
+        _run_pytest(targets, pytest_args, port)
+        mtimes = _mtimes(root)
+        print(f"Watching {root} for changes (Ctrl+C to stop)", flush=True)
+        while True:
+            time.sleep(interval)
+            current = _mtimes(root)
+            changed = sorted(p for p in current if current[p] != mtimes.get(p))
+            if not changed:
+                continue
+            # Editors often write a file in several steps; let it settle.
+            time.sleep(interval)
+            mtimes = _mtimes(root)
+            tests = ImportGraph(root).affected_tests(changed, targets)
+            print(f"\nChanged: {', '.join(changed)}", flush=True)
+            if tests:
+                _run_pytest(tests, pytest_args, port)
+            else:
+                print("No watched tests depend on the change", flush=True)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if daemon:
+            daemon.stop()
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    # Arguments after "--" are passed on to pytest by watch.
+    pytest_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    argv = argv[: argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description="Keep browsers and device sessions warm between pytest runs")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    start_cmd = sub.add_parser("start", help="Run the daemon in the foreground")
+    start_cmd.add_argument("--idle-minutes", type=float, default=DEFAULT_IDLE_MINUTES)
+    start_cmd.add_argument("--headed", action="store_true", help="Show the browser windows")
+    start_cmd.add_argument("--prewarm", default="", help="Comma-separated browsers to start now, e.g. 'chromium'")
+    sub.add_parser("status", help="Show the daemon's browsers and sessions")
+    sub.add_parser("stop", help="Quit the daemon's sessions and stop it")
+    watch_cmd = sub.add_parser("watch", help="Re-run affected tests on file save (pytest args after --)")
+    watch_cmd.add_argument("targets", nargs="*", default=["."])
+    watch_cmd.add_argument("--interval", type=float, default=0.5, help="Seconds between file checks")
+    watch_cmd.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    client = WarmClient(args.port)
+    # Quit sessions and browser processes on `kill` as on Ctrl+C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    if args.command == "start":
+        if client.available():
+            print(f"A warm daemon is already running at {client.url}")
+            return 1
+        daemon = WarmDaemon(args.port, headless=not args.headed, idle_minutes=args.idle_minutes)
+        for name in filter(None, (b.strip() for b in args.prewarm.split(","))):
+            daemon.browsers.endpoint(name)
+        daemon.serve_forever()
+        return 0
+    if args.command == "watch":
+        return watch(args.targets, pytest_args, args.port, interval=args.interval, headless=not args.headed)
+
+    if not client.available():
+        print(f"No warm daemon at {client.url}")
+        return 1
+    if args.command == "status":
+        status = client.call("status")
+        print(f"Warm daemon {status['pid']} at {client.url}")
+        print(f"Browsers: {', '.join(status['browsers']) or '-'}")
+        print(f"Sessions: {status['created']} created, {status['reused']} reuses")
+        for session in status["sessions"]:
+            state = "leased" if session["leased"] else "idle"
+            print(f"  {session['session_id']} {state:<6} {session['uses']:>4} uses  {session['age_s']}s old")
+    elif args.command == "stop":
+        client.call("shutdown")
+        print("Warm daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Unit tests for mobile/actions.py: the W3C Actions payloads ActionSequence builds."""
+
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+from mobile import actions
+from mobile.actions import ActionSequence, press_keycodes
+
+PAUSE = {"type": "pause", "duration": 0}
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.commands = []
+        self.keycodes = []
+
+    def execute(self, command, params=None):
+        self.commands.append((command, params))
+
+    def press_keycode(self, code):
+        self.keycodes.append(code)
+
+
+def move(x, y, duration=0):
+    return {"type": "pointerMove", "duration": duration, "x": x, "y": y, "origin": "viewport"}
+
+
+def test_swipe_payload():
+    payload = ActionSequence(None).swipe(200, 1400, 200, 600, duration_ms=500).payload()
+    assert payload == {
+        "actions": [
+            {
+                "type": "pointer",
+                "id": "finger1",
+                "parameters": {"pointerType": "touch"},
+                "actions": [
+                    move(200, 1400),
+                    {"type": "pointerDown", "button": 0},
+                    move(200, 600, 500),
+                    {"type": "pointerUp", "button": 0},
+                ],
+            }
+        ]
+    }
+
+
+def test_every_source_gets_one_action_per_tick():
+    payload = ActionSequence(None).tap(10, 10).pinch((540, 1200), 400, 100).payload()
+    finger1, finger2 = payload["actions"]
+    assert len(finger1["actions"]) == len(finger2["actions"]) == 8
+    # finger2 joins at the pinch and idles through the tap's four ticks.
+    assert finger2["actions"][:4] == [PAUSE] * 4
+    assert finger1["actions"][4] == move(340, 1200)
+    assert finger2["actions"][4] == move(740, 1200)
+    assert finger1["actions"][6] == move(490, 1200, 500)
+    assert finger2["actions"][6] == move(590, 1200, 500)
+
+
+def test_chord_holds_keys_in_consecutive_ticks():
+    payload = ActionSequence(None).chord(Keys.CONTROL, "a").payload()
+    assert payload["actions"] == [
+        {
+            "type": "key",
+            "id": "keyboard",
+            "actions": [
+                {"type": "keyDown", "value": Keys.CONTROL},
+                {"type": "keyDown", "value": "a"},
+                {"type": "keyUp", "value": "a"},
+                {"type": "keyUp", "value": Keys.CONTROL},
+            ],
+        }
+    ]
+
+
+def test_pause_applies_to_every_source():
+    payload = ActionSequence(None).tap(1, 2, hold_ms=0).type("x").pause(300).payload()
+    for source in payload["actions"]:
+        assert source["actions"][-1] == {"type": "pause", "duration": 300}
+
+
+def test_perform_sends_one_request():
+    driver = RecordingDriver()
+    ActionSequence(driver).perform()
+    assert driver.commands == []
+    sequence = ActionSequence(driver).type("ab", delay_ms=100)
+    sequence.perform()
+    assert driver.commands == [(Command.W3C_ACTIONS, sequence.payload())]
+
+
+def test_press_keycodes_with_key_values_uses_one_request():
+    driver = RecordingDriver()
+    assert press_keycodes(driver, [66, 67], pause_ms=200) == 1
+    (command, payload), = driver.commands
+    assert payload["actions"][0]["actions"] == [
+        {"type": "keyDown", "value": Keys.ENTER},
+        {"type": "keyUp", "value": Keys.ENTER},
+        {"type": "pause", "duration": 200},
+        {"type": "keyDown", "value": Keys.BACKSPACE},
+        {"type": "keyUp", "value": Keys.BACKSPACE},
+    ]
+    assert driver.keycodes == []
+
+
+def test_press_keycodes_presses_hardware_keys_one_by_one(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(actions.time, "sleep", sleeps.append)
+    driver = RecordingDriver()
+    assert press_keycodes(driver, [4, 3, 187], pause_ms=500) == 3
+    assert driver.commands == []
+    assert driver.keycodes == [4, 3, 187]
+    assert sleeps == [0.5, 0.5]
@@ -0,0 +1,49 @@
+"""Unit tests for web/content_match.py: streaming term matches over saved snapshots."""
+
+import pytest
+
+from web.content_match import SnapshotTermMatcher, match_snapshot
+
+HTML = (
+    "<html><head><style>.iphone { color: red }</style><script>var Samsung = 1;</script></head>"
+    "<body><div class='product'><h4>Apple <b>iPhone</b> 15 Pro</h4>"
+    "<p>In stock:   <span>HTC   Touch HD</span></p></div></body></html>"
+)
+
+
+def feed_in_chunks(html, size, terms):
+    matcher = SnapshotTermMatcher(terms, snippet_chars=10)
+    for start in range(0, len(html), size):
+        matcher.feed(html[start:start + size])
+    return matcher.close()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, len(HTML)])
+def test_terms_split_across_chunks_are_found(size):
+    result = feed_in_chunks(HTML, size, ["iPhone 15", "htc touch hd", "Samsung"])
+    assert result.found == ["iPhone 15", "htc touch hd"]
+    assert result.missing == ["Samsung"]  # only inside <script>
+
+
+def test_terms_split_across_inline_tags_are_found():
+    result = feed_in_chunks("<p>Mac<b>Book</b> Air</p>", 4, ["macbook air"])
+    assert result.all_found
+
+
+def test_block_tags_separate_words():
+    result = feed_in_chunks("<li>Mac</li><li>Book</li>", 4, ["MacBook"])
+    assert not result.all_found
+
+
+def test_snippet_has_context_and_collapsed_whitespace():
+    result = feed_in_chunks(HTML, len(HTML), ["HTC Touch"])
+    assert result.snippet("HTC Touch") == "In stock: HTC Touch HD"
+    # A term is reported as soon as it is seen; context after it is what had arrived by then.
+    assert feed_in_chunks(HTML, 5, ["HTC Touch"]).snippet("HTC Touch").startswith("In stock: HTC Touch")
+
+
+def test_matcher_stops_once_everything_is_found(tmp_path):
+    path = tmp_path / "snapshot.html"
+    path.write_text("<p>Apple iPhone</p>" + "<p>filler</p>" * 10000)
+    result = match_snapshot(str(path), ["iPhone"], chunk_size=64)
+    assert result.all_found
@@ -0,0 +1,52 @@
+"""Unit tests for mobile/device_logs.py: the ring buffer's bound and line round trip."""
+
+import os
+
+from mobile.device_logs import LogLine, LogRingBuffer, parse_entry
+
+
+def lines(count, start=0):
+    # Random messages barely compress, so every chunk has a predictable size.
+    return [LogLine(float(start + i), "I", "Tag", os.urandom(32).hex()) for i in range(count)]
+
+
+def test_buffer_stays_within_its_byte_bound():
+    buffer = LogRingBuffer(max_bytes=8 * 1024, chunk_lines=20)
+    buffer.extend(lines(2000))
+    assert buffer.compressed_bytes <= 8 * 1024
+    assert buffer.lines == 2000
+
+
+def test_oldest_lines_are_dropped_and_counted():
+    buffer = LogRingBuffer(max_bytes=8 * 1024, chunk_lines=20)
+    buffer.extend(lines(2000))
+    kept = list(buffer.query())
+    assert buffer.dropped_lines > 0
+    assert buffer.dropped_lines + len(kept) == 2000
+    # What is left is the newest lines, in order.
+    assert [line.timestamp for line in kept] == [float(i) for i in range(buffer.dropped_lines, 2000)]
+
+
+def test_newest_chunk_is_kept_even_when_larger_than_the_bound():
+    buffer = LogRingBuffer(max_bytes=1, chunk_lines=10)
+    buffer.extend(lines(25))
+    assert len(list(buffer.query())) == 15  # the last sealed chunk and the open lines
+
+
+def test_multi_line_messages_survive_compression():
+    message = "java.lang.IllegalStateException: boom\n\tat com.example.Main.run(Main.java:1)\n\tat X"
+    buffer = LogRingBuffer(chunk_lines=2)
+    buffer.extend([LogLine(1.0, "E", "AndroidRuntime", message), LogLine(2.0, "I", "Tag", "after")])
+    assert [line.message for line in buffer.query()] == [message, "after"]
+
+
+def test_query_by_time_window():
+    buffer = LogRingBuffer(chunk_lines=10)
+    buffer.extend(lines(35))
+    assert [line.timestamp for line in buffer.query(8, 12)] == [8.0, 9.0, 10.0, 11.0, 12.0]
+    assert [line.timestamp for line in buffer.query(33)] == [33.0, 34.0]
+
+
+def test_parse_logcat_entry():
+    entry = {"timestamp": 5000, "message": "10-19 12:00:00.123  1234  1250 W ActivityManager: Slow operation"}
+    assert parse_entry("android", entry, clock_offset=1.0) == LogLine(4.0, "W", "ActivityManager", "Slow operation")
@@ -0,0 +1,53 @@
+"""Unit tests for support/locator_profiler.py: ranking locators and flagging outliers."""
+
+from support.locator_profiler import aggregate
+
+
+def call(selector, resolve_ms=10.0, retries=0, error=None, wait_ms=0.0, action_ms=5.0):
+    return {
+        "platform": "android",
+        "strategy": "xpath",
+        "selector": selector,
+        "resolve_ms": resolve_ms,
+        "retries": retries,
+        "wait_ms": wait_ms,
+        "action_ms": action_ms,
+        "error": error,
+    }
+
+
+def rows_by_selector(calls):
+    return {row["selector"]: row for row in aggregate(calls)}
+
+
+def test_slow_outlier_is_flagged():
+    calls = [call(f"//fast{i}", resolve_ms=10.0 + i) for i in range(5)] + [call("//slow", resolve_ms=400.0)]
+    rows = rows_by_selector(calls)
+    assert rows["//slow"]["flags"] == ["slow"]
+    assert all(not rows[f"//fast{i}"]["flags"] for i in range(5))
+
+
+def test_small_differences_stay_under_the_floor():
+    # 3 MADs above the median, but less than SLOW_FLOOR_MS.
+    calls = [call(f"//a{i}", resolve_ms=10.0) for i in range(5)] + [call("//b", resolve_ms=20.0)]
+    assert not any(row["flags"] for row in aggregate(calls))
+
+
+def test_retry_outlier_and_errors_are_flagged():
+    calls = [call(f"//a{i}") for i in range(5)] + [call("//flaky", retries=4), call("//broken", error="NoSuchElement")]
+    rows = rows_by_selector(calls)
+    assert rows["//flaky"]["flags"] == ["retries"]
+    assert rows["//broken"]["flags"] == ["errors"]
+
+
+def test_too_few_locators_are_not_compared():
+    calls = [call("//a", resolve_ms=10.0), call("//b", resolve_ms=900.0)]
+    assert not any(row["flags"] for row in aggregate(calls))
+
+
+def test_rows_are_ranked_by_total_time():
+    calls = [call("//once", resolve_ms=50.0), call("//often"), call("//often"), call("//often", wait_ms=100.0)]
+    rows = aggregate(calls)
+    assert [row["selector"] for row in rows] == ["//often", "//once"]
+    assert rows[0]["calls"] == 3
+    assert rows[0]["total_ms"] == 3 * 15.0 + 100.0
@@ -0,0 +1,44 @@
+"""Unit tests for web/perf_metrics.py: parsing and checking performance budgets."""
+
+import pytest
+
+from web.perf_metrics import Budget
+
+
+@pytest.mark.parametrize(
+    "expression, field, op, limit",
+    [
+        ("LCP < 2.5s", "lcp_ms", "<", 2500),
+        ("ttfb<=300ms", "ttfb_ms", "<=", 300),
+        ("transfer < 1.5MB", "transfer_bytes", "<", 1.5 * 1024 ** 2),
+        ("CLS < 0.1", "cls", "<", 0.1),
+        ("heap < 50mb", "cdp.JSHeapUsedSize", "<", 50 * 1024 ** 2),
+        ("requests >= 10", "resources", ">=", 10),
+    ],
+)
+def test_parse(expression, field, op, limit):
+    budget = Budget.parse(expression)
+    assert (budget.field, budget.op, budget.limit) == (field, op, limit)
+    assert budget.expression == expression.strip()
+
+
+@pytest.mark.parametrize("expression", ["LCP", "LCP = 2s", "speed < 2s", "LCP < 2 parsecs"])
+def test_parse_rejects_invalid_budgets(expression):
+    with pytest.raises(ValueError):
+        Budget.parse(expression)
+
+
+def test_violation():
+    budget = Budget.parse("LCP < 2.5s")
+    assert budget.violation({"url": "https://a/", "lcp_ms": 2400}) is None
+    assert budget.violation({"url": "https://a/", "lcp_ms": 2500}) == "LCP < 2.5s failed on https://a/: LCP = 2500"
+
+
+def test_unmeasured_metrics_never_violate():
+    assert Budget.parse("LCP < 2.5s").violation({"url": "https://a/", "lcp_ms": None}) is None
+    assert Budget.parse("heap < 1mb").violation({"url": "https://a/"}) is None
+
+
+def test_cdp_metrics():
+    budget = Budget.parse("heap < 1mb")
+    assert budget.violation({"url": "u", "cdp": {"JSHeapUsedSize": 2 * 1024 ** 2}}) is not None
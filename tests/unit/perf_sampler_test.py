@@ -0,0 +1,46 @@
+"""Unit tests for mobile/perf_sampler.py: comparing app resource use between builds."""
+
+from mobile.perf_sampler import compare_builds
+
+
+def record(memory_kb, cpu_percent, test="mobile/t_test.py::test_x", steps=None):
+    return {
+        "test": test,
+        "platform": "android",
+        "summary": {
+            "overall": {"memory_kb": {"max": memory_kb}, "cpu_percent": {"mean": cpu_percent}},
+            "steps": steps or {},
+        },
+    }
+
+
+def test_no_regression_within_tolerance():
+    baseline = [record(100_000, 20)]
+    assert compare_builds(baseline, [record(110_000, 22)]) == []
+
+
+def test_regression_beyond_tolerance():
+    regressions = compare_builds([record(100_000, 20)], [record(130_000, 20)])
+    assert regressions == ["mobile/t_test.py::test_x [android]: max memory_kb 100000.0 -> 130000.0"]
+
+
+def test_small_absolute_changes_are_ignored():
+    # +50% CPU, but below the 5 point floor.
+    assert compare_builds([record(100_000, 4)], [record(100_000, 6)]) == []
+
+
+def test_medians_absorb_one_noisy_run():
+    baseline = [record(100_000, 20), record(101_000, 20), record(99_000, 20)]
+    current = [record(100_500, 20), record(300_000, 20), record(100_000, 20)]
+    assert compare_builds(baseline, current) == []
+
+
+def test_steps_are_compared_separately():
+    steps = {"_test_login": {"cpu_percent": {"mean": 10}}}
+    slow = {"_test_login": {"cpu_percent": {"mean": 30}}}
+    regressions = compare_builds([record(100_000, 20, steps=steps)], [record(100_000, 20, steps=slow)])
+    assert regressions == ["mobile/t_test.py::test_x [android] _test_login: mean cpu_percent 10.0 -> 30.0"]
+
+
+def test_tests_missing_from_the_baseline_are_skipped():
+    assert compare_builds([record(100_000, 20)], [record(900_000, 90, test="other")]) == []
@@ -0,0 +1,86 @@
+"""Unit tests for support/result_cache.py: what invalidates a test's cache key."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from support import result_cache
+from support.result_cache import ResultCache, cache_key
+
+
+def cached_test():
+    pass
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project root with a test module and a helper module next to it."""
+    monkeypatch.setattr(result_cache, "_package_digests", {})
+    (tmp_path / "conftest.py").write_text("pytest_plugins = ()\n")
+    package = tmp_path / "web"
+    package.mkdir()
+    (package / "helpers.py").write_text("TIMEOUT = 5\n")
+    (package / "other_test.py").write_text("def test_other(): pass\n")
+    (package / "search_test.py").write_text("def test_search(lt_page): pass\n")
+    return tmp_path
+
+
+def make_item(root, params=None, nodeid="web/search_test.py::test_search"):
+    return SimpleNamespace(
+        cls=None,
+        function=cached_test,
+        path=root / "web" / "search_test.py",
+        config=SimpleNamespace(pluginmanager=SimpleNamespace(get_plugins=lambda: [])),
+        _fixtureinfo=SimpleNamespace(name2fixturedefs={}),
+        callspec=SimpleNamespace(params=params or {"lt_browser": {"browser_name": "Chrome"}}),
+        nodeid=nodeid,
+    )
+
+
+def key(root, inputs=None, **item):
+    # Package digests are computed once per process; start over for every key.
+    result_cache._package_digests.clear()
+    return cache_key(make_item(root, **item), inputs or {}, str(root))
+
+
+def test_key_is_stable(project):
+    assert key(project) == key(project)
+
+
+def test_editing_the_test_module_invalidates(project):
+    before = key(project)
+    (project / "web" / "search_test.py").write_text("def test_search(lt_page): assert True\n")
+    assert key(project) != before
+
+
+def test_editing_a_helper_module_invalidates(project):
+    before = key(project)
+    (project / "web" / "helpers.py").write_text("TIMEOUT = 10\n")
+    assert key(project) != before
+
+
+def test_editing_another_test_module_does_not_invalidate(project):
+    before = key(project)
+    (project / "web" / "other_test.py").write_text("def test_other(): assert True\n")
+    assert key(project) == before
+
+
+def test_editing_the_root_conftest_invalidates(project):
+    before = key(project)
+    (project / "conftest.py").write_text("pytest_plugins = ('web.plugin',)\n")
+    assert key(project) != before
+
+
+def test_parameters_and_inputs_are_part_of_the_key(project):
+    before = key(project)
+    assert key(project, params={"lt_browser": {"browser_name": "Firefox"}}) != before
+    assert key(project, inputs={"page": "etag-2"}) != key(project, inputs={"page": "etag-1"})
+    assert key(project, nodeid="web/search_test.py::test_search[1]") != before
+
+
+def test_lookup_respects_the_ttl(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_hours=1)
+    cache.store("ab" * 32, "web/search_test.py::test_search", 12.5, 1)
+    assert cache.lookup("ab" * 32)["duration"] == 12.5
+    assert cache.lookup("ab" * 32, ttl=-1) is None
+    assert cache.lookup("cd" * 32) is None
@@ -0,0 +1,54 @@
+"""Unit tests for support/sharding.py: shard plans are deterministic and balanced."""
+
+import random
+
+from support.sharding import DEFAULT_DURATION, parse_shard, plan_shards
+
+TESTS = [(f"web/t_test.py::test_{i}", "chrome" if i % 3 else "firefox") for i in range(30)]
+DURATIONS = {nodeid: float(10 + (i * 7) % 50) for i, (nodeid, _) in enumerate(TESTS)}
+
+
+def test_plan_is_independent_of_collection_order():
+    shuffled = list(TESTS)
+    random.Random(1).shuffle(shuffled)
+    assert plan_shards(shuffled, DURATIONS, 4) == plan_shards(TESTS, DURATIONS, 4)
+
+
+def test_every_test_lands_on_exactly_one_shard():
+    plan = plan_shards(TESTS, DURATIONS, 4)
+    assert sorted(plan.assignment) == sorted(nodeid for nodeid, _ in TESTS)
+    assert set(plan.assignment.values()) == {0, 1, 2, 3}
+
+
+def test_ungrouped_tests_are_balanced_within_one_test():
+    tests = [(nodeid, nodeid) for nodeid, _ in TESTS]
+    plan = plan_shards(tests, DURATIONS, 4)
+    total = sum(DURATIONS.values())
+    assert abs(sum(plan.loads) - total) < 1e-6
+    assert max(plan.loads) <= total / 4 + max(DURATIONS.values())
+
+
+def test_groups_lighter_than_a_fair_share_stay_on_one_shard():
+    tests = [(f"t{i}", f"group{i % 4}") for i in range(16)]
+    plan = plan_shards(tests, {}, 4)
+    for group in range(4):
+        assert len({plan.assignment[f"t{i}"] for i in range(group, 16, 4)}) == 1
+    assert plan.loads == [4 * DEFAULT_DURATION] * 4
+
+
+def test_unknown_tests_get_the_median_duration():
+    tests = [("a", "g"), ("b", "g"), ("c", "g")]
+    plan = plan_shards(tests, {"a": 10.0, "b": 30.0}, 1)
+    assert plan.known == 2
+    assert plan.loads == [60.0]
+    assert plan_shards(tests, {}, 1).loads == [3 * DEFAULT_DURATION]
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for spec in ("0/4", "5/4", "x/4"):
+        try:
+            parse_shard(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec} was accepted")
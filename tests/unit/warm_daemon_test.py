@@ -0,0 +1,52 @@
+"""Unit tests for support/warm_daemon.py: which test files a change re-runs in watch mode."""
+
+import pytest
+
+from support.warm_daemon import ImportGraph
+
+FILES = {
+    "conftest.py": "pytest_plugins = ('support.plugin',)\n",
+    "support/__init__.py": "",
+    "support/plugin.py": "import os\n",
+    "support/jsonl.py": "import json\n",
+    "web/__init__.py": "",
+    "web/backends.py": "from support.jsonl import append_jsonl\n",
+    "web/search_test.py": "from web.backends import BrowserPool\n",
+    "web/form_test.py": "from . import backends\n",
+    "web/pdf_test.py": "import os\n",
+    "mobile/__init__.py": "",
+    "mobile/session.py": "import time\n",
+    "mobile/native_test.py": "from mobile.session import DeviceSession\n",
+}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    for path, source in FILES.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source)
+    return ImportGraph(str(tmp_path))
+
+
+def test_a_changed_test_file_re_runs_itself(graph):
+    assert graph.affected_tests(["web/pdf_test.py"], ["web"]) == ["web/pdf_test.py"]
+
+
+def test_importers_are_followed_transitively(graph):
+    assert graph.affected_tests(["support/jsonl.py"], ["web", "mobile"]) == [
+        "web/form_test.py",
+        "web/search_test.py",
+    ]
+
+
+def test_relative_imports_are_resolved(graph):
+    assert "web/form_test.py" in graph.affected_tests(["web/backends.py"], ["web"])
+
+
+def test_only_tests_under_the_targets_are_returned(graph):
+    assert graph.affected_tests(["mobile/session.py"], ["web"]) == []
+    assert graph.affected_tests(["mobile/session.py"], ["."]) == ["mobile/native_test.py"]
+
+
+def test_a_change_reaching_conftest_re_runs_all_targets(graph):
+    assert graph.affected_tests(["support/plugin.py"], ["web", "mobile"]) == ["web", "mobile"]
@@ -0,0 +1,169 @@
+"""
+Browser Backends for the Web Fixtures
+
+The lt_browser fixture can run every web test against one of three backends,
+selected with --backend (or the TEST_BACKEND environment variable):
+
+    lambdatest  One cloud browser per test, connected with the test's capabilities.
+    local       One headless browser per browser type per xdist worker, launched on
+                first use and kept for the whole session; each test gets fresh contexts.
+                With --profile-cache the browser runs as a persistent context on a
+                cached profile instead (see web/profile_cache.py).
+    gateway     Like local, but connected to a Playwright browser server at
+                --gateway-url (e.g. one started with `playwright run-server`).
+
+When the warm-session daemon is running (support/warm_daemon.py), the local backend
+connects to the daemon's browsers instead of launching its own, so the browser
+processes outlive the pytest run.
+
+Pooled browsers are recycled when the memory watchdog finds them over their limits
+(see web/memory_watchdog.py); the next test launches or connects a fresh one.
+
+Usage:
+    pytest web/ --backend=local
+    pytest web/ --backend=gateway --gateway-url=ws://127.0.0.1:3000/
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set
+
+from support.tracing import step
+from web.profile_cache import ProfileCache
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, BrowserType, Playwright
+
+    from support.warm_daemon import WarmClient
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("lambdatest", "local", "gateway")
+DEFAULT_BACKEND = os.getenv("TEST_BACKEND", "lambdatest")
+DEFAULT_GATEWAY_URL = os.getenv("PLAYWRIGHT_GATEWAY_URL", "ws://127.0.0.1:3000/")
+
+
+def browser_launcher(p: Playwright, browser_type: str) -> BrowserType:
+    """Map a test's browser_type parameter to a Playwright browser type."""
+    browser_map = {
+        "chrome": p.chromium,
+        "chromium": p.chromium,
+        "firefox": p.firefox,
+        "safari": p.webkit,
+        "edge": p.chromium,  # Edge is Chromium-based
+    }
+    launcher = browser_map.get((browser_type or "chrome").lower())
+    if not launcher:
+        raise ValueError(f"Unsupported browser type: {browser_type}")
+    return launcher
+
+
+class BrowserPool:
+    """Session-lived browsers keyed by Playwright browser type name."""
+
+    def __init__(
+        self,
+        p: Playwright,
+        backend: str,
+        headless: bool = True,
+        gateway_url: str = DEFAULT_GATEWAY_URL,
+        profile_cache: Optional[ProfileCache] = None,
+        prepare_context: Optional[Callable[[BrowserContext], None]] = None,
+        warm: Optional[WarmClient] = None,
+    ):
+        self.playwright = p
+        self.backend = backend
+        self.headless = headless
+        self.gateway_url = gateway_url
+        # Only local browsers can run on a persistent profile.
+        self.profile_cache = profile_cache if backend == "local" else None
+        self.prepare_context = prepare_context
+        self.warm = warm if backend == "local" and not self.profile_cache else None
+        self._browsers: Dict[str, Browser] = {}
+        self._persistent: Dict[str, BrowserContext] = {}
+        # Browsers launched or connected per browser type, to tell recycled instances apart.
+        self._generations: Dict[str, int] = {}
+        # Attached over CDP to the warm daemon's Chromium, which every worker shares.
+        self._shared: Set[str] = set()
+
+    def persistent_context(self, browser_type: str) -> BrowserContext:
+        """The worker's persistent context for a browser type (profile cache mode)."""
+        launcher = browser_launcher(self.playwright, browser_type)
+        context = self._persistent.get(launcher.name)
+        if context is None:
+            context = self.profile_cache.launch(launcher, self.headless, self.prepare_context)
+            self._persistent[launcher.name] = context
+            self._generations[launcher.name] = self._generations.get(launcher.name, 0) + 1
+        return context
+
+    def get(self, browser_type: str) -> Browser:
+        if self.profile_cache:
+            return self.persistent_context(browser_type).browser
+
+        launcher = browser_launcher(self.playwright, browser_type)
+        browser = self._browsers.get(launcher.name)
+        if browser is not None and browser.is_connected():
+            return browser
+
+        if self.warm:
+            endpoint = self.warm.browser(launcher.name)
+            logger.info("Attaching to the warm %s at %s", launcher.name, endpoint["url"])
+            with step("connect", category="connect"):
+                if endpoint["protocol"] == "cdp":
+                    browser = launcher.connect_over_cdp(endpoint["url"])
+                    self._shared.add(launcher.name)
+                else:
+                    browser = launcher.connect(endpoint["url"])
+        elif self.backend == "gateway":
+            logger.info("Connecting to %s at %s", launcher.name, self.gateway_url)
+            with step("connect", category="connect"):
+                browser = launcher.connect(self.gateway_url)
+        else:
+            logger.info("Launching local %s (headless=%s)", launcher.name, self.headless)
+            with step("launch", category="connect"):
+                browser = launcher.launch(headless=self.headless)
+        self._browsers[launcher.name] = browser
+        self._generations[launcher.name] = self._generations.get(launcher.name, 0) + 1
+        return browser
+
+    def instance(self, browser_type: str) -> str:
+        """Name of the current browser of a type, e.g. 'chromium#2' after one recycle."""
+        name = browser_launcher(self.playwright, browser_type).name
+        return f"{name}#{self._generations.get(name, 0)}"
+
+    def recyclable(self, browser_type: str) -> bool:
+        return browser_launcher(self.playwright, browser_type).name not in self._shared
+
+    def recycle(self, browser_type: str) -> None:
+        """Close the browser of a type; the next get() launches or connects a new one."""
+        name = browser_launcher(self.playwright, browser_type).name
+        if name in self._shared:
+            return
+        context = self._persistent.pop(name, None)
+        browser = self._browsers.pop(name, None)
+        try:
+            if context is not None:
+                context.close()
+                self.profile_cache.promote(name)
+            if browser is not None:
+                browser.close()
+        except Exception as e:
+            logger.warning("Failed to close recycled browser: %s", e)
+
+    def close(self) -> None:
+        for name, context in self._persistent.items():
+            try:
+                context.close()
+                self.profile_cache.promote(name)
+            except Exception as e:
+                logger.warning("Failed to close persistent context: %s", e)
+        self._persistent.clear()
+        for browser in self._browsers.values():
+            try:
+                # Only disconnects from browsers this process connected to (gateway, warm).
+                browser.close()
+            except Exception as e:
+                logger.warning("Failed to close browser: %s", e)
+        self._browsers.clear()
@@ -0,0 +1,232 @@
+"""
+Multi-Term Content Verification
+
+Checking search results with page.content() transfers the whole serialized HTML over
+the websocket just to answer a handful of "is this term present" questions.
+find_terms runs the search inside the page instead: the rendered text of the page (or
+of one element) is scanned for every term in a single page.evaluate call and only the
+matches come back, each with a short snippet of surrounding text.
+
+For saved HTML snapshots the same check runs on the client with SnapshotTermMatcher,
+which streams the file through an HTML parser in chunks, ignores script/style content
+and stops reading as soon as every term has been found.
+
+Matching is case-insensitive and runs on whitespace-collapsed text in both modes.
+
+Which text counts: page.content() matched anything in the serialized HTML, including
+text in hidden elements (collapsed menus, tab panels, off-screen carousels). find_terms
+first searches the rendered text (innerText, visible text only, snippet as the user
+sees it) and then, for the terms still missing, the element's textContent, which holds
+hidden text too. Pass visible_only=True to require that a term is actually shown.
+Unlike page.content(), tag names and attribute values (alt, title, href) never match.
+SnapshotTermMatcher has no layout to work with and matches all text outside
+script/style, like textContent.
+
+Usage:
+    find_terms(page, ["iPhone", "Apple"]).assert_all_found("search results")
+    match_snapshot("results.html", ["iPhone", "Apple"]).missing
+
+    python -m web.content_match results.html iPhone Apple
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+FIND_TERMS_SCRIPT = """
+({terms, selector, snippetChars, visibleOnly}) => {
+    const root = selector ? document.querySelector(selector) : document.body;
+    if (!root) {
+        return null;
+    }
+    // Rendered text first; textContent (hidden elements too) only for terms it misses.
+    const sources = [root.innerText || ''];
+    if (!visibleOnly) {
+        sources.push(root.textContent || '');
+    }
+    const matches = {};
+    for (const term of terms) {
+        matches[term] = null;
+    }
+    for (const source of sources) {
+        const text = source.replace(/\\s+/g, ' ');
+        const lower = text.toLowerCase();
+        for (const term of terms) {
+            if (matches[term] !== null) {
+                continue;
+            }
+            const index = lower.indexOf(term.toLowerCase());
+            if (index >= 0) {
+                matches[term] = text
+                    .slice(Math.max(0, index - snippetChars), index + term.length + snippetChars)
+                    .trim();
+            }
+        }
+    }
+    return matches;
+}
+"""
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+# Tags that start a new line in rendered text; inline tags are joined without a gap.
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "option", "p", "pre",
+    "section", "table", "td", "th", "tr", "ul",
+}
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text)
+
+
+class TermMatches:
+    """Outcome of a multi-term search: term -> matched snippet, or None if missing."""
+
+    def __init__(self, matches: Dict[str, Optional[str]], scope: Optional[str] = None):
+        self.matches = matches
+        self.scope = scope
+
+    @property
+    def found(self) -> List[str]:
+        return [term for term, snippet in self.matches.items() if snippet is not None]
+
+    @property
+    def missing(self) -> List[str]:
+        return [term for term, snippet in self.matches.items() if snippet is None]
+
+    @property
+    def all_found(self) -> bool:
+        return not self.missing
+
+    def snippet(self, term: str) -> Optional[str]:
+        return self.matches.get(term)
+
+    def assert_all_found(self, where: str = "page") -> None:
+        missing = self.missing
+        scope = f" (scope '{self.scope}')" if self.scope else ""
+        assert not missing, f"Expected term(s) {missing} not found in {where}{scope}"
+
+
+def find_terms(
+    page: Page,
+    terms: Iterable[str],
+    selector: Optional[str] = None,
+    snippet_chars: int = 40,
+    visible_only: bool = False,
+) -> TermMatches:
+    """
+    Search the text of the page (or of `selector`) for every term in one round trip:
+    rendered text first, then hidden text unless visible_only.
+    """
+    terms = [_normalize(term) for term in terms]
+    matches = page.evaluate(
+        FIND_TERMS_SCRIPT,
+        {"terms": terms, "selector": selector, "snippetChars": snippet_chars, "visibleOnly": visible_only},
+    )
+    if matches is None:
+        matches = {term: None for term in terms}
+    return TermMatches(matches, scope=selector)
+
+
+class _TextExtractor(HTMLParser):
+    """Feeds visible text runs of an HTML document to a callback."""
+
+    def __init__(self, on_text):
+        super().__init__(convert_charrefs=True)
+        self.on_text = on_text
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.on_text(" ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.on_text(" ")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.on_text(data)
+
+
+class SnapshotTermMatcher:
+    """
+    Streaming case-insensitive matcher for saved HTML snapshots.
+
+    Text is consumed incrementally; only a tail long enough to catch terms split
+    across chunk boundaries (plus snippet context) is kept in memory.
+    """
+
+    def __init__(self, terms: Iterable[str], snippet_chars: int = 40):
+        self.terms = [_normalize(term) for term in terms]
+        self.snippet_chars = snippet_chars
+        self.matches: Dict[str, Optional[str]] = {term: None for term in self.terms}
+        self._pending = {term: term.lower() for term in self.terms}
+        self._keep = max((len(term) for term in self.terms), default=1) + snippet_chars
+        self._tail = ""
+        self._parser = _TextExtractor(self._consume)
+
+    @property
+    def done(self) -> bool:
+        return not self._pending
+
+    def _consume(self, text: str) -> None:
+        if not self._pending:
+            return
+        buffer = _normalize(self._tail + text)
+        lower = buffer.lower()
+        for term, needle in list(self._pending.items()):
+            index = lower.find(needle)
+            if index >= 0:
+                start = max(0, index - self.snippet_chars)
+                end = index + len(needle) + self.snippet_chars
+                self.matches[term] = buffer[start:end].strip()
+                del self._pending[term]
+        self._tail = buffer[-self._keep:]
+
+    def feed(self, html: str) -> None:
+        self._parser.feed(html)
+
+    def close(self) -> TermMatches:
+        self._parser.close()
+        return TermMatches(self.matches)
+
+
+def match_snapshot(
+    path: str,
+    terms: Iterable[str],
+    snippet_chars: int = 40,
+    chunk_size: int = 64 * 1024,
+) -> TermMatches:
+    """Stream a saved HTML file and report which terms appear in its text."""
+    matcher = SnapshotTermMatcher(terms, snippet_chars)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while not matcher.done:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            matcher.feed(chunk)
+    return matcher.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m web.content_match SNAPSHOT.html TERM [TERM ...]")
+        sys.exit(2)
+    result = match_snapshot(sys.argv[1], sys.argv[2:])
+    for term, snippet in result.matches.items():
+        print(f"{'FOUND' if snippet is not None else 'MISSING'}  {term}  {snippet or ''}")
+    sys.exit(0 if result.all_found else 1)
@@ -0,0 +1,46 @@
+"""
+Emulated Mobile Device for Playwright Pages
+
+The mobile-emulation test applies a device profile (name, viewport, user agent) to its
+page and then needs the device's orientation and whether the site should show its
+mobile layout. WebDeviceSession applies the profile and answers both from the profile
+itself, typed, instead of the test re-deriving them from the raw dict.
+
+Usage:
+    session = WebDeviceSession(page, {"name": "Pixel 5", "viewport": {"width": 393, "height": 851}}).apply()
+    if session.is_mobile_layout:
+        ...
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+MOBILE_BREAKPOINT = 768  # px
+
+
+class WebDeviceSession:
+    """Typed view of an emulated mobile device for a Playwright page."""
+
+    def __init__(self, page: Page, profile: Dict[str, Any]):
+        self.page = page
+        self.name: str = profile["name"]
+        self.viewport: Dict[str, int] = dict(profile["viewport"])
+        self.user_agent: Optional[str] = profile.get("user_agent")
+
+    def apply(self) -> "WebDeviceSession":
+        self.page.set_viewport_size(self.viewport)
+        if self.user_agent:
+            self.page.set_extra_http_headers({"user-agent": self.user_agent})
+        return self
+
+    @property
+    def orientation(self) -> str:
+        return "PORTRAIT" if self.viewport["height"] >= self.viewport["width"] else "LANDSCAPE"
+
+    @property
+    def is_mobile_layout(self) -> bool:
+        return self.viewport["width"] < MOBILE_BREAKPOINT
@@ -17,25 +17,19 @@ Execution:
 import pytest
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
 # Refactor to use lt_browser fixture
 @pytest.mark.parametrize("lt_browser", [{"browser_type": "chrome", "browser_name": "Chrome", "browser_version": "latest", "platform": "Windows 10", "build": "Docker-Build", "name": "Docker Integration Test"}], indirect=True)
-def test_docker_integration(lt_browser):
+def test_docker_integration(lt_page):
     """
     Run Playwright tests inside a Docker container on LambdaTest.
     """
-    page = lt_browser.new_page()
+    page = lt_page
     page.goto("https://www.lambdatest.com/selenium-playground/")
     assert "Selenium" in page.title()
-    logging.info(f"[Docker Integration] Test completed. Title: {page.title()}")
-    page.close()
+    logger.info("[Docker Integration] Test completed. Title: %s", page.title())
 
 if __name__ == "__main__":
     pytest.main([__file__])
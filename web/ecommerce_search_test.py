@@ -6,85 +6,78 @@ This test demonstrates product search functionality on an e-commerce site using
 and LambdaTest. It performs the following actions:
 - Connects to LambdaTest using the configured browser
 - Navigates to the e-commerce playground
-- Accepts cookies if present
+- Starts from a context primed with accepted cookies (storage state cache)
 - Performs a product search
 - Verifies search results
 - Takes a screenshot of the results
 
 Code Walkthrough:
-    - Uses the lt_browser fixture from conftest.py for browser management
-    - Locates the search box and enters a search query
+    - Uses the lt_page fixture from web/plugin.py, whose context is primed from the storage state cache
+    - Locates the search box and enters a search query; role queries are answered from one
+      accessibility snapshot per page state (role_snapshot fixture, web/role_snapshot.py)
     - Verifies search results and takes a screenshot
 
 Execution:
     Run with: pytest web/ecommerce_search_test.py -v
     Verify test execution via console output and the LambdaTest Dashboard.
+    To verify a whole file of search terms, use: python -m web.search_runner terms.txt
 """
 
 import pytest
 from playwright.sync_api import expect
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from web.content_match import find_terms
+from web.storage_state import ECOMMERCE_ORIGIN
+
 logger = logging.getLogger(__name__)
 
 # Test data
 SEARCH_TERM = "iPhone"
 EXPECTED_RESULTS = ["iPhone", "Apple"]
 
-# Using the lt_browser fixture from conftest.py which is configured
-# with appropriate capabilities for this test
+# Using the lt_page fixture from web/plugin.py; the lt_browser parameters
+# configure the capabilities for this test
 @pytest.mark.parametrize("lt_browser", [{"browser_type": "chrome", "browser_name": "Chrome", "browser_version": "latest", "platform": "Windows 10", "build": "E-commerce-Build", "name": "E-commerce Search Test"}], indirect=True)
-def test_ecommerce_search(lt_browser):
+@pytest.mark.storage_state(ECOMMERCE_ORIGIN)
+@pytest.mark.perf_budget("LCP < 2.5s", "transfer < 1.5MB", url="ecommerce-playground")
+@pytest.mark.result_cache(url="https://ecommerce-playground.lambdatest.io/")
+def test_ecommerce_search(lt_page, role_snapshot):
     """
     Test product search functionality on the e-commerce playground.
     
     Args:
-        lt_browser: Playwright Page instance provided by the lt_browser fixture
+        lt_page: Playwright Page instance provided by the lt_page fixture
+        role_snapshot: role queries of lt_page resolved from an accessibility snapshot
     """
-    # Create a new page in the browser context
-    page = lt_browser.new_page()
+    page = lt_page
     
-    # Navigate to the e-commerce site
+    # Navigate to the e-commerce site (cookies were accepted when the storage state was primed;
+    # with --no-storage-state lt_page dismisses the banner when it shows up)
     page.goto("https://ecommerce-playground.lambdatest.io/")
     
-    # Accept cookies if the banner is present
-    try:
-        accept_button = page.get_by_role("button", name="Accept")
-        if accept_button.is_visible():
-            accept_button.click()
-    except Exception as e:
-        logging.error(f"Cookie banner not found or could not be accepted: {e}")
-    
     # Find the search box and enter the search term
-    search_box = page.get_by_role("textbox", name="Search For Products")
+    search_box = role_snapshot.get_by_role("textbox", name="Search For Products")
     expect(search_box).to_be_visible()
     search_box.fill(SEARCH_TERM)
     
     # Click the search button
-    search_button = page.get_by_role("button", name="Search")
+    search_button = role_snapshot.get_by_role("button", name="Search")
     search_button.click()
     
     # Wait for search results to load and verify content
-    results_header = page.get_by_role("heading", name=f"Search - {SEARCH_TERM}")
+    results_header = role_snapshot.get_by_role("heading", name=f"Search - {SEARCH_TERM}")
     expect(results_header).to_be_visible()
     
     # Verify search results contain expected content
-    page_content = page.content().lower()
-    for term in EXPECTED_RESULTS:
-        assert term.lower() in page_content, f"Expected term '{term}' not found in search results"
+    find_terms(page, EXPECTED_RESULTS).assert_all_found("search results")
     
     # Take a screenshot of the results
     screenshot = page.screenshot()
     with open("ecommerce_search_results.png", "wb") as f:
         f.write(screenshot)
     
-    logging.info(f"[E-Commerce] Search for '{SEARCH_TERM}' completed successfully")
-    page.close()
+    logger.info("[E-Commerce] Search for '%s' completed successfully", SEARCH_TERM)
 
 # The test is integrated with pytest and uses the lt_browser fixture
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Browser Memory Watchdog
+
+Pooled browsers (--backend=local or gateway) serve every test of a worker, so memory
+left behind by one test is paid for by all later ones. After every web test the
+watchdog records:
+    - the JS heap and DOM counters of the test's page, taken just before lt_page closes
+      it (CDP Runtime.getHeapUsage / Memory.getDOMCounters on Chromium, otherwise
+      performance.memory where available and a count of the document's elements)
+    - contexts and pages the test opened and left open; lt_browser closes them and they
+      are reported as leaks
+    - the resident memory (RSS) of a local browser's processes, read from /proc: Chromium
+      lists its processes over CDP, Firefox and WebKit are found among this worker's
+      child processes by their executable
+
+A pooled browser is recycled (closed, and launched or connected again on next use) once
+its RSS, or the JS heap of a test page, crosses the limits, or when leaked contexts
+could not be closed. Browsers behind a Playwright server are recycled by reconnecting,
+since the server starts one browser per connection. The warm daemon's Chromium is
+shared over CDP by every worker and is only reported, never recycled.
+
+The watchdog is on by default for those pooled backends only; a LambdaTest browser is
+fresh per test, so there it runs only with --memory-watchdog.
+
+Every record is appended to perf_metrics/memory-<run id>.jsonl (shared by xdist
+workers); the terminal summary shows memory over time per browser instance, and the
+same report is available from the command line:
+
+    pytest web/ --backend=local --memory-rss-mb=1024 --memory-heap-mb=128
+    python -m web.memory_watchdog summary perf_metrics/memory-<run id>.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from support.jsonl import append_jsonl, read_jsonl
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RSS_MB = 1536.0
+DEFAULT_HEAP_MB = 256.0
+MB = 1024 * 1024
+
+# Browsers other than Chromium: performance.memory only exists in Chromium-based ones.
+PAGE_MEMORY_SCRIPT = """
+() => ({
+    heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+    nodes: document.getElementsByTagName('*').length,
+})
+"""
+
+
+def page_memory(page: Page) -> Dict[str, Optional[float]]:
+    """JS heap (bytes) and DOM counters of a page; empty if the page is gone."""
+    try:
+        cdp = page.context.new_cdp_session(page)
+    except Exception:
+        cdp = None  # Not Chromium
+    try:
+        if cdp is None:
+            return page.evaluate(PAGE_MEMORY_SCRIPT)
+        heap = cdp.send("Runtime.getHeapUsage")
+        counters = cdp.send("Memory.getDOMCounters")
+        cdp.detach()
+        return {
+            "heap_bytes": heap["usedSize"],
+            "nodes": counters["nodes"],
+            "documents": counters["documents"],
+            "listeners": counters["jsEventListeners"],
+        }
+    except Exception as e:
+        logger.debug("Could not sample page memory: %s", e)
+        return {}
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _descendants(root: int) -> Set[int]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as f:
+                # The process name may contain spaces; the parent pid follows its closing ")".
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found: Set[int] = set()
+    pending = [root]
+    while pending:
+        for pid in children.get(pending.pop(), []):
+            if pid not in found:
+                found.add(pid)
+                pending.append(pid)
+    return found
+
+
+def _executable(pid: int) -> str:
+    try:
+        return os.readlink(f"/proc/{pid}/exe")
+    except OSError:
+        return ""
+
+
+def browser_pids(browser: Browser) -> Set[int]:
+    """Local processes of a browser (Linux only); empty when they cannot be told apart."""
+    if not os.path.isdir("/proc"):
+        return set()
+    if browser.browser_type.name == "chromium":
+        try:
+            cdp = browser.new_browser_cdp_session()
+            info = cdp.send("SystemInfo.getProcessInfo")["processInfo"]
+            cdp.detach()
+            return {process["id"] for process in info}
+        except Exception as e:
+            logger.debug("CDP SystemInfo.getProcessInfo failed: %s", e)
+            return set()
+    browser_dir = os.path.dirname(os.path.realpath(browser.browser_type.executable_path))
+    return {pid for pid in _descendants(os.getpid()) if _executable(pid).startswith(browser_dir)}
+
+
+def browser_rss_mb(browser: Browser) -> Optional[float]:
+    pids = browser_pids(browser)
+    return round(sum(_rss_kb(pid) for pid in pids) / 1024, 1) if pids else None
+
+
+class ContextSnapshot:
+    """Contexts and page counts of a browser when a test starts, to find what it leaves open."""
+
+    def __init__(self, contexts: Iterable[BrowserContext]):
+        self.pages = {context: len(context.pages) for context in contexts}
+
+    def close_leaks(self, contexts: Iterable[BrowserContext]) -> Tuple[int, int, int]:
+        """Close contexts and pages opened since the snapshot: (contexts, pages, not closed)."""
+        leaked_contexts = leaked_pages = failed = 0
+        for context in list(contexts):
+            opened = context.pages if context not in self.pages else context.pages[self.pages[context]:]
+            leaked_pages += len(opened)
+            try:
+                if context not in self.pages:
+                    leaked_contexts += 1
+                    context.close()
+                else:
+                    for page in opened:
+                        page.close()
+            except Exception as e:
+                logger.warning("Failed to close a leaked context: %s", e)
+                failed += 1
+        return leaked_contexts, leaked_pages, failed
+
+
+class MemoryWatchdog:
+    """Per-test memory records of one worker, and the decision to recycle a pooled browser."""
+
+    def __init__(
+        self,
+        directory: str,
+        run_id: str,
+        rss_limit_mb: float = DEFAULT_RSS_MB,
+        heap_limit_mb: float = DEFAULT_HEAP_MB,
+    ):
+        self.path = os.path.join(directory, f"memory-{run_id}.jsonl")
+        self.rss_limit_mb = rss_limit_mb
+        self.heap_limit_mb = heap_limit_mb
+        self.worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+        self._pages: Dict[str, Dict[str, Optional[float]]] = {}
+        self._tests: Dict[str, int] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def sample_page(self, nodeid: str, page: Page) -> None:
+        """Called by lt_page before it closes the page."""
+        self._pages[nodeid] = page_memory(page)
+
+    def after_test(
+        self,
+        nodeid: str,
+        browser: Optional[Browser],
+        instance: str,
+        backend: str,
+        leaks: Tuple[int, int, int],
+        recyclable: bool = False,
+    ) -> Optional[str]:
+        """Record the test's memory; the reason to recycle the browser, if it should be."""
+        memory = self._pages.pop(nodeid, {})
+        heap_bytes = memory.get("heap_bytes")
+        heap_mb = round(heap_bytes / MB, 1) if heap_bytes is not None else None
+        rss_mb = None
+        if browser is not None and backend == "local" and browser.is_connected():
+            rss_mb = browser_rss_mb(browser)
+        self._tests[instance] = self._tests.get(instance, 0) + 1
+        leaked_contexts, leaked_pages, unclosed = leaks
+
+        reason = None
+        if rss_mb is not None and rss_mb > self.rss_limit_mb:
+            reason = f"RSS {rss_mb:.0f} MB > {self.rss_limit_mb:.0f} MB"
+        elif heap_mb is not None and heap_mb > self.heap_limit_mb:
+            reason = f"JS heap {heap_mb:.0f} MB > {self.heap_limit_mb:.0f} MB"
+        elif unclosed:
+            reason = f"{unclosed} leaked contexts could not be closed"
+        if leaked_contexts or leaked_pages:
+            logger.warning("%s left %d contexts and %d pages open", nodeid, leaked_contexts, leaked_pages)
+
+        self.write(
+            {
+                "test": nodeid,
+                "worker": self.worker,
+                "instance": instance,
+                "backend": backend,
+                "time": time.time(),
+                "test_number": self._tests[instance],
+                "rss_mb": rss_mb,
+                "heap_mb": heap_mb,
+                "nodes": memory.get("nodes"),
+                "documents": memory.get("documents"),
+                "listeners": memory.get("listeners"),
+                "leaked_contexts": leaked_contexts,
+                "leaked_pages": leaked_pages,
+                "recycled": reason if recyclable else None,
+            }
+        )
+        if reason and recyclable:
+            logger.info("Recycling %s after %s: %s", instance, nodeid, reason)
+            self._tests.pop(instance)
+            return reason
+        if reason:
+            logger.warning("%s is over its memory limits (%s) and cannot be recycled", instance, reason)
+        return None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        append_jsonl(self.path, [record])
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    return read_jsonl(path)
+
+
+def _peak(records: List[Dict[str, Any]], field: str) -> Optional[float]:
+    values = [r[field] for r in records if r.get(field) is not None]
+    return max(values) if values else None
+
+
+def _fmt(value: Optional[float], unit: str = "") -> str:
+    return "-" if value is None else f"{value:.0f}{unit}"
+
+
+def summarize_memory(path: str) -> List[str]:
+    """One line per browser instance with memory over its tests, then the leaking tests."""
+    records = load_records(path)
+    instances: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for record in records:
+        instances.setdefault((record["worker"], record["instance"]), []).append(record)
+
+    lines = []
+    for (worker, instance), series in sorted(instances.items()):
+        rss = [r["rss_mb"] for r in series if r.get("rss_mb") is not None]
+        trend = ""
+        if len(rss) > 1:
+            growth = (rss[-1] - rss[0]) / (len(rss) - 1)
+            trend = f" RSS {rss[0]:.0f} -> {rss[-1]:.0f} MB ({growth:+.1f} MB/test)"
+        leaks = sum(r["leaked_contexts"] + r["leaked_pages"] for r in series)
+        line = (
+            f"{worker} {instance}: {len(series)} tests{trend} "
+            f"peak RSS={_fmt(_peak(series, 'rss_mb'), ' MB')} "
+            f"heap={_fmt(_peak(series, 'heap_mb'), ' MB')} "
+            f"nodes={_fmt(_peak(series, 'nodes'))} leaks={leaks}"
+        )
+        recycled = series[-1].get("recycled")
+        if recycled:
+            line += f", recycled ({recycled})"
+        lines.append(line)
+
+    for record in records:
+        if record["leaked_contexts"] or record["leaked_pages"]:
+            lines.append(
+                f"LEAK {record['test']}: {record['leaked_contexts']} contexts, "
+                f"{record['leaked_pages']} pages left open"
+            )
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report browser memory over a test run")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_cmd = sub.add_parser("summary", help="Memory over time per browser instance")
+    summary_cmd.add_argument("run")
+    args = parser.parse_args()
+
+    for line in summarize_memory(args.run):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -24,11 +24,9 @@ import pytest
 from playwright.sync_api import expect
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from web.device_session import WebDeviceSession
+from web.page_queries import BatchQuery
+
 logger = logging.getLogger(__name__)
 
 # Note: Playwright does not support real device automation directly.
@@ -54,9 +52,14 @@ MOBILE_DEVICES = [
     }
 ]
 
+# Selectors used by the batched page checks (plain CSS, resolved inside the page)
+BUTTON_SELECTOR = "button, [role='button']"
+DRAWER_SELECTOR = "div.mz-pure-drawer"
+
 @pytest.mark.parametrize("lt_browser", [{"browser_type": "chrome", "browser_name": "Chrome", "browser_version": "latest", "platform": "Windows 10", "build": "Mobile Automation Build", "name": "E-commerce Search Test"}], indirect=True)
+@pytest.mark.perf_budget("LCP < 2.5s", "CLS < 0.1")
 @pytest.mark.parametrize('device', MOBILE_DEVICES, ids=[d["name"] for d in MOBILE_DEVICES])
-def test_mobile_emulation(lt_page, device):
+def test_mobile_emulation(lt_page, role_snapshot, device):
     """
     Test mobile emulation using Playwright on LambdaTest.
     Tests multiple mobile device profiles with different viewports and user agents.
@@ -64,8 +67,7 @@ def test_mobile_emulation(lt_page, device):
     page = lt_page
     
     # Set the viewport and user agent for the device
-    page.set_viewport_size(device["viewport"])
-    page.set_extra_http_headers({"user-agent": device["user_agent"]})
+    session = WebDeviceSession(page, device).apply()
     
     # Navigate to a mobile-friendly website
     page.goto("https://ecommerce-playground.lambdatest.io/")
@@ -73,44 +75,47 @@ def test_mobile_emulation(lt_page, device):
     # Wait for the page to load
     page.wait_for_load_state("networkidle")
     
-    # Verify the page loaded correctly
+    # Verify the page loaded correctly and capture the responsive state in one round trip
     # header = page.get_by_role("heading", name="Shop by Category") # the "Shop by Category header is showing on desktop mode, not mobile"
-    header = page.get_by_role("button", name="All Categories")
-    assert header.is_visible(), f"Page header not found on {device['name']}"
-    
+    checks = (
+        BatchQuery(page)
+        .visible(BUTTON_SELECTOR, has_name="All Categories", key="header")
+        .visible(BUTTON_SELECTOR, has_name="Shop by Category", key="menu_button")
+        .has_class(DRAWER_SELECTOR, "active", has_text="Top categories", key="drawer_active")
+        .run()
+    )
+    checks.assert_visible("header", f"Page header not found on {device['name']}")
+
     # Check for mobile-specific elements
-    menu_button = page.get_by_role("button", name="Shop by Category")
-    assert menu_button.is_visible(), "Mobile menu button not visible"
+    checks.assert_visible("menu_button", "Mobile menu button not visible")
+    menu_button = role_snapshot.get_by_role("button", name="Shop by Category")
     
     # Take a screenshot for verification
     screenshot_path = f"mobile_test_{device['name'].lower().replace(' ', '_')}.png"
     page.screenshot(path=screenshot_path)
-    logging.info(f"Screenshot saved: {screenshot_path}")
+    logger.info("Screenshot saved: %s", screenshot_path)
     
     # Verify responsive behavior
-    viewport_size = page.viewport_size
-    if viewport_size and viewport_size["width"] < 768:  # Mobile breakpoint
+    if session.is_mobile_layout:  # Mobile breakpoint
         # Check if mobile menu is collapsed by default
-        # Locate drawer by its heading
-        drawer = page.locator("div.mz-pure-drawer:has(h5:has-text('Top categories'))")
+        checks.assert_false("drawer_active", "Drawer is active before clicking menu")
 
-        # Validate that it's now active (has 'active' in class)
-        assert not drawer.evaluate("el => el.classList.contains('active')"), "Drawer is active before clicking menu"
-
-        # Click the hamburger menu button
-        menu_button.click()
+        # Click the hamburger menu button (re-resolved if the page changed since the query)
+        role_snapshot.refresh(menu_button).click()
 
         # Wait until the menu becomes visible (class 'show' is added)
         page.wait_for_timeout(1000)  # Small wait for animation
 
-        # Locate drawer by its heading
-        drawer = page.locator("div.mz-pure-drawer:has(h5:has-text('Top categories'))")
-
         # Validate that it's now active (has 'active' in class)
-        assert drawer.evaluate("el => el.classList.contains('active')"), "Drawer is not active after clicking menu"
+        (
+            BatchQuery(page)
+            .has_class(DRAWER_SELECTOR, "active", has_text="Top categories", key="drawer_active")
+            .run()
+            .assert_has_class("drawer_active", "Drawer is not active after clicking menu")
+        )
 
         # click the menu button again to close the nav bar
-        close_button = page.get_by_role("heading", name="Top categories close").get_by_label("close")
+        close_button = role_snapshot.get_by_role("heading", name="Top categories close").get_by_label("close")
         close_button.click()
 
         # Wait until the menu becomes hidden (class 'show' is removed)
@@ -142,7 +147,12 @@ def test_mobile_emulation(lt_page, device):
     assert product_count > 0, "No products found in search results"
     
     # Log test completion
-    logging.info(f"Successfully completed mobile test on {device['name']} with viewport {device['viewport']}")
+    logger.info(
+        "Successfully completed mobile test on %s (%s) with viewport %s",
+        session.name,
+        session.orientation,
+        session.viewport,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,329 @@
+"""
+Batched Page Queries for Playwright
+
+Each call like locator.is_visible(), locator.count() or locator.evaluate(...) is a
+separate round trip to the browser, which costs tens of milliseconds over the
+LambdaTest websocket. BatchQuery collects a set of checks against CSS selectors and
+resolves all of them inside the page with a single page.evaluate call.
+
+Supported checks:
+    - visible:   any matching element is rendered with a non-empty box
+    - text:      innerText of the first match
+    - attribute: attribute value of the first match
+    - has_class: whether the first match has a class; None when nothing matches, so
+                 assert_false and assert_has_class fail on a missing element
+    - count:     number of matches
+    - bbox:      bounding box of the first match (same shape as Locator.bounding_box)
+    - viewport:  window.innerWidth / innerHeight
+
+Selectors are plain CSS (evaluated with document.querySelectorAll). Playwright-only
+engines such as text= or :has-text() are not available inside the page; instead every
+check can narrow its matches (case-insensitive substring):
+    - has_text: the element's textContent, like Locator(has_text=...)
+    - has_name: the element's accessible name, like get_by_role(name=...): aria-labelledby,
+                aria-label, the labels, value or placeholder of form fields, alt of images,
+                then the visible text content, then title. Use it where a role query was
+                used before, so icon buttons named by aria-label or title still match.
+
+Usage:
+    result = (
+        BatchQuery(page)
+        .visible("button, [role='button']", has_name="All Categories", key="categories")
+        .count(".product-layout", key="products")
+        .run()
+    )
+    result.assert_visible("categories")
+    result.assert_count_at_least("products", 1)
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from playwright.sync_api import Page
+
+BATCH_QUERY_SCRIPT = """
+(checks) => {
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden';
+    };
+    const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    const contentText = (node) => {
+        let text = '';
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                text += child.textContent;
+            } else if (child.nodeType === Node.ELEMENT_NODE && child.getAttribute('aria-hidden') !== 'true'
+                       && window.getComputedStyle(child).display !== 'none') {
+                const label = child.getAttribute('aria-label');
+                if (label && label.trim()) text += ' ' + label + ' ';
+                else if (child.localName === 'img') text += ' ' + (child.getAttribute('alt') || '') + ' ';
+                else text += ' ' + contentText(child) + ' ';
+            }
+        }
+        return text;
+    };
+    // The common accessible name rules, in the order get_by_role applies them.
+    const accessibleName = (el) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = clean(labelledBy.split(/\\s+/)
+                .map((id) => document.getElementById(id))
+                .filter(Boolean)
+                .map((ref) => ref.getAttribute('aria-label') || contentText(ref))
+                .join(' '));
+            if (text) return text;
+        }
+        const label = clean(el.getAttribute('aria-label'));
+        if (label) return label;
+        if (['input', 'select', 'textarea'].includes(el.localName)) {
+            const type = (el.getAttribute('type') || '').toLowerCase();
+            if (['button', 'submit', 'reset'].includes(type)) return clean(el.value);
+            const labels = clean(Array.from(el.labels || []).map(contentText).join(' '));
+            return labels || clean(el.title) || clean(el.getAttribute('placeholder'));
+        }
+        if (el.localName === 'img') return clean(el.getAttribute('alt')) || clean(el.title);
+        return clean(contentText(el)) || clean(el.title);
+    };
+    const resolve = (check) => {
+        let elements = Array.from(document.querySelectorAll(check.selector));
+        if (check.hasText) {
+            const needle = check.hasText.toLowerCase();
+            elements = elements.filter(
+                (el) => (el.textContent || '').toLowerCase().includes(needle)
+            );
+        }
+        if (check.hasName) {
+            const needle = clean(check.hasName).toLowerCase();
+            elements = elements.filter((el) => accessibleName(el).toLowerCase().includes(needle));
+        }
+        return elements;
+    };
+    return checks.map((check) => {
+        if (check.kind === 'viewport') {
+            return {found: 1, value: {width: window.innerWidth, height: window.innerHeight}, error: null};
+        }
+        let elements;
+        try {
+            elements = resolve(check);
+        } catch (e) {
+            return {found: 0, value: null, error: String(e)};
+        }
+        const first = elements[0];
+        let value = null;
+        switch (check.kind) {
+            case 'visible':
+                value = elements.some(isVisible);
+                break;
+            case 'text':
+                value = first ? first.innerText : null;
+                break;
+            case 'attribute':
+                value = first ? first.getAttribute(check.arg) : null;
+                break;
+            case 'class':
+                value = first ? first.classList.contains(check.arg) : null;
+                break;
+            case 'count':
+                value = elements.length;
+                break;
+            case 'bbox':
+                if (first) {
+                    const rect = first.getBoundingClientRect();
+                    if (rect.width > 0 || rect.height > 0) {
+                        value = {x: rect.x, y: rect.y, width: rect.width, height: rect.height};
+                    }
+                }
+                break;
+        }
+        return {found: elements.length, value: value, error: null};
+    });
+}
+"""
+
+
+class CheckResult(NamedTuple):
+    key: str
+    kind: str
+    selector: Optional[str]
+    value: Any
+    found: int
+    error: Optional[str]
+
+
+class BatchResult:
+    """Results of one BatchQuery run, addressable by check key."""
+
+    def __init__(self, results: List[CheckResult]):
+        self._results: Dict[str, CheckResult] = {r.key: r for r in results}
+
+    def __getitem__(self, key: str) -> CheckResult:
+        return self._results[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._results
+
+    def __iter__(self):
+        return iter(self._results.values())
+
+    def value(self, key: str) -> Any:
+        return self._results[key].value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: result.value for key, result in self._results.items()}
+
+    def _describe(self, result: CheckResult) -> str:
+        detail = f"{result.kind} check '{result.key}' on '{result.selector}'"
+        if result.error:
+            return f"{detail} failed: {result.error}"
+        return f"{detail} matched {result.found} element(s), value={result.value!r}"
+
+    def assert_true(self, key: str, message: Optional[str] = None) -> None:
+        result = self._results[key]
+        assert result.value, message or self._describe(result)
+
+    def assert_false(self, key: str, message: Optional[str] = None) -> None:
+        """Fails on errors and on class checks that matched nothing, not only on a true value."""
+        result = self._results[key]
+        no_match = result.kind == "class" and not result.found
+        assert result.error is None and not no_match and not result.value, message or self._describe(result)
+
+    def assert_visible(self, key: str, message: Optional[str] = None) -> None:
+        self.assert_true(key, message)
+
+    def assert_has_class(self, key: str, message: Optional[str] = None) -> None:
+        self.assert_true(key, message)
+
+    def assert_text_contains(
+        self, key: str, expected: str, message: Optional[str] = None
+    ) -> None:
+        result = self._results[key]
+        assert result.value is not None and expected in result.value, (
+            message or f"Expected '{expected}' in {self._describe(result)}"
+        )
+
+    def assert_count_at_least(
+        self, key: str, minimum: int, message: Optional[str] = None
+    ) -> None:
+        result = self._results[key]
+        assert (result.value or 0) >= minimum, (
+            message or f"Expected at least {minimum}: {self._describe(result)}"
+        )
+
+
+class BatchQuery:
+    """Declarative set of page checks resolved in one page.evaluate round trip."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._checks: List[Dict[str, Any]] = []
+
+    def _add(
+        self,
+        kind: str,
+        selector: Optional[str],
+        key: Optional[str],
+        arg: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ) -> "BatchQuery":
+        key = key or f"{kind}:{selector}" + (f":{arg}" if arg else "")
+        if any(check["key"] == key for check in self._checks):
+            raise ValueError(f"Duplicate batch query key: {key}")
+        self._checks.append(
+            {
+                "key": key,
+                "kind": kind,
+                "selector": selector,
+                "arg": arg,
+                "hasText": has_text,
+                "hasName": has_name,
+            }
+        )
+        return self
+
+    def visible(
+        self,
+        selector: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("visible", selector, key, has_text=has_text, has_name=has_name)
+
+    def text(
+        self,
+        selector: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("text", selector, key, has_text=has_text, has_name=has_name)
+
+    def attribute(
+        self,
+        selector: str,
+        name: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("attribute", selector, key, arg=name, has_text=has_text, has_name=has_name)
+
+    def has_class(
+        self,
+        selector: str,
+        class_name: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("class", selector, key, arg=class_name, has_text=has_text, has_name=has_name)
+
+    def count(
+        self,
+        selector: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("count", selector, key, has_text=has_text, has_name=has_name)
+
+    def bbox(
+        self,
+        selector: str,
+        key: Optional[str] = None,
+        has_text: Optional[str] = None,
+        has_name: Optional[str] = None,
+    ):
+        return self._add("bbox", selector, key, has_text=has_text, has_name=has_name)
+
+    def viewport(self, key: str = "viewport"):
+        return self._add("viewport", None, key)
+
+    def run(self) -> BatchResult:
+        """Resolve every declared check in a single round trip."""
+        if not self._checks:
+            return BatchResult([])
+        return self._build(self.page.evaluate(BATCH_QUERY_SCRIPT, self._checks))
+
+    async def run_async(self) -> BatchResult:
+        """Same as run, for a playwright.async_api Page."""
+        if not self._checks:
+            return BatchResult([])
+        return self._build(await self.page.evaluate(BATCH_QUERY_SCRIPT, self._checks))
+
+    def _build(self, raw: List[Dict[str, Any]]) -> BatchResult:
+        return BatchResult(
+            [
+                CheckResult(
+                    key=check["key"],
+                    kind=check["kind"],
+                    selector=check["selector"],
+                    value=item["value"],
+                    found=item["found"],
+                    error=item["error"],
+                )
+                for check, item in zip(self._checks, raw)
+            ]
+        )
@@ -19,11 +19,6 @@ import logging
 import sys
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -44,11 +39,10 @@ if sys.platform != "win32":
 
 
 @pytest.mark.parametrize("lt_browser", browsers, indirect=True)
-def test_parallel_execution(lt_browser):
-    page = lt_browser.new_page()
+def test_parallel_execution(lt_page):
+    page = lt_page
     page.goto("https://www.lambdatest.com/selenium-playground/")
-    logger.info(f"Page title: {page.title()}")
-    page.close()
+    logger.info("Page title: %s", page.title())
 
 
 if __name__ == "__main__":
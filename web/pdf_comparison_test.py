@@ -22,11 +22,6 @@ import logging
 import pytest
 from playwright.sync_api import sync_playwright
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 def get_ws_endpoint(caps: dict) -> str:
@@ -40,16 +35,15 @@ def get_ws_endpoint(caps: dict) -> str:
     return f"wss://cdp.lambdatest.com/playwright?capabilities={caps_json}&user={username}&key={access_key}"
 
 @pytest.mark.parametrize("lt_browser", [{"browser_type": "chromium", "capabilities": {"browserName": "Chrome", "browserVersion": "latest", "LT:Options": {"platform": "Windows 10", "build": "PDF-Build", "name": "PDF Comparison Test"}}}], indirect=True)
-def test_pdf_comparison(lt_browser):
+def test_pdf_comparison(lt_page):
     """
     Simulates PDF comparison by navigating to a sample PDF URL and capturing its screenshot on LambdaTest.
     """
-    page = lt_browser.new_page()
+    page = lt_page
     pdf_url = "https://www.w3.org/WAI/ER/tests/xhtml/testfiles/resources/pdf/dummy.pdf"
     page.goto(pdf_url)
     page.screenshot(path="screenshots/pdf_screenshot.png")
-    logger.info(f"[PDF Comparison] Screenshot saved for PDF at {pdf_url}")
-    page.close()
+    logger.info("[PDF Comparison] Screenshot saved for PDF at %s", pdf_url)
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--disable-pytest-warnings"])
\ No newline at end of file
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Page Performance Metrics and Budgets
+
+The lt_page fixture attaches a PageMetricsCollector to the page of every test with
+--perf-metrics, and otherwise only to tests with a perf_budget marker or the
+page_metrics fixture. After each page.goto() the collector records, for the document
+that was loaded:
+    - Navigation Timing:  TTFB, DOMContentLoaded, load
+    - Paint:              first paint, first contentful paint
+    - PerformanceObserver: largest contentful paint (LCP) and cumulative layout shift (CLS)
+    - Resources:          request count, transferred and decoded bytes
+    - Chromium only:      CDP Performance.getMetrics (JS heap, DOM nodes, layout and script time)
+
+A document is sampled as soon as goto() returns (the load event has fired). LCP and CLS
+keep changing while the page is open, so the sample is refreshed from the same document
+(same performance.timeOrigin) when the test calls goto() again, checks a budget, or the
+page fixture is torn down. When the test leaves the document any other way (clicking a
+link, submitting a form) the main frame's framenavigated event records the last sample
+taken of it; documents reached without goto() are never measured, so budgets only ever
+apply to pages the test loaded itself.
+
+Every sample is appended to a per-run JSON lines file (perf_metrics/run-<id>.jsonl),
+labelled with the test, browser and emulated device, so runs can be compared.
+
+Budgets are plain expressions such as "LCP < 2.5s" or "transfer < 1.5MB"; a marker's
+budgets are checked when the test's call phase is reported, so a breach fails the test
+itself rather than its teardown:
+    @pytest.mark.perf_budget("LCP < 2.5s", "transfer < 1.5MB", url="ecommerce-playground")
+    def test_x(lt_page): ...
+
+    def test_y(lt_page, page_metrics):
+        page.goto(...)
+        page_metrics.assert_budget("FCP < 1800ms")
+
+Comparing two runs (exit code 1 on regressions):
+    python -m web.perf_metrics compare perf_metrics/run-A.jsonl perf_metrics/run-B.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import statistics
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from support.jsonl import append_jsonl, read_jsonl
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_DIR = os.getenv("PERF_METRICS_DIR", "perf_metrics")
+
+# Installed before any page script runs, so buffered LCP and layout-shift entries are seen.
+OBSERVER_INIT_SCRIPT = """
+(() => {
+    const metrics = window.__perfMetrics = { lcp: null, cls: 0 };
+    try {
+        new PerformanceObserver((list) => {
+            const entries = list.getEntries();
+            if (entries.length) metrics.lcp = entries[entries.length - 1].startTime;
+        }).observe({ type: 'largest-contentful-paint', buffered: true });
+    } catch (e) {}
+    try {
+        new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) {
+                if (!entry.hadRecentInput) metrics.cls += entry.value;
+            }
+        }).observe({ type: 'layout-shift', buffered: true });
+    } catch (e) {}
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paints = {};
+    for (const entry of performance.getEntriesByType('paint')) paints[entry.name] = entry.startTime;
+    const resources = performance.getEntriesByType('resource');
+    const sum = (key) => resources.reduce((total, r) => total + (r[key] || 0), 0);
+    const observed = window.__perfMetrics || {};
+    return {
+        url: location.href,
+        time_origin: performance.timeOrigin,
+        ttfb_ms: nav ? nav.responseStart - nav.startTime : null,
+        dcl_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+        load_ms: nav && nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+        fp_ms: paints['first-paint'] ?? null,
+        fcp_ms: paints['first-contentful-paint'] ?? null,
+        lcp_ms: observed.lcp ?? null,
+        cls: observed.cls ?? null,
+        resources: resources.length,
+        transfer_bytes: sum('transferSize') + (nav ? nav.transferSize : 0),
+        decoded_bytes: sum('decodedBodySize') + (nav ? nav.decodedBodySize : 0),
+    };
+}
+"""
+
+# CDP Performance.getMetrics values worth keeping.
+CDP_METRICS = (
+    "JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "LayoutCount", "RecalcStyleCount",
+    "LayoutDuration", "ScriptDuration", "TaskDuration",
+)
+
+# Budget name -> sample field
+BUDGET_METRICS = {
+    "ttfb": "ttfb_ms",
+    "dcl": "dcl_ms",
+    "load": "load_ms",
+    "fp": "fp_ms",
+    "fcp": "fcp_ms",
+    "lcp": "lcp_ms",
+    "cls": "cls",
+    "resources": "resources",
+    "requests": "resources",
+    "transfer": "transfer_bytes",
+    "decoded": "decoded_bytes",
+    "heap": "cdp.JSHeapUsedSize",
+    "nodes": "cdp.Nodes",
+}
+UNITS = {"": 1, "ms": 1, "s": 1000, "b": 1, "kb": 1024, "mb": 1024 ** 2}
+BUDGET_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|<|>=|>)\s*([\d.]+)\s*([a-zA-Z]*)\s*$")
+
+# Comparison: metric -> smallest absolute change that counts as a regression
+COMPARED_METRICS = {
+    "ttfb_ms": 50,
+    "fcp_ms": 100,
+    "lcp_ms": 100,
+    "load_ms": 100,
+    "cls": 0.02,
+    "transfer_bytes": 50 * 1024,
+}
+
+
+def metric_value(sample: Dict[str, Any], field: str) -> Optional[float]:
+    if field.startswith("cdp."):
+        return (sample.get("cdp") or {}).get(field[4:])
+    return sample.get(field)
+
+
+class Budget(NamedTuple):
+    """A parsed budget expression, e.g. Budget.parse("LCP < 2.5s")."""
+
+    metric: str
+    field: str
+    op: str
+    limit: float
+    expression: str
+
+    @classmethod
+    def parse(cls, expression: str) -> "Budget":
+        match = BUDGET_PATTERN.match(expression)
+        if not match:
+            raise ValueError(f"Invalid performance budget: {expression!r}")
+        metric, op, number, unit = match.groups()
+        field = BUDGET_METRICS.get(metric.lower())
+        if field is None:
+            raise ValueError(f"Unknown budget metric {metric!r}; use one of {sorted(BUDGET_METRICS)}")
+        if unit.lower() not in UNITS:
+            raise ValueError(f"Unknown unit {unit!r} in budget {expression!r}")
+        return cls(metric, field, op, float(number) * UNITS[unit.lower()], expression.strip())
+
+    def violation(self, sample: Dict[str, Any]) -> Optional[str]:
+        """A message if the sample breaks the budget; None if it holds or wasn't measured."""
+        value = metric_value(sample, self.field)
+        if value is None:
+            return None
+        ok = {
+            "<": value < self.limit,
+            "<=": value <= self.limit,
+            ">": value > self.limit,
+            ">=": value >= self.limit,
+        }[self.op]
+        if ok:
+            return None
+        return f"{self.expression} failed on {sample.get('url')}: {self.metric} = {value:g}"
+
+
+class MetricsWriter:
+    """Appends samples to the run's JSON lines file (shared by xdist workers)."""
+
+    def __init__(self, directory: str = DEFAULT_METRICS_DIR, run_id: Optional[str] = None):
+        self.run_id = run_id or os.getenv("PERF_RUN_ID") or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"run-{self.run_id}.jsonl")
+
+    def write(self, sample: Dict[str, Any]) -> None:
+        append_jsonl(self.path, [sample])
+
+
+class PageMetricsCollector:
+    """Samples performance metrics for every document a page opens with goto()."""
+
+    def __init__(
+        self,
+        page: Page,
+        writer: Optional[MetricsWriter] = None,
+        labels: Optional[Dict[str, Any]] = None,
+    ):
+        self.page = page
+        self.writer = writer
+        self.labels = labels or {}
+        self.samples: List[Dict[str, Any]] = []
+        self._cdp = None
+        # Latest sample of the document loaded by the last goto(), not yet recorded.
+        self._current: Optional[Dict[str, Any]] = None
+
+    def attach(self) -> "PageMetricsCollector":
+        self.page.add_init_script(OBSERVER_INIT_SCRIPT)
+        try:
+            self._cdp = self.page.context.new_cdp_session(self.page)
+            self._cdp.send("Performance.enable")
+        except Exception:
+            self._cdp = None  # Not Chromium
+
+        original_goto = self.page.goto
+
+        def goto(url: str, **kwargs):
+            self.flush()
+            response = original_goto(url, **kwargs)
+            self._current = self._collect()
+            return response
+
+        self.page.goto = goto
+        self.page.on("framenavigated", self._on_navigated)
+        return self
+
+    def _on_navigated(self, frame) -> None:
+        # The goto document is gone (click, form submit, redirect): keep its last sample.
+        if frame.parent_frame is None and self._current is not None:
+            self._record(self._current)
+
+    def _collect(self) -> Optional[Dict[str, Any]]:
+        try:
+            sample = self.page.evaluate(COLLECT_SCRIPT)
+        except Exception as e:
+            logger.debug("Could not collect page metrics: %s", e)
+            return None
+        sample["cdp"] = self._cdp_metrics()
+        sample.update(self.labels)
+        sample["time"] = time.time()
+        return sample
+
+    def _record(self, sample: Dict[str, Any]) -> Dict[str, Any]:
+        self._current = None
+        self.samples.append(sample)
+        if self.writer:
+            self.writer.write(sample)
+        return sample
+
+    def _cdp_metrics(self) -> Optional[Dict[str, float]]:
+        if self._cdp is None:
+            return None
+        try:
+            metrics = self._cdp.send("Performance.getMetrics")["metrics"]
+        except Exception as e:
+            logger.debug("CDP Performance.getMetrics failed: %s", e)
+            return None
+        return {m["name"]: m["value"] for m in metrics if m["name"] in CDP_METRICS}
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Record the last goto() document, refreshing its sample if it is still loaded."""
+        current = self._current
+        if current is None:
+            return None
+        latest = self._collect()
+        if latest is not None and latest.get("time_origin") == current.get("time_origin"):
+            current = latest
+        return self._record(current)
+
+    def violations(self, expressions: Iterable[str], url: Optional[str] = None) -> List[str]:
+        """Budget violations over the recorded goto() documents (whose URL contains `url`, if given)."""
+        self.flush()
+        budgets = [Budget.parse(expression) for expression in expressions]
+        return [
+            message
+            for sample in self.samples
+            if url is None or url in (sample.get("url") or "")
+            for budget in budgets
+            for message in [budget.violation(sample)]
+            if message
+        ]
+
+    def assert_budget(self, *expressions: str, url: Optional[str] = None) -> None:
+        problems = self.violations(expressions, url)
+        assert not problems, "Performance budget exceeded:\n  " + "\n  ".join(problems)
+
+
+def load_run(path: str) -> List[Dict[str, Any]]:
+    return read_jsonl(path)
+
+
+def _group(samples: List[Dict[str, Any]]) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for sample in samples:
+        url = (sample.get("url") or "").split("#")[0]
+        key = (sample.get("test", ""), sample.get("browser", ""), sample.get("device") or "", url)
+        groups.setdefault(key, []).append(sample)
+    return groups
+
+
+def _median(samples: List[Dict[str, Any]], field: str) -> Optional[float]:
+    values = [s[field] for s in samples if s.get(field) is not None]
+    return statistics.median(values) if values else None
+
+
+def compare_runs(
+    baseline: List[Dict[str, Any]],
+    current: List[Dict[str, Any]],
+    tolerance: float = 0.2,
+) -> List[str]:
+    """Regressions: median worse than baseline by more than `tolerance` and the noise floor."""
+    base_groups = _group(baseline)
+    regressions = []
+    for key, samples in sorted(_group(current).items()):
+        if key not in base_groups:
+            continue
+        for field, floor in COMPARED_METRICS.items():
+            before = _median(base_groups[key], field)
+            after = _median(samples, field)
+            if before is None or after is None:
+                continue
+            if after - before > max(floor, before * tolerance):
+                test, browser, device, url = key
+                where = " / ".join(part for part in (test, browser, device) if part)
+                regressions.append(f"{where} {url}: {field} {before:g} -> {after:g}")
+    return regressions
+
+
+def summarize_run(path: str) -> List[str]:
+    """One line per page: sample count and median LCP, load and transfer size."""
+    lines = []
+    for (test, browser, device, url), samples in sorted(_group(load_run(path)).items()):
+        lcp, load, transfer = (_median(samples, f) for f in ("lcp_ms", "load_ms", "transfer_bytes"))
+        label = " / ".join(part for part in (browser, device) if part)
+        lines.append(
+            f"{url} [{label}] n={len(samples)} "
+            f"LCP={'-' if lcp is None else f'{lcp:.0f} ms'} "
+            f"load={'-' if load is None else f'{load:.0f} ms'} "
+            f"transfer={'-' if transfer is None else f'{transfer / 1024:.0f} KB'}"
+        )
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Summarize or compare page performance runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_cmd = sub.add_parser("summary", help="Median metrics per page for one run")
+    summary_cmd.add_argument("run")
+    compare_cmd = sub.add_parser("compare", help="Report regressions of a run against a baseline")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        for line in summarize_run(args.run):
+            print(line)
+        return 0
+
+    regressions = compare_runs(load_run(args.baseline), load_run(args.current), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print("No performance regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,531 @@
+"""
+Web Test Plugin
+
+Playwright fixtures (lt_playwright, browser_pool, lt_browser, lt_page, ...), the web
+command line options and the page performance, browser memory and role locator
+reports. Registered from the root
+conftest; Playwright itself is imported by lt_playwright, so collecting or running
+tests that do not open a browser never loads it. Disable the plugin with
+`-p no:web.plugin`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from support.config import LT_ACCESS_KEY, LT_USERNAME, TestConfig
+from support.plugin import profile_locators, record_artifact, run_id, warm_client
+from support.retries import keep_for_retry, retry_pending, take_kept
+from support.tracing import step
+from web.backends import BACKENDS, DEFAULT_BACKEND, DEFAULT_GATEWAY_URL, BrowserPool, browser_launcher
+from web.memory_watchdog import DEFAULT_HEAP_MB, DEFAULT_RSS_MB, ContextSnapshot, MemoryWatchdog, summarize_memory
+from web.perf_metrics import DEFAULT_METRICS_DIR, MetricsWriter, PageMetricsCollector, summarize_run
+from web.profile_cache import DEFAULT_CACHE_MB, ProfileCache
+from web.role_snapshot import RoleSnapshot, RoleTimingsWriter, summarize_roles
+from web.storage_state import DEFAULT_CACHE_DIR, DEFAULT_TTL, SITE_SETUPS, StorageStateCache
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
+
+    from web.snapshot_server import SnapshotRouter
+
+logger = logging.getLogger(__name__)
+
+PAGE_METRICS_KEY = pytest.StashKey[PageMetricsCollector]()
+# Backends whose browsers serve many tests, so memory left behind by one test matters.
+POOLED_BACKENDS = ("local", "gateway")
+
+
+# Helper functions
+def get_ws_endpoint(
+    browser_name: str,
+    browser_version: str,
+    platform: str,
+    build: str | None = None,
+    name: str | None = None,
+) -> str:
+    """Generate WebSocket endpoint for LambdaTest."""
+    if not LT_USERNAME or not LT_ACCESS_KEY:
+        raise ValueError(
+            "LambdaTest credentials not set. Please set LT_USERNAME and LT_ACCESS_KEY environment variables."
+        )
+
+    # Merge common capabilities with test-specific capabilities
+    capabilities = {
+        "browserName": browser_name,
+        "browserVersion": browser_version,
+        "LT:Options": {
+            "platform": platform,
+            "build": build or "Playwright Python Build",
+            "name": name or "Playwright Python Test",
+            "user": LT_USERNAME,
+            "accessKey": LT_ACCESS_KEY,
+            "network": True,
+            "video": True,
+            "console": True,
+            "tunnel": False,
+            "geoLocation": "",
+        },
+    }
+    caps_json = json.dumps(capabilities)
+
+    return f"wss://cdp.lambdatest.com/playwright?capabilities={caps_json}"
+
+
+# Web Test Fixtures
+@pytest.fixture(scope="session")
+def lt_playwright():
+    """Single Playwright driver per worker, shared by every web backend."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        yield p
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, lt_playwright, snapshot_router):
+    """
+    Browsers kept alive for the whole worker session (local and gateway backends).
+    With --profile-cache local browsers run on persistent, cached profiles.
+    Local browsers come from the warm-session daemon when it is running.
+    """
+    profile_cache = None
+    if request.config.getoption("--profile-cache"):
+        profile_cache = ProfileCache(max_cache_mb=request.config.getoption("--profile-cache-size"))
+
+    pool = BrowserPool(
+        lt_playwright,
+        request.config.getoption("--backend"),
+        headless=not request.config.getoption("--local-headed"),
+        gateway_url=request.config.getoption("--gateway-url"),
+        profile_cache=profile_cache,
+        prepare_context=snapshot_router.install if snapshot_router else None,
+        warm=warm_client(request.config) if request.config.getoption("--backend") == "local" else None,
+    )
+    yield pool
+    pool.close()
+    if pool.profile_cache:
+        for line in pool.profile_cache.report():
+            logger.info("Profile cache: %s", line)
+
+
+@pytest.fixture(scope="session")
+def memory_watchdog(request) -> MemoryWatchdog | None:
+    """
+    Per-test browser memory records and recycling. On by default for the pooled
+    backends (local, gateway); cloud browsers are fresh per test, so there it needs
+    --memory-watchdog. Disabled with --no-memory-watchdog.
+    """
+    if request.config.getoption("--no-memory-watchdog"):
+        return None
+    if request.config.getoption("--backend") not in POOLED_BACKENDS and not request.config.getoption(
+        "--memory-watchdog"
+    ):
+        return None
+    return MemoryWatchdog(
+        request.config.getoption("--perf-metrics-dir"),
+        run_id(),
+        rss_limit_mb=request.config.getoption("--memory-rss-mb"),
+        heap_limit_mb=request.config.getoption("--memory-heap-mb"),
+    )
+
+
+@pytest.fixture(scope="function")
+def lt_browser(request, lt_playwright, memory_watchdog) -> Browser:
+    """
+    Pytest fixture for a Playwright browser on the selected backend.
+
+    With --backend=lambdatest (default) a cloud browser is connected for each test.
+    With --backend=local or --backend=gateway a session-wide browser is shared and
+    every context a test opens is closed when the test ends.
+    When a failed test is retried (see support/retries.py), the next attempt gets
+    the same cloud browser if it is still connected.
+    Contexts and pages a test leaves open are closed and reported by the memory
+    watchdog, which also recycles pooled browsers over their memory limits.
+
+    Usage in tests:
+    @pytest.mark.parametrize('lt_browser', [{
+        'browser_type': 'chrome',
+        'browser_name': 'Chrome',
+        'browser_version': 'latest',
+        'platform': 'Windows 10',
+        'build': 'Web Test Build',
+        'name': 'Web Test'
+    }], indirect=True)
+    def test_example(lt_browser):
+        page = lt_browser.new_page()
+        # Test code here
+    """
+    backend = request.config.getoption("--backend")
+    browser_type = request.param.get("browser_type")
+
+    if backend != "lambdatest":
+        pool = request.getfixturevalue("browser_pool")
+        browser = pool.get(browser_type)
+        instance = pool.instance(browser_type)
+        # Older Playwright versions expose no Browser for persistent (--profile-cache) contexts.
+        contexts_before = ContextSnapshot(browser.contexts if browser else [])
+        yield browser
+        leaks = contexts_before.close_leaks(browser.contexts if browser else [])
+        if memory_watchdog and memory_watchdog.after_test(
+            request.node.nodeid, browser, instance, backend, leaks, recyclable=pool.recyclable(browser_type)
+        ):
+            pool.recycle(browser_type)
+        return
+
+    browser_name = request.param.get("browser_name")
+    browser_version = request.param.get("browser_version")
+    platform = request.param.get("platform")
+    build = request.param.get("build")
+    name = request.param.get("name")
+
+    if name is None:
+        test_name = request.node.name.replace("_", " ").title()
+        name = f"{test_name} - {browser_type.capitalize()}"
+
+    ws_endpoint = get_ws_endpoint(browser_name, browser_version, platform, build, name)
+
+    browser = take_kept(request.node, "browser")
+    if browser is None or not browser.is_connected():
+        with step("connect", category="connect"):
+            browser = browser_launcher(lt_playwright, browser_type).connect(ws_endpoint)
+    contexts_before = ContextSnapshot(browser.contexts)
+    try:
+        yield browser
+    finally:
+        if memory_watchdog and browser.is_connected():
+            leaks = contexts_before.close_leaks(browser.contexts)
+            instance = f"{browser.browser_type.name} (cloud)"
+            memory_watchdog.after_test(request.node.nodeid, browser, instance, backend, leaks)
+        if retry_pending(request.node) and browser.is_connected():
+            for context in browser.contexts:
+                context.close()
+            keep_for_retry(request.node, "browser", browser, browser.close)
+        else:
+            browser.close()
+
+
+@pytest.fixture(scope="session")
+def snapshot_router(request) -> SnapshotRouter | None:
+    """
+    URL-rewrite mode: serves the snapshotted sites from a local server when
+    --snapshot-dir is given (see web/snapshot_server.py).
+    """
+    snapshot_dir = request.config.getoption("--snapshot-dir")
+    if not snapshot_dir:
+        yield None
+        return
+
+    from web.snapshot_server import SnapshotRouter, SnapshotServer
+
+    server = SnapshotServer(snapshot_dir).start()
+    try:
+        yield SnapshotRouter(
+            server.url,
+            server.store.hosts,
+            passthrough=request.config.getoption("--snapshot-passthrough"),
+        )
+    finally:
+        server.stop()
+
+
+@pytest.fixture(scope="session")
+def storage_state_cache(request, snapshot_router) -> StorageStateCache | None:
+    """
+    Session-wide cache of primed storage state (accepted cookie banners, locale).
+    Disabled with --no-storage-state.
+    """
+    if request.config.getoption("--no-storage-state"):
+        return None
+    snapshot_dir = request.config.getoption("--snapshot-dir")
+    return StorageStateCache(
+        # Snapshot runs keep their own cache so live-site state is never mixed in.
+        directory=os.path.join(snapshot_dir, ".storage_state") if snapshot_dir else DEFAULT_CACHE_DIR,
+        ttl=request.config.getoption("--storage-state-ttl"),
+        check_site=not snapshot_dir,
+        prepare_context=snapshot_router.install if snapshot_router else None,
+    )
+
+
+@pytest.fixture(scope="session")
+def perf_metrics_writer(request) -> MetricsWriter:
+    """Per-run page metrics file shared by all workers."""
+    return MetricsWriter(request.config.getoption("--perf-metrics-dir"))
+
+
+def measures_pages(item) -> bool:
+    """Page metrics are recorded with --perf-metrics, or for tests that check budgets."""
+    return bool(
+        item.config.getoption("--perf-metrics")
+        or item.get_closest_marker("perf_budget")
+        or "page_metrics" in item.fixturenames
+    )
+
+
+@pytest.fixture(scope="function")
+def lt_page(
+    request,
+    lt_playwright,
+    lt_browser: Browser,
+    storage_state_cache,
+    snapshot_router,
+    memory_watchdog,
+) -> Page:
+    """
+    Pytest fixture that provides a new browser page.
+    The page's context is primed from the storage state cache for the origins of the
+    test's storage_state marker (without the cache, their cookie banners are dismissed
+    on demand) and routed to the local snapshot server in --snapshot-dir mode.
+    In --profile-cache mode the page opens in the worker's persistent context, which
+    keeps its cookies and HTTP cache like a returning visitor.
+    With --perf-metrics, or for tests with perf_budget markers or the page_metrics
+    fixture, performance metrics are recorded for every goto (see web/perf_metrics.py);
+    budgets are checked when the test's call report is made.
+    The page's JS heap and DOM size are sampled for the memory watchdog before it closes.
+    With --locator-profile every locator call of the test is timed (support/locator_profiler.py).
+    Automatically takes a screenshot on test failure.
+    """
+    pool = request.getfixturevalue("browser_pool") if request.config.getoption("--profile-cache") else None
+    origins = [origin for marker in request.node.iter_markers("storage_state") for origin in marker.args]
+    if pool and pool.profile_cache:
+        browser_type = request.node.callspec.params["lt_browser"].get("browser_type")
+        context = pool.persistent_context(browser_type)
+    elif storage_state_cache and origins:
+        context = storage_state_cache.new_context(lt_browser, origins)
+    else:
+        context = lt_browser.new_context()
+        if snapshot_router:
+            snapshot_router.install(context)
+    page = context.new_page()
+    if storage_state_cache is None:
+        for origin in origins:
+            if origin in SITE_SETUPS:
+                SITE_SETUPS[origin].install_fallback(page)
+
+    metrics = None
+    if measures_pages(request.node):
+        params = request.node.callspec.params
+        device = params.get("device")
+        labels = {
+            "test": request.node.nodeid,
+            "browser": params["lt_browser"].get("browser_type"),
+            "device": device["name"] if isinstance(device, dict) else device,
+        }
+        writer = request.getfixturevalue("perf_metrics_writer")
+        metrics = PageMetricsCollector(page, writer, labels).attach()
+        request.node.stash[PAGE_METRICS_KEY] = metrics
+    with profile_locators(request):
+        yield page
+
+    if metrics:
+        metrics.flush()
+
+    # Take screenshot on test failure
+    if (
+        hasattr(pytest, "test_failed")
+        and pytest.test_failed
+        and TestConfig.SCREENSHOT_ON_FAILURE
+    ):
+        screenshot = page.screenshot()
+        with open("test_failure.png", "wb") as f:
+            f.write(screenshot)
+        record_artifact(request.node, "screenshot", "test_failure.png")
+
+    if memory_watchdog:
+        memory_watchdog.sample_page(request.node.nodeid, page)
+    if pool and pool.profile_cache:
+        pool.profile_cache.record_load(browser_launcher(lt_playwright, browser_type).name, page)
+        page.close()
+    else:
+        page.close()
+        context.close()
+
+
+@pytest.fixture(scope="function")
+def role_snapshot(request, lt_page) -> RoleSnapshot:
+    """
+    Role queries of lt_page answered from one accessibility snapshot per page state
+    (see web/role_snapshot.py); plain page.get_by_role with --no-role-snapshot.
+
+    Usage in tests:
+    def test_example(lt_page, role_snapshot):
+        role_snapshot.get_by_role("textbox", name="Search For Products").fill("iPhone")
+    """
+    roles = RoleSnapshot(
+        lt_page,
+        enabled=not request.config.getoption("--no-role-snapshot"),
+        measure_live=request.config.getoption("--role-snapshot-timings"),
+    ).attach()
+    yield roles
+    if roles.enabled:
+        RoleTimingsWriter(request.config.getoption("--perf-metrics-dir"), run_id()).write(
+            request.node.nodeid, roles.timings()
+        )
+
+
+@pytest.fixture(scope="function")
+def page_metrics(request, lt_page) -> PageMetricsCollector:
+    """The metrics collector of the test's lt_page, for budget assertions inside a test."""
+    return request.node.stash[PAGE_METRICS_KEY]
+
+
+# Hooks
+def pytest_addoption(parser):
+    group = parser.getgroup("lambdatest")
+    group.addoption(
+        "--backend",
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help="Where web tests get their browser: lambdatest (default), local or gateway.",
+    )
+    group.addoption(
+        "--gateway-url",
+        default=DEFAULT_GATEWAY_URL,
+        help="Playwright browser server websocket used by --backend=gateway.",
+    )
+    group.addoption(
+        "--local-headed",
+        action="store_true",
+        default=False,
+        help="Show the local browser window instead of running headless.",
+    )
+    group.addoption(
+        "--profile-cache",
+        action="store_true",
+        default=False,
+        help="Run local browsers on persistent profiles whose HTTP cache is kept between runs.",
+    )
+    group.addoption(
+        "--profile-cache-size",
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help="Disk cache cap per browser profile in MB.",
+    )
+    group.addoption(
+        "--snapshot-dir",
+        default=os.getenv("SNAPSHOT_DIR"),
+        help="Serve the playground sites from this snapshot directory instead of the internet.",
+    )
+    group.addoption(
+        "--snapshot-passthrough",
+        action="store_true",
+        default=False,
+        help="In snapshot mode, let requests to hosts outside the snapshot reach the network.",
+    )
+    group.addoption(
+        "--no-storage-state",
+        action="store_true",
+        default=False,
+        help="Start every page from an empty profile instead of the cached storage state.",
+    )
+    group.addoption(
+        "--storage-state-ttl",
+        type=int,
+        default=DEFAULT_TTL,
+        help="Seconds before a cached storage state is set up again.",
+    )
+    group.addoption(
+        "--perf-metrics",
+        action="store_true",
+        default=False,
+        help="Record page performance metrics for every test, not only those with perf_budget "
+        "markers or the page_metrics fixture.",
+    )
+    group.addoption(
+        "--perf-metrics-dir",
+        default=DEFAULT_METRICS_DIR,
+        help="Directory for the per-run page metrics files.",
+    )
+    group.addoption(
+        "--memory-watchdog",
+        action="store_true",
+        default=False,
+        help="Sample browser memory after each test on --backend=lambdatest too (on by default for local and gateway).",
+    )
+    group.addoption(
+        "--no-memory-watchdog",
+        action="store_true",
+        default=False,
+        help="Do not sample browser memory after each test or recycle pooled browsers.",
+    )
+    group.addoption(
+        "--memory-rss-mb",
+        type=float,
+        default=DEFAULT_RSS_MB,
+        help="Recycle a pooled local browser whose processes use more memory (RSS) than this.",
+    )
+    group.addoption(
+        "--memory-heap-mb",
+        type=float,
+        default=DEFAULT_HEAP_MB,
+        help="Recycle a pooled browser after a test page's JS heap grew beyond this.",
+    )
+    group.addoption(
+        "--no-role-snapshot",
+        action="store_true",
+        default=False,
+        help="Resolve role_snapshot queries with page.get_by_role instead of a snapshot.",
+    )
+    group.addoption(
+        "--role-snapshot-timings",
+        action="store_true",
+        default=False,
+        help="Also run every role_snapshot query live to compare its cost and matches.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "storage_state(*origins): prime lt_page's context with the cached storage state of these origins",
+    )
+    config.addinivalue_line(
+        "markers",
+        "perf_budget(*budgets, url=None): budgets like 'LCP < 2.5s' for every page the test loads "
+        "(only pages whose URL contains url, if given)",
+    )
+
+
+# Inside support.plugin's wrapper, so it already sees a budget failure as a failed call.
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_makereport(item, call):
+    """Fail the call phase of a passing test whose pages broke its perf_budget markers."""
+    outcome = yield
+    report = outcome.get_result()
+    metrics = item.stash.get(PAGE_METRICS_KEY, None)
+    if report.when != "call" or not report.passed or metrics is None:
+        return
+    violations = []
+    for marker in item.iter_markers("perf_budget"):
+        violations += metrics.violations(marker.args, marker.kwargs.get("url"))
+    if violations:
+        report.outcome = "failed"
+        report.longrepr = "Performance budget exceeded:\n  " + "\n  ".join(violations)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    run_file = os.path.join(config.getoption("--perf-metrics-dir"), f"run-{run_id()}.jsonl")
+    if os.path.exists(run_file):
+        terminalreporter.section("page performance")
+        for line in summarize_run(run_file):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Metrics: {run_file}")
+
+    memory_file = os.path.join(config.getoption("--perf-metrics-dir"), f"memory-{run_id()}.jsonl")
+    if os.path.exists(memory_file):
+        terminalreporter.section("browser memory")
+        for line in summarize_memory(memory_file):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Memory: {memory_file}")
+
+    roles_file = os.path.join(config.getoption("--perf-metrics-dir"), f"roles-{run_id()}.jsonl")
+    if os.path.exists(roles_file):
+        terminalreporter.section("role locators")
+        for line in summarize_roles(roles_file):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Timings: {roles_file}")
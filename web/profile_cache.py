@@ -0,0 +1,274 @@
+"""
+Persistent Browser Profile Cache for Local Runs
+
+Local browsers normally start from an empty profile, so every run downloads the same
+CSS, JS and images again. With --profile-cache the local backend launches a persistent
+context per browser type instead, whose profile (and HTTP disk cache) survives runs.
+
+Layout under .browser_profiles/:
+    template-<browser>-<build>/    warmed profile, one per browser build
+    <worker>-<browser>-<build>/    profile owned by one xdist worker for one session
+    load_times.json                cold/warm page load history
+
+Each worker clones the template at session start (copy-on-write via
+`cp --reflink=auto` where the filesystem supports it), so parallel workers never share
+a profile directory. When no template exists the run is "cold"; at session end the
+first worker to finish promotes its profile to the template with an atomic rename.
+A template older than BROWSER_PROFILE_TEMPLATE_HOURS (default 24) or written by an
+older TEMPLATE_VERSION is replaced the same way, so the warm cache follows the site.
+Cloning, promotion and the load-time history are serialized across workers with a
+file lock; the history is rewritten through a temp file and os.replace.
+
+The disk cache is capped with the browser's own limit (Chromium --disk-cache-size,
+Firefox browser.cache.disk.capacity) and the template is pruned oldest-first to the
+same cap before promotion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from support.file_lock import file_lock
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, BrowserType, Page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_ROOT = os.getenv("BROWSER_PROFILE_DIR", ".browser_profiles")
+DEFAULT_CACHE_MB = 256
+TEMPLATE_MAX_AGE = float(os.getenv("BROWSER_PROFILE_TEMPLATE_HOURS", "24")) * 3600  # seconds
+# Bump when the way profiles are prepared changes, to replace every existing template.
+TEMPLATE_VERSION = 1
+TEMPLATE_INFO = "template.json"
+# Profile sub-directories that only hold cache data and may be evicted.
+CACHE_SUBDIRS = ("Default/Cache", "Default/Code Cache", "cache2")
+# Lock files left by a running browser must not be cloned into another profile.
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lock", ".parentlock")
+
+LOAD_TIMING_SCRIPT = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const resources = performance.getEntriesByType('resource');
+    return {
+        load_ms: nav ? nav.loadEventEnd - nav.startTime : null,
+        resources: resources.length,
+        cached: resources.filter((r) => r.transferSize === 0 && r.decodedBodySize > 0).length,
+    };
+}
+"""
+
+
+def evict(profile_dir: str, max_bytes: int) -> int:
+    """Delete the oldest cache files until the profile's caches fit in max_bytes."""
+    files = []
+    for subdir in CACHE_SUBDIRS:
+        for root, _, names in os.walk(os.path.join(profile_dir, subdir)):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def clone_profile(source: str, destination: str) -> None:
+    """Copy-on-write clone where supported, plain copy otherwise."""
+    if os.path.exists(destination):
+        shutil.rmtree(destination)
+    try:
+        subprocess.run(
+            ["cp", "-a", "--reflink=auto", source, destination],
+            check=True,
+            capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        shutil.copytree(source, destination, symlinks=True)
+    for name in LOCK_FILES:
+        path = os.path.join(destination, name)
+        if os.path.lexists(path):
+            os.remove(path)
+
+
+class ProfileCache:
+    """Hands out worker-owned persistent contexts cloned from a warmed template."""
+
+    def __init__(
+        self,
+        root: str = DEFAULT_PROFILE_ROOT,
+        max_cache_mb: int = DEFAULT_CACHE_MB,
+        worker_id: Optional[str] = None,
+    ):
+        self.root = root
+        self.max_cache_bytes = max_cache_mb * 1024 * 1024
+        self.worker_id = worker_id or os.getenv("PYTEST_XDIST_WORKER", "main")
+        self.warm: Dict[str, bool] = {}
+        self.samples: Dict[str, List[Dict[str, Any]]] = {}
+        self._profiles: Dict[str, str] = {}
+        self._templates: Dict[str, str] = {}
+
+    def _build_key(self, launcher: BrowserType) -> str:
+        # The executable path changes with every browser build Playwright installs.
+        build = hashlib.sha1(launcher.executable_path.encode()).hexdigest()[:10]
+        return f"{launcher.name}-{build}"
+
+    def template_dir(self, launcher: BrowserType) -> str:
+        return os.path.join(self.root, f"template-{self._build_key(launcher)}")
+
+    def _lock(self, name: str):
+        return file_lock(os.path.join(self.root, f"{name}.lock"))
+
+    @staticmethod
+    def template_is_fresh(template: str) -> bool:
+        """A template exists, was written by this TEMPLATE_VERSION and is younger than TEMPLATE_MAX_AGE."""
+        try:
+            with open(os.path.join(template, TEMPLATE_INFO), "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return info.get("version") == TEMPLATE_VERSION and time.time() - info.get("created", 0) < TEMPLATE_MAX_AGE
+
+    def launch(
+        self,
+        launcher: BrowserType,
+        headless: bool = True,
+        prepare_context: Optional[Callable[[BrowserContext], None]] = None,
+    ) -> BrowserContext:
+        """Launch a persistent context on this worker's clone of the template profile."""
+        key = self._build_key(launcher)
+        profile = os.path.join(self.root, f"{self.worker_id}-{key}")
+        template = self.template_dir(launcher)
+        os.makedirs(self.root, exist_ok=True)
+
+        with self._lock(os.path.basename(template)):
+            self.warm[launcher.name] = os.path.isdir(template)
+            if self.warm[launcher.name]:
+                clone_profile(template, profile)
+                # The marker belongs to the template; a promoted clone gets a new one.
+                info = os.path.join(profile, TEMPLATE_INFO)
+                if os.path.exists(info):
+                    os.remove(info)
+            elif os.path.exists(profile):
+                shutil.rmtree(profile)
+        self._profiles[launcher.name] = profile
+        self._templates[launcher.name] = template
+
+        options: Dict[str, Any] = {"headless": headless}
+        if launcher.name == "chromium":
+            options["args"] = [f"--disk-cache-size={self.max_cache_bytes}"]
+        elif launcher.name == "firefox":
+            options["firefox_user_prefs"] = {
+                "browser.cache.disk.smart_size.enabled": False,
+                "browser.cache.disk.capacity": self.max_cache_bytes // 1024,
+            }
+
+        logger.info(
+            "Launching %s with %s profile %s", launcher.name, "warm" if self.warm[launcher.name] else "cold", profile
+        )
+        context = launcher.launch_persistent_context(profile, **options)
+        if prepare_context:
+            prepare_context(context)
+        return context
+
+    def record_load(self, browser_name: str, page: Page) -> None:
+        """Sample the last navigation's load time and how many resources came from cache."""
+        try:
+            sample = page.evaluate(LOAD_TIMING_SCRIPT)
+        except Exception as e:
+            logger.debug("Could not read load timing: %s", e)
+            return
+        if sample and sample.get("load_ms") and sample["load_ms"] > 0:
+            self.samples.setdefault(browser_name, []).append(sample)
+
+    def promote(self, launcher_name: str) -> None:
+        """Make this worker's (closed) profile the template unless a fresh one exists."""
+        profile = self._profiles.get(launcher_name)
+        template = self._templates.get(launcher_name)
+        if not profile or not os.path.isdir(profile) or self.template_is_fresh(template):
+            return
+        with self._lock(os.path.basename(template)):
+            # Another worker may have promoted its profile while this one waited.
+            if self.template_is_fresh(template):
+                return
+            evict(profile, self.max_cache_bytes)
+            staging = f"{template}.{self.worker_id}.tmp"
+            clone_profile(profile, staging)
+            with open(os.path.join(staging, TEMPLATE_INFO), "w", encoding="utf-8") as f:
+                json.dump({"version": TEMPLATE_VERSION, "created": time.time(), "worker": self.worker_id}, f)
+            retired = f"{template}.{self.worker_id}.old"
+            if os.path.isdir(template):
+                os.rename(template, retired)
+            os.rename(staging, template)
+            shutil.rmtree(retired, ignore_errors=True)
+            logger.info("Promoted %s to template %s", profile, template)
+
+    def report(self) -> List[str]:
+        """Append this session's load times to the history and compare cold vs warm."""
+        if not self.samples:
+            return []
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock("load_times"):
+            return self._report(os.path.join(self.root, "load_times.json"))
+
+    def _report(self, history_path: str) -> List[str]:
+        try:
+            with open(history_path, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+
+        lines = []
+        for browser_name, samples in self.samples.items():
+            mode = "warm" if self.warm.get(browser_name) else "cold"
+            mean_load = sum(s["load_ms"] for s in samples) / len(samples)
+            resources = sum(s["resources"] for s in samples)
+            cached = sum(s["cached"] for s in samples)
+            history.append(
+                {
+                    "time": time.time(),
+                    "worker": self.worker_id,
+                    "browser": browser_name,
+                    "mode": mode,
+                    "pages": len(samples),
+                    "mean_load_ms": round(mean_load, 1),
+                    "cached_ratio": round(cached / resources, 3) if resources else 0.0,
+                }
+            )
+            line = (
+                f"{browser_name} ({mode} profile): {len(samples)} page loads, "
+                f"mean {mean_load:.0f} ms, {cached}/{resources} resources from cache"
+            )
+            previous = [
+                h for h in history[:-1] if h["browser"] == browser_name and h["mode"] != mode
+            ]
+            if previous:
+                other = previous[-1]
+                line += f" (last {other['mode']} run: mean {other['mean_load_ms']:.0f} ms)"
+            lines.append(line)
+
+        tmp_path = f"{history_path}.{self.worker_id}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(history[-500:], f, indent=1)
+        os.replace(tmp_path, history_path)
+        return lines
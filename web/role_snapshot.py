@@ -0,0 +1,434 @@
+"""
+Accessibility-Snapshot Role Locators
+
+page.get_by_role() computes roles and accessible names for every candidate element
+each time the locator is resolved, i.e. on every action and every expect() poll.
+RoleSnapshot instead takes one snapshot of the page's roles and names with a single
+page.evaluate call and resolves any number of role queries against it in Python:
+
+    roles = RoleSnapshot(page).attach()
+    roles.get_by_role("textbox", name="Search For Products").fill("iPhone")
+    roles.get_by_role("button", name="Search").click()   # same snapshot, no round trip
+
+Each matched element is tagged with a data-role-ref attribute unique to its document,
+and the returned Locator selects those refs, so it never matches an element of another
+document.
+
+The snapshot is dropped when the main frame navigates and when the DOM changes in a
+way that can change roles, names or visibility: nodes added or removed, text,
+role/aria-*/label attributes, and class or style changes that hide an element of the
+snapshot (or the element they were made on). The next query takes a new one. Elements
+revealed by a class or style change are not in the snapshot; a query for them finds no
+ref and falls back to page.get_by_role.
+
+The returned Locator is a plain page.locator() of refs. A ref stays on its element, so
+the locator keeps working while that element does; a locator kept across a page change
+that may have re-rendered it can be passed to roles.refresh(), which re-runs its role
+query when the snapshot it came from has been dropped:
+
+    menu = roles.get_by_role("button", name="Shop by Category")
+    page.screenshot()
+    roles.refresh(menu).click()
+
+Queries the snapshot cannot answer (no match yet, or options other than name, exact
+and level) fall back to page.get_by_role, which waits for the element as usual.
+
+Roles and names follow the common HTML mappings and the accessible name rules
+(aria-labelledby, aria-label, labels, alt, title, placeholder, and content for buttons,
+links, headings, cells, options, ...), which covers the playground sites; with
+--role-snapshot-timings every query is also run live and a differing match count is
+logged.
+
+Timings go to perf_metrics/roles-<run id>.jsonl: the local resolution time, an equal
+share of the snapshot's cost for every query it served and, with
+--role-snapshot-timings, the cost of the live role query against resolving the handle.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import statistics
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Pattern, Tuple, Union
+
+from support.jsonl import append_jsonl, read_jsonl
+from support.tracing import step
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Frame, Locator, Page
+
+logger = logging.getLogger(__name__)
+
+REF_ATTRIBUTE = "data-role-ref"
+
+SNAPSHOT_SCRIPT = """
+(refAttribute) => {
+    const state = window.__roleSnapshot = window.__roleSnapshot || {
+        token: Math.random().toString(36).slice(2, 8),
+        next: 0,
+        observer: null,
+    };
+    const NAME_FROM_CONTENT = new Set([
+        'button', 'cell', 'checkbox', 'columnheader', 'gridcell', 'heading', 'link',
+        'menuitem', 'menuitemcheckbox', 'menuitemradio', 'option', 'radio', 'row',
+        'rowheader', 'switch', 'tab', 'tooltip', 'treeitem',
+    ]);
+    const LANDMARK_PARENTS = 'article, aside, main, nav, section';
+    const INPUT_ROLES = {
+        button: 'button', submit: 'button', reset: 'button', image: 'button',
+        checkbox: 'checkbox', radio: 'radio', range: 'slider', number: 'spinbutton',
+        search: 'searchbox', hidden: null,
+    };
+    const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+
+    const hidden = (el) => {
+        if (el.closest('[aria-hidden="true"]')) return true;
+        if (el.checkVisibility) return !el.checkVisibility({visibilityProperty: true});
+        return el.getClientRects().length === 0 || getComputedStyle(el).visibility === 'hidden';
+    };
+
+    const implicitRole = (el) => {
+        const tag = el.localName;
+        switch (tag) {
+            case 'a': case 'area': return el.hasAttribute('href') ? 'link' : null;
+            case 'button': return 'button';
+            case 'h1': case 'h2': case 'h3': case 'h4': case 'h5': case 'h6': return 'heading';
+            case 'input': {
+                const type = (el.getAttribute('type') || 'text').toLowerCase();
+                if (type in INPUT_ROLES) return INPUT_ROLES[type];
+                return el.hasAttribute('list') ? 'combobox' : 'textbox';
+            }
+            case 'textarea': return 'textbox';
+            case 'select': return el.multiple || el.size > 1 ? 'listbox' : 'combobox';
+            case 'option': return 'option';
+            case 'img': return el.getAttribute('alt') === '' ? 'presentation' : 'img';
+            case 'nav': return 'navigation';
+            case 'main': return 'main';
+            case 'aside': return 'complementary';
+            case 'header': return el.parentElement && el.parentElement.closest(LANDMARK_PARENTS) ? null : 'banner';
+            case 'footer': return el.parentElement && el.parentElement.closest(LANDMARK_PARENTS) ? null : 'contentinfo';
+            case 'form': return 'form';
+            case 'section': return el.hasAttribute('aria-label') || el.hasAttribute('aria-labelledby') ? 'region' : null;
+            case 'article': return 'article';
+            case 'ul': case 'ol': case 'menu': return 'list';
+            case 'li': return 'listitem';
+            case 'table': return 'table';
+            case 'thead': case 'tbody': case 'tfoot': return 'rowgroup';
+            case 'tr': return 'row';
+            case 'td': return 'cell';
+            case 'th': return 'columnheader';
+            case 'dialog': return 'dialog';
+            case 'fieldset': return 'group';
+            case 'progress': return 'progressbar';
+            case 'hr': return 'separator';
+            case 'p': return 'paragraph';
+        }
+        return null;
+    };
+
+    const contentText = (node) => {
+        let text = '';
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                text += child.textContent;
+            } else if (child.nodeType === Node.ELEMENT_NODE && !hidden(child)) {
+                const label = child.getAttribute('aria-label');
+                if (label && label.trim()) text += ' ' + label + ' ';
+                else if (child.localName === 'img') text += ' ' + (child.getAttribute('alt') || '') + ' ';
+                else text += ' ' + contentText(child) + ' ';
+            }
+        }
+        return text;
+    };
+
+    const accessibleName = (el, role) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = labelledBy.split(/\\s+/)
+                .map((id) => document.getElementById(id))
+                .filter(Boolean)
+                .map((ref) => clean(ref.getAttribute('aria-label') || contentText(ref)))
+                .join(' ');
+            if (clean(text)) return clean(text);
+        }
+        const label = clean(el.getAttribute('aria-label'));
+        if (label) return label;
+        const tag = el.localName;
+        if (tag === 'input' || tag === 'select' || tag === 'textarea') {
+            const type = (el.getAttribute('type') || '').toLowerCase();
+            if (['button', 'submit', 'reset'].includes(type)) {
+                return clean(el.value) || (type === 'submit' ? 'Submit' : type === 'reset' ? 'Reset' : '');
+            }
+            if (type === 'image') return clean(el.getAttribute('alt')) || clean(el.title);
+            const labels = Array.from(el.labels || []).map((l) => clean(contentText(l))).join(' ');
+            if (clean(labels)) return clean(labels);
+            return clean(el.title) || clean(el.getAttribute('placeholder'));
+        }
+        if (tag === 'img' || tag === 'area') return clean(el.getAttribute('alt')) || clean(el.title);
+        if (tag === 'fieldset') {
+            const legend = el.querySelector(':scope > legend');
+            if (legend) return clean(contentText(legend));
+        }
+        if (tag === 'table' && el.caption) return clean(contentText(el.caption));
+        if (NAME_FROM_CONTENT.has(role)) {
+            const text = clean(contentText(el));
+            if (text) return text;
+        }
+        return clean(el.title);
+    };
+
+    const elements = [];
+    for (const el of document.querySelectorAll('*')) {
+        const explicit = (el.getAttribute('role') || '').trim().split(/\\s+/)[0];
+        const role = explicit || implicitRole(el);
+        if (!role || role === 'presentation' || role === 'none' || hidden(el)) continue;
+        let ref = el.getAttribute(refAttribute);
+        if (!ref || !ref.startsWith(state.token)) {
+            ref = `${state.token}-${state.next++}`;
+            el.setAttribute(refAttribute, ref);
+        }
+        const ariaLevel = parseInt(el.getAttribute('aria-level'), 10);
+        const headingLevel = /^h[1-6]$/.test(el.localName) ? parseInt(el.localName[1], 10) : null;
+        elements.push([ref, role, accessibleName(el, role), ariaLevel || headingLevel]);
+    }
+    state.refs = new Set(elements.map((element) => element[0]));
+
+    // A class or style change only matters when it hides the element it was made on or
+    // an element of the snapshot under it; hover and animation classes do not.
+    const hidesSnapshot = (target) => {
+        if (target.nodeType !== Node.ELEMENT_NODE || !target.isConnected) return false;
+        if (hidden(target)) return true;
+        for (const el of target.querySelectorAll(`[${refAttribute}]`)) {
+            if (state.refs.has(el.getAttribute(refAttribute)) && hidden(el)) return true;
+        }
+        return false;
+    };
+
+    // Report the first relevant change after each snapshot; our own ref attributes are ignored.
+    if (!state.observer && window.__roleSnapshotChanged) {
+        state.observer = new MutationObserver((mutations) => {
+            if (state.reported) return;
+            const relevant = mutations.some((m) =>
+                m.type !== 'attributes'
+                || (m.attributeName !== 'class' && m.attributeName !== 'style')
+                || hidesSnapshot(m.target));
+            if (!relevant) return;
+            state.reported = true;
+            window.__roleSnapshotChanged();
+        });
+        state.observer.observe(document, {
+            subtree: true,
+            childList: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: [
+                'role', 'aria-label', 'aria-labelledby', 'aria-hidden', 'aria-level',
+                'hidden', 'type', 'href', 'alt', 'title', 'placeholder', 'for', 'open',
+                'class', 'style',
+            ],
+        });
+    }
+    state.reported = false;
+    return {token: state.token, elements: elements};
+}
+"""
+
+Name = Union[str, Pattern[str], None]
+Query = Tuple[str, Name, bool, Optional[int], Dict[str, Any]]
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def name_matches(name: str, expected: Name, exact: bool = False) -> bool:
+    """Playwright's name matching: substring ignoring case, or exact, or a regex search."""
+    if expected is None:
+        return True
+    if isinstance(expected, re.Pattern):
+        return expected.search(name) is not None
+    if exact:
+        return _normalize(name) == _normalize(expected)
+    return _normalize(expected).lower() in _normalize(name).lower()
+
+
+class RoleSnapshot:
+    """Role and name of every element of the page's current document, taken on demand."""
+
+    def __init__(self, page: Page, enabled: bool = True, measure_live: bool = False):
+        self.page = page
+        self.enabled = enabled
+        self.measure_live = measure_live
+        self.elements: Optional[List[Tuple[str, str, str, Optional[int]]]] = None
+        self.snapshots: List[float] = []  # ms per snapshot taken
+        self.records: List[Dict[str, Any]] = []
+        # Bumped whenever the snapshot is dropped; refresh() compares handed-out locators against it.
+        self.generation = 0
+        self._issued: Dict[int, Tuple[Locator, Query, int]] = {}
+
+    def attach(self) -> "RoleSnapshot":
+        if self.enabled:
+            self.page.on("framenavigated", self._navigated)
+            self.page.expose_binding("__roleSnapshotChanged", lambda source: self.invalidate())
+        return self
+
+    def _navigated(self, frame: Frame) -> None:
+        if frame == self.page.main_frame:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        if self.elements is not None:
+            self.generation += 1
+        self.elements = None
+
+    def snapshot(self) -> List[Tuple[str, str, str, Optional[int]]]:
+        """The current snapshot, taken now if the page changed since the last one."""
+        if self.elements is None:
+            started = time.perf_counter()
+            with step("role-snapshot", category="locator"):
+                result = self.page.evaluate(SNAPSHOT_SCRIPT, REF_ATTRIBUTE)
+            self.elements = [tuple(element) for element in result["elements"]]
+            self.snapshots.append((time.perf_counter() - started) * 1000)
+        return self.elements
+
+    def get_by_role(
+        self,
+        role: str,
+        name: Name = None,
+        exact: bool = False,
+        level: Optional[int] = None,
+        **options: Any,
+    ) -> Locator:
+        """Same arguments as page.get_by_role; other options always resolve live."""
+        query = (role, name, exact, level, options)
+        locator = self.resolve(*query)
+        if self.enabled and not options and self.records[-1]["source"] == "snapshot":
+            # Keep the locator alive with its entry so its id() is not reused.
+            self._issued[id(locator)] = (locator, query, self.generation)
+        return locator
+
+    def refresh(self, locator: Locator) -> Locator:
+        """
+        The locator itself while the snapshot it came from is current, otherwise its role
+        query resolved again. Use it for a locator kept across a page change.
+        """
+        issued = self._issued.get(id(locator))
+        if issued is None or issued[0] is not locator or issued[2] == self.generation:
+            return locator
+        return self.get_by_role(*issued[1][:4], **issued[1][4])
+
+    def resolve(
+        self, role: str, name: Name, exact: bool, level: Optional[int], options: Dict[str, Any]
+    ) -> Locator:
+        """A plain Locator for the query: snapshot refs, or page.get_by_role."""
+        live_options = {k: v for k, v in (("name", name), ("level", level)) if v is not None}
+        if exact:
+            live_options["exact"] = True
+        live_options.update(options)
+        if not self.enabled or options:
+            return self.page.get_by_role(role, **live_options)
+
+        self.snapshot()
+        started = time.perf_counter()
+        refs = [
+            ref
+            for ref, element_role, element_name, element_level in self.elements
+            if element_role == role
+            and name_matches(element_name, name, exact)
+            and (level is None or element_level == level)
+        ]
+        record = {
+            "role": role,
+            "name": name.pattern if isinstance(name, re.Pattern) else name,
+            "level": level,
+            "matches": len(refs),
+            "snapshot": len(self.snapshots) - 1,
+            "resolve_ms": (time.perf_counter() - started) * 1000,
+        }
+        self.records.append(record)
+        if not refs:
+            record["source"] = "live"
+            return self.page.get_by_role(role, **live_options)
+
+        record["source"] = "snapshot"
+        locator = self.page.locator(", ".join(f'[{REF_ATTRIBUTE}="{ref}"]' for ref in refs))
+        if self.measure_live:
+            self._measure(record, locator, self.page.get_by_role(role, **live_options))
+        return locator
+
+    def _measure(self, record: Dict[str, Any], locator: Locator, live: Locator) -> None:
+        """Time resolving the handle and the live role query (one count() each)."""
+        started = time.perf_counter()
+        handle_count = locator.count()
+        record["handle_ms"] = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        live_count = live.count()
+        record["live_ms"] = (time.perf_counter() - started) * 1000
+        if live_count != handle_count:
+            logger.warning(
+                "Role snapshot found %d %s named %r, page.get_by_role %d",
+                handle_count, record["role"], record["name"], live_count,
+            )
+            record["live_matches"] = live_count
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """Records of this page's queries, each with an equal share of the snapshot it used."""
+        queries: Dict[int, int] = {}
+        for record in self.records:
+            queries[record["snapshot"]] = queries.get(record["snapshot"], 0) + 1
+        return [
+            {
+                **{k: v for k, v in record.items() if k != "snapshot"},
+                "snapshot_ms": self.snapshots[record["snapshot"]] / queries[record["snapshot"]],
+            }
+            for record in self.records
+        ]
+
+
+class RoleTimingsWriter:
+    """Appends role query timings to the run's JSON lines file (shared by xdist workers)."""
+
+    def __init__(self, directory: str, run_id: str):
+        self.path = os.path.join(directory, f"roles-{run_id}.jsonl")
+
+    def write(self, test: str, timings: List[Dict[str, Any]]) -> None:
+        append_jsonl(self.path, ({"test": test, **timing} for timing in timings))
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return statistics.median(values) if values else None
+
+
+def summarize_roles(path: str) -> List[str]:
+    """Per role query: answers from the snapshot and its median cost, live cost if measured."""
+    records = read_jsonl(path)
+    queries: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for record in records:
+        label = "any name" if record["name"] is None else repr(record["name"])
+        if record.get("level") is not None:
+            label += f" level {record['level']}"
+        queries.setdefault((record["role"], label), []).append(record)
+
+    lines = []
+    for (role, label), series in sorted(queries.items()):
+        hits = [r for r in series if r["source"] == "snapshot"]
+        cost = _median([r["snapshot_ms"] + r["resolve_ms"] + r.get("handle_ms", 0.0) for r in hits])
+        live = _median([r["live_ms"] for r in hits if "live_ms" in r])
+        line = f"{role} {label}: {len(hits)}/{len(series)} from snapshot"
+        if cost is not None:
+            line += f", {cost:.1f} ms per query"
+        if live is not None:
+            line += f" (live get_by_role {live:.1f} ms)"
+        lines.append(line)
+
+    hits = [r for r in records if r["source"] == "snapshot"]
+    measured = [r for r in hits if "live_ms" in r]
+    if measured:
+        after = sum(r["snapshot_ms"] + r["resolve_ms"] + r["handle_ms"] for r in measured) / len(measured)
+        before = sum(r["live_ms"] for r in measured) / len(measured)
+        lines.append(f"Mean per role query: {before:.1f} ms live, {after:.1f} ms with snapshots")
+    mismatched = [r for r in measured if "live_matches" in r]
+    if mismatched:
+        lines.append(f"WARNING: {len(mismatched)} queries matched differently than page.get_by_role")
+    return lines
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Data-Driven E-commerce Search Runner
+
+Validates catalog search on the e-commerce playground for a whole file of search terms
+instead of the single SEARCH_TERM hard-coded in ecommerce_search_test.py.
+
+How it stays fast:
+    - A few warm browsers are started once; each one hosts several contexts with one
+      page each, and every page pulls terms from a shared queue.
+    - The site is loaded and the cookie banner accepted once; the resulting storage
+      state (shared with the pytest fixtures through StorageStateCache) primes every
+      context, so there is no per-term banner handling.
+    - Terms are searched by navigating straight to the search results route, and each
+      result page is verified with one batched in-page check (BatchQuery).
+    - Per-term results are streamed to a JSONL file as they complete.
+
+The headline metric is throughput in terms per minute.
+
+Execution:
+    python -m web.search_runner terms.txt --browsers 2 --pages 4 --output search_results.jsonl
+    python -m web.search_runner terms.txt --backend lambdatest
+
+Term file format: one term per line; blank lines and lines starting with '#' are skipped.
+A term that should find nothing is prefixed with '!' (e.g. "!xyzzy"); it passes when the
+results page is empty and fails when products are listed. Any other term that finds no
+products is reported as no_results and fails the run (exit code 1).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List
+from urllib.parse import quote_plus
+
+from playwright.async_api import Browser, Playwright, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from web.page_queries import BatchQuery
+from web.storage_state import BANNER_TIMEOUT, ECOMMERCE_ORIGIN, SITE_SETUPS, StorageStateCache, cookie_banner
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = ECOMMERCE_ORIGIN + "/"
+SEARCH_URL = BASE_URL + "index.php?route=product/search&search={term}"
+PRODUCT_SELECTOR = ".product-layout"
+EXPECT_EMPTY_PREFIX = "!"
+
+
+def load_terms(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+async def _launch_browser(p: Playwright, backend: str, index: int) -> Browser:
+    if backend == "local":
+        return await p.chromium.launch(headless=True)
+
+    # Cloud browsers reuse the endpoint builder from the pytest fixtures.
+    from web.plugin import get_ws_endpoint
+
+    ws_endpoint = get_ws_endpoint(
+        "Chrome", "latest", "Windows 10", "Search-Runner-Build", f"Search Runner {index}"
+    )
+    return await p.chromium.connect(ws_endpoint)
+
+
+async def _prime_storage_state(browser: Browser) -> Dict[str, Any]:
+    """
+    Async counterpart of the site's setup (accept_cookie_banner): load the site once and
+    accept the cookie banner; return the storage state to reuse.
+    """
+    context = await browser.new_context(**SITE_SETUPS[ECOMMERCE_ORIGIN].context_options)
+    try:
+        page = await context.new_page()
+        await page.goto(BASE_URL)
+        accept_button = cookie_banner(page)
+        try:
+            # The banner renders after load; is_visible() right after goto would miss it.
+            await accept_button.wait_for(state="visible", timeout=BANNER_TIMEOUT)
+            await accept_button.click()
+        except PlaywrightTimeoutError:
+            logger.info("No cookie banner on %s", BASE_URL)
+        return await context.storage_state()
+    finally:
+        await context.close()
+
+
+async def _storage_state(cache: StorageStateCache, browser: Browser) -> Dict[str, Any]:
+    """The cached storage state of the site, primed under the cache's per-origin lock."""
+    state = cache.load(ECOMMERCE_ORIGIN)
+    if state is not None:
+        return state
+    # Blocks the event loop while another process primes, but nothing else runs yet.
+    with cache.lock(ECOMMERCE_ORIGIN):
+        # Another run or pytest worker may have primed the origin while this one waited.
+        state = cache.load(ECOMMERCE_ORIGIN)
+        if state is None:
+            logger.info("Priming storage state for %s", ECOMMERCE_ORIGIN)
+            state = await _prime_storage_state(browser)
+            cache.save(ECOMMERCE_ORIGIN, state)
+    return state
+
+
+async def verify_term(page, term: str, timeout: float) -> Dict[str, Any]:
+    """Search for one term and verify the result page with a single batched check."""
+    started = time.perf_counter()
+    expect_empty = term.startswith(EXPECT_EMPTY_PREFIX)
+    if expect_empty:
+        term = term[len(EXPECT_EMPTY_PREFIX):].strip()
+    record: Dict[str, Any] = {"term": term, "expect_empty": expect_empty}
+    try:
+        await page.goto(SEARCH_URL.format(term=quote_plus(term)), timeout=timeout)
+        checks = await (
+            BatchQuery(page)
+            .text("h1", key="heading")
+            .count(PRODUCT_SELECTOR, key="products")
+            .count(PRODUCT_SELECTOR, key="matching", has_text=term)
+            .run_async()
+        )
+        heading = checks.value("heading") or ""
+        record.update(checks.as_dict())
+        if f"search - {term}".lower() not in heading.lower():
+            record["status"] = "failed"
+            record["error"] = f"Unexpected results heading: {heading!r}"
+        elif not checks.value("products"):
+            record["status"] = "passed" if expect_empty else "no_results"
+        elif expect_empty:
+            record["status"] = "failed"
+            record["error"] = "Expected no results"
+        elif not checks.value("matching"):
+            record["status"] = "failed"
+            record["error"] = "No product in the results mentions the term"
+        else:
+            record["status"] = "passed"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+async def _page_worker(browser, storage_state, queue, sink, stats, timeout):
+    context = await browser.new_context(
+        storage_state=storage_state, **SITE_SETUPS[ECOMMERCE_ORIGIN].context_options
+    )
+    page = await context.new_page()
+    try:
+        while True:
+            try:
+                term = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            record = await verify_term(page, term, timeout)
+            sink.write(json.dumps(record) + "\n")
+            sink.flush()
+            stats[record["status"]] = stats.get(record["status"], 0) + 1
+            stats["done"] += 1
+            if stats["done"] % 50 == 0:
+                elapsed = time.perf_counter() - stats["started"]
+                logger.info(
+                    "%d terms verified, %.1f terms/min", stats["done"], stats["done"] / elapsed * 60
+                )
+    finally:
+        await context.close()
+
+
+async def run_search_verification(
+    terms: List[str],
+    output: str,
+    browsers: int = 2,
+    pages: int = 4,
+    backend: str = "local",
+    timeout: float = 30000,
+) -> Dict[str, Any]:
+    """Verify every term and stream results to `output`; returns the run summary."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for term in terms:
+        queue.put_nowait(term)
+
+    stats: Dict[str, Any] = {"done": 0, "started": time.perf_counter()}
+    async with async_playwright() as p:
+        launched = await asyncio.gather(
+            *(_launch_browser(p, backend, i) for i in range(browsers))
+        )
+        try:
+            state = await _storage_state(StorageStateCache(), launched[0])
+            with open(output, "w", encoding="utf-8") as sink:
+                await asyncio.gather(
+                    *(
+                        _page_worker(browser, state, queue, sink, stats, timeout)
+                        for browser in launched
+                        for _ in range(pages)
+                    )
+                )
+        finally:
+            await asyncio.gather(*(b.close() for b in launched), return_exceptions=True)
+
+    elapsed = time.perf_counter() - stats.pop("started")
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["terms_per_minute"] = round(stats["done"] / elapsed * 60, 1) if elapsed else 0.0
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Data-driven e-commerce search verification")
+    parser.add_argument("terms_file", help="File with one search term per line")
+    parser.add_argument("--output", default="search_results.jsonl", help="JSONL results file")
+    parser.add_argument("--browsers", type=int, default=2, help="Number of warm browsers")
+    parser.add_argument("--pages", type=int, default=4, help="Concurrent pages per browser")
+    parser.add_argument("--backend", choices=["local", "lambdatest"], default="local")
+    parser.add_argument("--timeout", type=float, default=30000, help="Navigation timeout (ms)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    terms = load_terms(args.terms_file)
+    logger.info(
+        "Verifying %d terms on %d browser(s) x %d page(s)", len(terms), args.browsers, args.pages
+    )
+    summary = asyncio.run(
+        run_search_verification(
+            terms, args.output, args.browsers, args.pages, args.backend, args.timeout
+        )
+    )
+    logger.info("Throughput: %s terms/min", summary["terms_per_minute"])
+    logger.info("Summary: %s", json.dumps(summary))
+    if summary.get("no_results"):
+        logger.warning(
+            "%d term(s) found no products; prefix expected-empty terms with %r",
+            summary["no_results"],
+            EXPECT_EMPTY_PREFIX,
+        )
+    return 0 if summary["done"] == summary.get("passed", 0) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Local Snapshot Server for the Playground Sites
+
+Freezes the pages (and every asset they load) that the web tests touch into a local
+directory, then serves them from a local HTTP server so functional runs no longer
+depend on internet latency and timings are repeatable.
+
+Pieces:
+    - crawl:  loads each seed URL in a local headless Chromium, records every response
+              (documents, CSS, JS, images, fonts) and writes them plus a manifest.json.
+    - serve:  ThreadingHTTPServer that answers /<host>/<path>?<query> from the snapshot,
+              with a small dynamic shim for the e-commerce search route (unknown search
+              terms are served from a recorded results page with the term swapped in)
+              and for form posts (fields are echoed back as JSON).
+    - SnapshotRouter: URL-rewrite mode for the pytest fixtures. It routes every request
+              of a browser context: requests for snapshotted hosts are fetched from the
+              local server and fulfilled, everything else is aborted (hermetic runs).
+
+Execution:
+    python -m web.snapshot_server crawl --dir snapshots
+    python -m web.snapshot_server serve --dir snapshots --port 8765
+    pytest web/ --backend=local --snapshot-dir=snapshots
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEEDS = [
+    "https://www.lambdatest.com/",
+    "https://www.lambdatest.com/selenium-playground/",
+    "https://www.lambdatest.com/selenium-playground/simple-form-demo",
+    "https://ecommerce-playground.lambdatest.io/",
+    "https://ecommerce-playground.lambdatest.io/index.php?route=product/search&search=iPhone",
+    "https://www.w3.org/WAI/ER/tests/xhtml/testfiles/resources/pdf/dummy.pdf",
+]
+SEARCH_ROUTE = "product/search"
+# Response headers worth replaying; the rest (encodings, lengths, cookies) would be wrong.
+KEPT_HEADERS = ("content-type", "location", "cache-control")
+
+
+def url_key(url: str) -> str:
+    """Normalize a URL for lookups: drop the fragment and sort the query parameters."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path or "/"
+    return f"{parts.scheme}://{parts.netloc}{path}" + (f"?{query}" if query else "")
+
+
+class SnapshotStore:
+    """Files plus manifest.json describing recorded responses, keyed by url_key."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        manifest = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)["entries"]
+
+    @property
+    def hosts(self) -> List[str]:
+        return sorted({urlsplit(key).netloc for key in self.entries})
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        key = url_key(url)
+        filename = os.path.join("files", hashlib.sha1(key.encode()).hexdigest())
+        os.makedirs(os.path.join(self.directory, "files"), exist_ok=True)
+        with open(os.path.join(self.directory, filename), "wb") as f:
+            f.write(body)
+        self.entries[key] = {
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+            "file": filename,
+        }
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "entries": self.entries}, f, indent=1)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        key = url_key(url)
+        entry = self.entries.get(key)
+        if entry is None and key.startswith("https://"):
+            entry = self.entries.get("http://" + key[len("https://"):])
+        return entry
+
+    def body(self, entry: Dict[str, Any]) -> bytes:
+        with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+            return f.read()
+
+    def search_shim(self, url: str) -> Optional[Dict[str, Any]]:
+        """Serve an unknown e-commerce search from a recorded one, with the term swapped."""
+        parts = urlsplit(url)
+        term = parse_qs(parts.query).get("search", [None])[0]
+        if parse_qs(parts.query).get("route", [None])[0] != SEARCH_ROUTE or term is None:
+            return None
+        for key, entry in self.entries.items():
+            recorded = urlsplit(key)
+            params = parse_qs(recorded.query)
+            if recorded.netloc == parts.netloc and params.get("route") == [SEARCH_ROUTE]:
+                recorded_term = params.get("search", [""])[0]
+                body = self.body(entry)
+                if recorded_term:
+                    body = body.replace(recorded_term.encode(), term.encode())
+                return dict(entry, body=body)
+        return None
+
+
+def crawl(seeds: List[str], directory: str) -> SnapshotStore:
+    """Load every seed in a local browser and record all responses into the store."""
+    from playwright.sync_api import sync_playwright
+
+    store = SnapshotStore(directory)
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context()
+        for seed in seeds:
+            responses = []
+            page = context.new_page()
+            page.on("response", responses.append)
+            try:
+                page.goto(seed, wait_until="networkidle")
+            except Exception as e:
+                logger.warning("Failed to load %s: %s", seed, e)
+            for response in responses:
+                if response.request.method != "GET":
+                    continue
+                try:
+                    body = b"" if 300 <= response.status < 400 else response.body()
+                except Exception as e:
+                    logger.debug("No body for %s: %s", response.url, e)
+                    continue
+                store.add(response.url, response.status, response.headers, body)
+            page.close()
+            logger.info("Recorded %s responses for %s", len(responses), seed)
+        browser.close()
+    store.save()
+    return store
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    store: SnapshotStore = None
+
+    def _original_url(self) -> str:
+        # Path layout is /<host>/<path>?<query>
+        host, _, rest = self.path.lstrip("/").partition("/")
+        return f"https://{host}/{rest}"
+
+    def _respond(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        url = self._original_url()
+        entry = self.store.get(url)
+        if entry is not None:
+            self._respond(entry["status"], entry["headers"], self.store.body(entry))
+            return
+        shimmed = self.store.search_shim(url)
+        if shimmed is not None:
+            self._respond(shimmed["status"], shimmed["headers"], shimmed["body"])
+            return
+        self._respond(404, {"Content-Type": "text/plain"}, b"Not in snapshot")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        fields = parse_qs(self.rfile.read(length).decode("utf-8", errors="replace"))
+        body = json.dumps({k: v[0] if len(v) == 1 else v for k, v in fields.items()}).encode()
+        self._respond(200, {"Content-Type": "application/json"}, body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class SnapshotServer:
+    """Snapshot HTTP server running on a background thread."""
+
+    def __init__(self, directory: str, host: str = "127.0.0.1", port: int = 0):
+        self.store = SnapshotStore(directory)
+        handler = type("Handler", (SnapshotRequestHandler,), {"store": self.store})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SnapshotServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Serving snapshot of %s at %s", self.store.hosts, self.url)
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Hand recorded redirects back to the browser instead of following them here."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class SnapshotRouter:
+    """Rewrites a context's requests to the snapshot server; other hosts are aborted."""
+
+    def __init__(self, server_url: str, hosts: List[str], passthrough: bool = False):
+        self.server_url = server_url
+        self.hosts = set(hosts)
+        self.passthrough = passthrough
+        self._opener = urllib.request.build_opener(_NoRedirect)
+
+    def install(self, context) -> None:
+        context.route("**/*", self._handle)
+
+    def _handle(self, route) -> None:
+        request = route.request
+        parts = urlsplit(request.url)
+        if parts.netloc not in self.hosts:
+            if self.passthrough:
+                route.continue_()
+            else:
+                route.abort()
+            return
+
+        local_url = f"{self.server_url}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            local_url += f"?{parts.query}"
+        data = request.post_data_buffer if request.method == "POST" else None
+        local_request = urllib.request.Request(local_url, data=data, method=request.method)
+        try:
+            with self._opener.open(local_request) as response:
+                status, headers, body = response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            status, headers, body = e.code, dict(e.headers), e.read()
+        headers.pop("Content-Length", None)
+        route.fulfill(status=status, headers=headers, body=body)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Freeze and serve the playground sites")
+    sub = parser.add_subparsers(dest="command", required=True)
+    crawl_cmd = sub.add_parser("crawl", help="Record the seed pages and their assets")
+    crawl_cmd.add_argument("urls", nargs="*", default=DEFAULT_SEEDS)
+    crawl_cmd.add_argument("--dir", default="snapshots")
+    serve_cmd = sub.add_parser("serve", help="Serve a recorded snapshot")
+    serve_cmd.add_argument("--dir", default="snapshots")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if args.command == "crawl":
+        store = crawl(args.urls, args.dir)
+        logger.info("Snapshot has %s responses from %s hosts", len(store.entries), len(store.hosts))
+        return 0
+
+    server = SnapshotServer(args.dir, port=args.port)
+    logger.info("Serving %s responses at %s", len(server.store.entries), server.url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""
+Storage State Cache for Cookie Banners and Site Preferences
+
+Every e-commerce test used to start on a fresh page and dismiss the cookie banner
+itself. StorageStateCache performs that one-off setup once per origin, saves
+context.storage_state() to disk, and creates later contexts already primed with it.
+
+Only the origins a test targets are primed: lt_page primes the origins of the test's
+@pytest.mark.storage_state(...) marker and opens a plain context for other tests.
+
+An entry is refreshed when:
+    - it is older than the TTL, or
+    - the site fingerprint changed (the setup version below, plus the ETag /
+      Last-Modified validators the origin returns for a HEAD request).
+
+Writes go through a temp file and os.replace, and priming holds a per-origin file
+lock, so parallel xdist workers share the same cache directory and only one of them
+primes an origin while the others wait for its result.
+
+Without the cache (--no-storage-state) lt_page installs each targeted site's fallback
+instead, a locator handler that dismisses the cookie banner whenever it gets in the way.
+
+Usage:
+    cache = StorageStateCache()
+    context = cache.new_context(browser, [ECOMMERCE_ORIGIN])
+    page = context.new_page()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from support.file_lock import file_lock
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Locator, Page
+
+logger = logging.getLogger(__name__)
+
+ECOMMERCE_ORIGIN = "https://ecommerce-playground.lambdatest.io"
+DEFAULT_CACHE_DIR = os.getenv("STORAGE_STATE_DIR", ".storage_state")
+DEFAULT_TTL = int(os.getenv("STORAGE_STATE_TTL", str(12 * 60 * 60)))  # seconds
+# The banner is rendered by a script after load; wait this long before assuming there is none.
+BANNER_TIMEOUT = 5000  # ms
+
+
+def cookie_banner(page: Page) -> Locator:
+    return page.get_by_role("button", name="Accept")
+
+
+def accept_cookie_banner(page: Page) -> None:
+    """Dismiss the cookie banner, waiting for it to render."""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    accept_button = cookie_banner(page)
+    try:
+        accept_button.wait_for(state="visible", timeout=BANNER_TIMEOUT)
+    except PlaywrightTimeoutError:
+        logger.info("No cookie banner on %s", page.url)
+        return
+    accept_button.click()
+
+
+class SiteSetup:
+    """One-off preparation for an origin; bump `version` when the steps change."""
+
+    def __init__(
+        self,
+        origin: str,
+        setup: Callable[[Page], None],
+        version: str = "1",
+        context_options: Optional[Dict[str, Any]] = None,
+        overlay: Optional[Callable[[Page], Locator]] = None,
+    ):
+        self.origin = origin
+        self.setup = setup
+        self.version = version
+        self.context_options = context_options or {}
+        # Element the setup dismisses, clicked on demand when the cache is disabled.
+        self.overlay = overlay
+
+    def install_fallback(self, page: Page) -> None:
+        """Dismiss the overlay whenever it shows up and blocks an action on the page."""
+        if self.overlay:
+            page.add_locator_handler(self.overlay(page), lambda overlay: overlay.click())
+
+
+SITE_SETUPS: Dict[str, SiteSetup] = {
+    ECOMMERCE_ORIGIN: SiteSetup(
+        ECOMMERCE_ORIGIN,
+        accept_cookie_banner,
+        version="2",
+        context_options={"locale": "en-US"},
+        overlay=cookie_banner,
+    ),
+}
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class StorageStateCache:
+    """On-disk storage state per origin, created on first use and reused until stale."""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        ttl: int = DEFAULT_TTL,
+        check_site: bool = True,
+        prepare_context: Optional[Callable[[BrowserContext], None]] = None,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.check_site = check_site
+        # Called on every context the cache creates (e.g. to install request routing).
+        self.prepare_context = prepare_context
+        self._fingerprints: Dict[str, str] = {}
+
+    def _path(self, origin: str) -> str:
+        name = hashlib.sha1(origin.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}.json")
+
+    def site_fingerprint(self, origin: str) -> str:
+        """Setup version plus HTTP validators; looked up once per origin per process."""
+        if origin in self._fingerprints:
+            return self._fingerprints[origin]
+
+        site = SITE_SETUPS.get(origin)
+        parts = [site.version if site else ""]
+        if self.check_site:
+            import requests
+
+            try:
+                response = requests.head(origin, timeout=5, allow_redirects=True)
+                parts.append(response.headers.get("ETag", ""))
+                parts.append(response.headers.get("Last-Modified", ""))
+            except requests.RequestException as e:
+                logger.debug("Could not fingerprint %s: %s", origin, e)
+        fingerprint = "|".join(parts)
+        self._fingerprints[origin] = fingerprint
+        return fingerprint
+
+    def lock(self, origin: str):
+        """Cross-process lock to hold while priming an origin (load again once acquired)."""
+        return file_lock(self._path(origin) + ".lock")
+
+    def load(self, origin: str) -> Optional[Dict[str, Any]]:
+        """Return the cached state for an origin, or None if missing, expired or outdated."""
+        try:
+            with open(self._path(origin), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("saved_at", 0) > self.ttl:
+            logger.info("Storage state for %s expired", origin)
+            return None
+        if entry.get("fingerprint") != self.site_fingerprint(origin):
+            logger.info("Site changed for %s, refreshing storage state", origin)
+            return None
+        return entry["state"]
+
+    def save(self, origin: str, state: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            "origin": origin,
+            "saved_at": time.time(),
+            "fingerprint": self.site_fingerprint(origin),
+            "state": state,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(origin))
+
+    def get_or_create(self, browser: Browser, origin: str) -> Dict[str, Any]:
+        """Return a fresh storage state for the origin, running its setup if needed."""
+        state = self.load(origin)
+        if state is not None:
+            return state
+
+        site = SITE_SETUPS.get(origin)
+        if site is None:
+            return {"cookies": [], "origins": []}
+
+        with self.lock(origin):
+            # Another worker may have primed the origin while this one waited.
+            state = self.load(origin)
+            if state is not None:
+                return state
+            logger.info("Priming storage state for %s", origin)
+            context = browser.new_context(**site.context_options)
+            if self.prepare_context:
+                self.prepare_context(context)
+            try:
+                page = context.new_page()
+                page.goto(origin + "/")
+                site.setup(page)
+                state = context.storage_state()
+            finally:
+                context.close()
+            self.save(origin, state)
+        return state
+
+    def state_for(self, browser: Browser, origins: Iterable[str]) -> Dict[str, Any]:
+        """Merge the states of several origins into one storage_state value."""
+        merged: Dict[str, Any] = {"cookies": [], "origins": []}
+        for origin in origins:
+            state = self.get_or_create(browser, origin)
+            merged["cookies"].extend(state.get("cookies", []))
+            merged["origins"].extend(state.get("origins", []))
+        return merged
+
+    def new_context(
+        self,
+        browser: Browser,
+        origins: Iterable[str] = (),
+        **context_options: Any,
+    ) -> BrowserContext:
+        """Create a context primed for `origins`; without origins a plain context."""
+        origins = list(origins)
+        options: Dict[str, Any] = {}
+        for origin in origins:
+            if origin in SITE_SETUPS:
+                options.update(SITE_SETUPS[origin].context_options)
+        options.update(context_options)
+        context = browser.new_context(storage_state=self.state_for(browser, origins), **options)
+        if self.prepare_context:
+            self.prepare_context(context)
+        return context